@@ -0,0 +1,100 @@
+import pytest
+
+from apps.tags.models import Tag
+from apps.tasks.models import Task, TaskActivity
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def post_batch(api_client, django_capture_on_commit_callbacks):
+    def post(requests, atomic=False):
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post('/api/batch/', {'atomic': atomic, 'requests': requests}, format='json')
+        assert response.status_code == 200, response.data
+        return response.data
+
+    return post
+
+
+def statuses(data):
+    return [result['status'] for result in data['results']]
+
+
+def test_references_resolve_in_urls_and_bodies(user, post_batch):
+    tag = Tag.objects.create(user=user, name='a')
+    data = post_batch([
+        {'name': 'p', 'method': 'POST', 'url': '/api/projects/', 'body': {'name': '工作'}},
+        {'method': 'PATCH', 'url': '/api/projects/$p.id/', 'body': {'is_favorite': True}},
+        {'name': 't1', 'method': 'POST', 'url': '/api/tasks/', 'body': {'title': '周报', 'tags': [tag.pk]}},
+        {'method': 'POST', 'url': '/api/tasks/$t1.id/toggle_star/'},
+        # 整个字符串为引用时保留原类型，否则按文本替换
+        {'method': 'PATCH', 'url': '/api/tasks/$t1.id/', 'body': {'title': '周报 $p.name', 'tags': ['$t1.tags.0.id']}},
+        # 未声明的名称按原文处理
+        {'method': 'POST', 'url': '/api/tasks/', 'body': {'title': '$price.total'}},
+    ])
+    assert statuses(data) == [201, 200, 201, 200, 200, 201]
+    assert not data['rolled_back']
+    assert data['results'][1]['body']['is_favorite']
+    task = Task.objects.get(pk=data['results'][2]['body']['id'])
+    assert (task.title, task.is_starred) == ('周报 工作', True)
+    assert list(task.task_tags.values_list('tag_id', flat=True)) == [tag.pk]
+    assert Task.objects.filter(user=user, title='$price.total').exists()
+
+
+def test_atomic_failure_rolls_back_whole_batch(user, post_batch):
+    tag = Tag.objects.create(user=user, name='a')
+    data = post_batch([
+        {'name': 't1', 'method': 'POST', 'url': '/api/tasks/', 'body': {'title': 'x', 'tags': [tag.pk]}},
+        {'method': 'POST', 'url': '/api/tasks/$t1.id/toggle_star/'},
+        {'method': 'PATCH', 'url': '/api/tasks/$t1.id/', 'body': {'priority': 'urgent'}},
+        {'name': 'never', 'method': 'POST', 'url': '/api/tasks/', 'body': {'title': 'y'}},
+    ], atomic=True)
+    assert data['rolled_back']
+    assert statuses(data) == [201, 200, 400, 424]
+    assert data['results'][3]['name'] == 'never'
+    assert not Task.objects.filter(user=user).exists()
+    assert not TaskActivity.objects.exists()
+    assert Tag.objects.get(pk=tag.pk).usage_count == 0
+
+
+def test_non_atomic_failure_only_affects_dependents(user, post_batch):
+    data = post_batch([
+        {'name': 'bad', 'method': 'POST', 'url': '/api/tasks/', 'body': {'priority': 'high'}},
+        {'method': 'POST', 'url': '/api/tasks/$bad.id/toggle_star/'},
+        {'name': 'ok', 'method': 'POST', 'url': '/api/tasks/', 'body': {'title': 'ok'}},
+        {'method': 'DELETE', 'url': '/api/tasks/$ok.missing/'},
+        {'method': 'GET', 'url': '/api/tasks/$ok.id/'},
+    ])
+    assert not data['rolled_back']
+    assert statuses(data) == [400, 424, 201, 424, 200]
+    assert list(Task.objects.filter(user=user).values_list('title', flat=True)) == ['ok']
+
+
+def test_sub_requests_are_limited_to_own_data_and_allowed_urls(post_batch, make_user):
+    other = Task.objects.create(user=make_user(), title='other')
+    data = post_batch([
+        {'method': 'PATCH', 'url': f'/api/tasks/{other.pk}/', 'body': {'title': 'mine'}},
+        {'method': 'GET', 'url': '/api/users/me/'},
+        {'method': 'GET', 'url': '/api/tasks/no/such/path/'},
+    ])
+    assert statuses(data) == [404, 400, 404]
+    assert Task.objects.get(pk=other.pk).title == 'other'
+
+
+@pytest.mark.parametrize('payload', [
+    {'requests': []},
+    {'requests': 'x'},
+    {'requests': [{'method': 'GET'}]},
+    {'requests': [{'method': 'OPTIONS', 'url': '/api/tasks/'}]},
+    {'requests': [{'name': 'a', 'url': '/api/tasks/'}, {'name': 'a', 'url': '/api/tasks/'}]},
+    {'requests': [{'name': 'a-b', 'url': '/api/tasks/'}]},
+])
+def test_invalid_batches_are_rejected(api_client, payload):
+    assert api_client.post('/api/batch/', payload, format='json').status_code == 400
+
+
+def test_batch_size_limit(api_client, settings):
+    settings.BATCH_MAX_REQUESTS = 2
+    payload = {'requests': [{'url': '/api/tasks/'}] * 3}
+    assert api_client.post('/api/batch/', payload, format='json').status_code == 400
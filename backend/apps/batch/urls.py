@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import BatchView
+
+urlpatterns = [
+    path('', BatchView.as_view(), name='batch'),
+]
@@ -0,0 +1,196 @@
+"""
+批量子请求
+
+离线客户端重连后一次提交排队的多个操作，在进程内依次分发到任务、项目、标签接口，
+只认证一次，不再经过中间件：
+
+    {"atomic": true, "requests": [
+        {"name": "t1", "method": "POST", "url": "/api/tasks/", "body": {"title": "写周报"}},
+        {"method": "POST", "url": "/api/tasks/$t1.id/toggle_star/"},
+        {"method": "PATCH", "url": "/api/tags/3/", "body": {"color": "#EF4444"}}
+    ]}
+
+- $名称.字段 引用同一批次中前面子请求的返回数据，可用于 URL 和 body（整个字符串为引用时保留原类型）
+- atomic 为 true 时所有子请求在同一个事务中执行，任一失败则全部回滚，其后的子请求不再执行
+- 每个子请求返回自己的状态码；引用的子请求失败或未执行时返回 424，抛出异常的子请求返回 500
+"""
+
+import io
+import json
+import logging
+import re
+from contextlib import ExitStack
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import router, transaction
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.tasks import activity
+from apps.tasks.models import Task
+
+ALLOWED_PREFIXES = ('/api/tasks/', '/api/projects/', '/api/tags/')
+ALLOWED_METHODS = {'GET', 'POST', 'PUT', 'PATCH', 'DELETE'}
+
+# $t1.id、$t1.project.id
+REFERENCE = re.compile(r'\$(\w+)((?:\.\w+)+)')
+
+logger = logging.getLogger(__name__)
+
+
+class FailedDependency(Exception):
+    """引用的子请求失败、未执行或返回数据中没有该字段"""
+
+
+class BatchView(APIView):
+    """批量执行子请求"""
+
+    def resolve_reference(self, match, results):
+        name, path = match.group(1), match.group(2)
+        result = results.get(name)
+        if result is None or result['status'] >= 400:
+            raise FailedDependency(f'引用的请求 {name} 未成功执行')
+        value = result['body']
+        for key in path[1:].split('.'):
+            if isinstance(value, list) and key.isdigit() and int(key) < len(value):
+                value = value[int(key)]
+            elif isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                raise FailedDependency(f'请求 {name} 的返回数据中没有 {path[1:]}')
+        return value
+
+    def substitute(self, value, names, results):
+        """替换引用；只有名称为批次中声明过的子请求时才视为引用，其余按原文处理"""
+        if isinstance(value, dict):
+            return {key: self.substitute(item, names, results) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.substitute(item, names, results) for item in value]
+        if not isinstance(value, str):
+            return value
+
+        match = REFERENCE.fullmatch(value)
+        if match and match.group(1) in names:
+            return self.resolve_reference(match, results)
+        return REFERENCE.sub(
+            lambda m: str(self.resolve_reference(m, results)) if m.group(1) in names else m.group(0),
+            value,
+        )
+
+    def build_request(self, request, method, url, body):
+        """以当前请求为模板构造子请求，沿用已认证的用户"""
+        parts = urlsplit(url)
+        payload = b'' if body is None else json.dumps(body, cls=DjangoJSONEncoder).encode()
+        sub_request = WSGIRequest({
+            **request._request.META,
+            'REQUEST_METHOD': method,
+            'PATH_INFO': parts.path,
+            'QUERY_STRING': parts.query,
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(payload)),
+            'wsgi.input': io.BytesIO(payload),
+        })
+        sub_request._force_auth_user = request.user
+        sub_request._force_auth_token = request.auth
+        # 子请求的读操作走主库，能读到同一批次（及同一事务）中的写入
+        sub_request.in_batch = True
+        return sub_request
+
+    def dispatch_one(self, request, item):
+        method = item['method']
+        url = item['url']
+        path = urlsplit(url).path
+        if not path.startswith(ALLOWED_PREFIXES):
+            return status.HTTP_400_BAD_REQUEST, {'error': f'不支持的地址: {url}'}
+        try:
+            match = resolve(path)
+        except Resolver404:
+            return status.HTTP_404_NOT_FOUND, {'error': f'地址不存在: {url}'}
+
+        try:
+            # 子请求中已提交的变更记录在子请求结束时写入，后面的子请求可以读到
+            with activity.buffered():
+                response = match.func(
+                    self.build_request(request, method, url, item.get('body')), *match.args, **match.kwargs
+                )
+        except Exception:
+            # 只影响本子请求；atomic 时由 run 回滚整个批次
+            logger.exception('批量子请求失败: %s %s', method, url)
+            return status.HTTP_500_INTERNAL_SERVER_ERROR, {'error': '服务器内部错误'}
+        return response.status_code, getattr(response, 'data', None)
+
+    def validate(self, items):
+        if not isinstance(items, list) or not items:
+            return 'requests 必须是非空列表'
+        if len(items) > settings.BATCH_MAX_REQUESTS:
+            return f'每批最多 {settings.BATCH_MAX_REQUESTS} 个子请求'
+        names = set()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get('url'), str):
+                return f'第 {index + 1} 个子请求缺少 url'
+            method = item.get('method', 'GET')
+            if not isinstance(method, str) or method.upper() not in ALLOWED_METHODS:
+                return f'第 {index + 1} 个子请求的 method 不支持'
+            name = item.get('name')
+            if name is not None:
+                if not isinstance(name, str) or not re.fullmatch(r'\w+', name) or name in names:
+                    return f'第 {index + 1} 个子请求的 name 不合法或重复'
+                names.add(name)
+        return None
+
+    def databases(self):
+        """批次可能写入的库：default 和用户数据所在的分片"""
+        return sorted({'default', router.db_for_write(Task)})
+
+    def run(self, request, items, atomic):
+        """依次执行子请求，返回 (结果列表, 是否回滚)"""
+        names = {item['name'] for item in items if item.get('name')}
+        results, by_name = [], {}
+        for item in items:
+            try:
+                sub = {
+                    'method': item.get('method', 'GET').upper(),
+                    'url': self.substitute(item['url'], names, by_name),
+                    'body': self.substitute(item.get('body'), names, by_name),
+                }
+            except FailedDependency as exc:
+                code, body = status.HTTP_424_FAILED_DEPENDENCY, {'error': str(exc)}
+            else:
+                code, body = self.dispatch_one(request, sub)
+
+            result = {'status': code, 'body': body}
+            if item.get('name'):
+                result['name'] = item['name']
+                by_name[item['name']] = result
+            results.append(result)
+
+            if atomic and code >= 400:
+                for alias in self.databases():
+                    transaction.set_rollback(True, using=alias)
+                for rest in items[len(results):]:
+                    skipped = {'status': status.HTTP_424_FAILED_DEPENDENCY, 'body': {'error': '批次已回滚，未执行'}}
+                    if rest.get('name'):
+                        skipped['name'] = rest['name']
+                    results.append(skipped)
+                return results, True
+        return results, False
+
+    def post(self, request):
+        items = request.data.get('requests')
+        error = self.validate(items)
+        if error:
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
+
+        if request.data.get('atomic', False):
+            with ExitStack() as stack:
+                for alias in self.databases():
+                    stack.enter_context(transaction.atomic(using=alias))
+                results, rolled_back = self.run(request, items, atomic=True)
+        else:
+            results, rolled_back = self.run(request, items, atomic=False)
+        return Response({'results': results, 'rolled_back': rolled_back})
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class BootstrapConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.bootstrap'
+    verbose_name = '启动数据'
+
+    def ready(self):
+        from . import signals  # noqa: F401
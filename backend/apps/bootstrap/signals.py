@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.filters.models import SavedFilter
+from apps.realtime.events import data_changed
+from . import state
+
+
+@receiver(data_changed)
+def bump_version_on_change(sender, user_id, **kwargs):
+    state.bump(user_id)
+
+
+@receiver(post_save, sender=SavedFilter)
+@receiver(post_delete, sender=SavedFilter)
+def bump_version_on_filter_change(sender, instance, using='default', **kwargs):
+    # 提交后再更换版本号，避免并发请求以新版本号缓存未提交前的数据
+    user_id = instance.user_id
+    transaction.on_commit(lambda: state.bump(user_id), using=using, robust=True)
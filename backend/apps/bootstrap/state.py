@@ -0,0 +1,58 @@
+"""
+启动数据版本
+
+默认缓存在进程间共享时，每个用户在缓存中保存一个版本号，用户数据变更（事务提交后）时更换，
+启动接口以版本号计算 ETag，数据未变化时无需查询数据库即可返回 304。
+缓存丢失时生成新版本号，客户端只会多拉取一次完整数据。
+
+默认缓存为进程内缓存时（多个 worker 之间看不到彼此更换的版本号），
+改用用户表上的数据版本号（见 apps.common.cache）。
+"""
+
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.common import cache as shared_cache
+
+# 响应结构变化时递增，使客户端已缓存的 ETag 失效
+PAYLOAD_VERSION = 2
+
+
+def version_key(user_id):
+    return f'bootstrap:version:{user_id}'
+
+
+def bump(user_id):
+    if shared_cache.is_shared():
+        cache.set(version_key(user_id), uuid.uuid4().hex, settings.BOOTSTRAP['VERSION_TIMEOUT'])
+
+
+def get_version(user_id):
+    if not shared_cache.is_shared():
+        return shared_cache.user_version(user_id)
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        # 并发请求以先写入的版本号为准
+        cache.add(key, uuid.uuid4().hex, settings.BOOTSTRAP['VERSION_TIMEOUT'])
+        version = cache.get(key)
+    return version
+
+
+def compute_etag(user, *params):
+    """
+    版本号 + 用户资料更新时间 + 本地日期（清单计数含“今天”等相对条件）+ 请求参数
+
+    必须在查询数据之前计算：读取之后发生的变更会更换版本号，不会被旧 ETag 掩盖。
+    """
+    parts = [
+        PAYLOAD_VERSION, user.pk, get_version(user.pk),
+        user.updated_at.isoformat() if user.updated_at else '',
+        timezone.localdate().isoformat(), *params,
+    ]
+    digest = hashlib.sha1(':'.join(map(str, parts)).encode()).hexdigest()
+    return f'"{digest}"'
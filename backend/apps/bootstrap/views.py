@@ -0,0 +1,160 @@
+"""
+应用启动数据
+
+一次返回用户、项目（含任务计数）、标签（含使用次数）、智能清单（含计数）、
+系统清单和今日任务计数以及收集箱第一页，每个部分一条查询（收集箱另有一条标签预取，
+计数另有归档表和重复任务各一条）。
+
+数据未变化时按 ETag 返回 304，不查询数据（版本号的计算见 state）；?stream=true 时以 NDJSON
+逐段输出，客户端可以先渲染先到达的部分。
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db.models import Count, Prefetch, Q, Window
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.filters.counts import get_counts
+from apps.filters.models import SavedFilter
+from apps.filters.serializers import SavedFilterSerializer
+from apps.projects.models import Project
+from apps.projects.serializers import ProjectSerializer
+from apps.projects.views import project_count_annotations
+from apps.tags.models import Tag, TaskTag
+from apps.tags.serializers import TagSerializer
+from apps.tasks import recurrence
+from apps.tasks.models import ArchivedTask, Task
+from apps.tasks.serializers import TaskSerializer
+from apps.users.serializers import UserSerializer
+from . import state
+
+MAX_INBOX_PAGE_SIZE = 200
+
+
+def user_section(request, page_size):
+    return UserSerializer(request.user).data
+
+
+def projects_section(request, page_size):
+    projects = Project.objects.filter(user=request.user).annotate(
+        **project_count_annotations()
+    ).order_by(*Project._meta.ordering)
+    return ProjectSerializer(projects, many=True, context={'request': request}).data
+
+
+def tags_section(request, page_size):
+    tags = Tag.objects.filter(user=request.user)
+    return TagSerializer(tags, many=True, context={'request': request}).data
+
+
+def filters_section(request, page_size):
+    saved_filters = SavedFilter.objects.filter(user=request.user)
+    data = SavedFilterSerializer(saved_filters, many=True, context={'request': request}).data
+    counts = get_counts(request.user.pk)
+    return [{**item, 'count': counts.get(item['id'])} for item in data]
+
+
+def counts_section(request, page_size):
+    """系统清单（收集箱、已完成含归档、垃圾筒）和今日任务的数量，与 /api/tasks/system/、/api/tasks/today/ 一致"""
+    day_start = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    day_end = day_start + timedelta(days=1)
+    active = Q(is_deleted=False)
+    pending = active & Q(status__in=['todo', 'in_progress'])
+    tasks = Task.objects.filter(user=request.user)
+    counts = tasks.aggregate(
+        inbox=Count('pk', filter=active & ~Q(status='completed')),
+        completed=Count('pk', filter=active & Q(status='completed')),
+        trash=Count('pk', filter=Q(is_deleted=True)),
+        today=Count('pk', filter=pending & Q(due_date__gte=day_start, due_date__lt=day_end)),
+    )
+    counts['completed'] += ArchivedTask.objects.filter(user=request.user).count()
+    # 当前实例早于今天、但系列今天有发生的重复任务
+    series = tasks.filter(pending, due_date__lt=day_start).exclude(recurrence='').values_list(
+        'recurrence', 'recurrence_start'
+    )
+    counts['today'] += sum(
+        1 for rule, start in series if recurrence.occurrences(rule, start, day_start, day_end)
+    )
+    return counts
+
+
+def inbox_section(request, page_size):
+    """收集箱（未完成任务）第一页，总数用窗口函数在同一条查询中计算"""
+    tasks = list(
+        Task.objects.filter(user=request.user, is_deleted=False)
+        .exclude(status='completed')
+        .select_related('project')
+        .prefetch_related(
+            Prefetch('task_tags', queryset=TaskTag.objects.filter(user=request.user).select_related('tag'))
+        )
+        .annotate(subtasks_total=Count('subtasks'), inbox_total=Window(Count('pk')))
+        .order_by(*Task._meta.ordering)[:page_size]
+    )
+    return {
+        'count': tasks[0].inbox_total if tasks else 0,
+        'results': TaskSerializer(tasks, many=True, context={'request': request}).data,
+    }
+
+
+SECTIONS = {
+    'user': user_section,
+    'projects': projects_section,
+    'tags': tags_section,
+    'filters': filters_section,
+    'counts': counts_section,
+    'inbox': inbox_section,
+}
+
+
+class BootstrapView(APIView):
+    """应用启动数据，?inbox_size= 设置收集箱条数，?stream=true 逐段输出"""
+    # 一次请求代替多个列表请求
+    throttle_costs = {'get': 5}
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get('inbox_size', settings.BOOTSTRAP['INBOX_PAGE_SIZE']))
+        except (TypeError, ValueError):
+            page_size = settings.BOOTSTRAP['INBOX_PAGE_SIZE']
+        return max(1, min(page_size, MAX_INBOX_PAGE_SIZE))
+
+    def not_modified(self, request, etag):
+        if_none_match = request.headers.get('If-None-Match')
+        if not if_none_match:
+            return False
+        etags = {value.removeprefix('W/') for value in parse_etags(if_none_match)}
+        return '*' in etags or etag in etags
+
+    def stream(self, request, page_size):
+        renderer = JSONRenderer()
+        for name, build in SECTIONS.items():
+            yield renderer.render({'section': name, 'data': build(request, page_size)}) + b'\n'
+
+    def get(self, request):
+        page_size = self.get_page_size(request)
+        # 先计算 ETag 再查询数据
+        etag = state.compute_etag(request.user, page_size)
+
+        if self.not_modified(request, etag):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        elif request.query_params.get('stream', 'false').lower() == 'true':
+            response = StreamingHttpResponse(
+                self.stream(request, page_size), content_type='application/x-ndjson'
+            )
+        else:
+            response = Response({
+                name: build(request, page_size) for name, build in SECTIONS.items()
+            })
+
+        response['ETag'] = etag
+        # 允许浏览器缓存，但每次使用前都要带 If-None-Match 重新验证
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
@@ -0,0 +1,41 @@
+"""
+缓存失效的跨进程判断
+
+按版本号失效的缓存依赖默认缓存在各 worker 之间共享，推荐配置 CACHE_URL（如 Redis）。
+默认缓存为进程内缓存（未配置 CACHE_URL 时的 locmem）时，一个 worker 更换的版本号
+其他 worker 看不到，此时改用用户表上的数据版本号（users.data_version）：
+用户数据变更提交后递增（见 apps.realtime.events），读取为一次主键查询。
+"""
+
+from django.conf import settings
+from django.db import router
+from django.db.models import F
+
+PROCESS_LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+
+def is_shared():
+    """默认缓存是否在进程间共享"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_BACKENDS
+
+
+def _users():
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    # 读写都走主库，避免从只读副本读到旧版本号
+    return User.objects.using(router.db_for_write(User))
+
+
+def bump_user_version(user_id):
+    """递增用户的数据版本号，默认缓存共享时不需要"""
+    if not is_shared():
+        _users().filter(pk=user_id).update(data_version=F('data_version') + 1)
+
+
+def user_version(user_id):
+    """用户的数据版本号"""
+    return _users().filter(pk=user_id).values_list('data_version', flat=True).first()
@@ -0,0 +1,75 @@
+from django.db import connections, router
+from django.db.models import sql
+
+
+def delete_rows(model, pks, using, batch_size=500):
+    """
+    按主键直接执行 DELETE，不收集级联对象、不触发信号，返回删除的行数
+
+    用于在表之间移动数据（调用方自行维护关联数据），主键分批写入 IN 条件。
+    """
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    table, column = qn(model._meta.db_table), qn(model._meta.pk.column)
+    pks = list(pks)
+    deleted = 0
+    with connection.cursor() as cursor:
+        for start in range(0, len(pks), batch_size):
+            chunk = pks[start:start + batch_size]
+            cursor.execute(f'DELETE FROM {table} WHERE {column} IN ({", ".join(["%s"] * len(chunk))})', chunk)
+            deleted += cursor.rowcount
+    return deleted
+
+
+def update_returning(queryset, **values):
+    """
+    执行单条 UPDATE，并在同一次往返中返回更新后的行（模型实例列表）
+
+    后端支持 RETURNING（PostgreSQL、SQLite 3.35+）时直接在 UPDATE 后追加，
+    否则退化为 UPDATE + SELECT。
+    """
+    model = queryset.model
+    db = router.db_for_write(model) or 'default'
+    connection = connections[db]
+
+    if not connection.features.can_return_rows_from_bulk_insert:
+        pks = list(queryset.using(db).values_list('pk', flat=True))
+        if not pks:
+            return []
+        model._base_manager.using(db).filter(pk__in=pks).update(**values)
+        return list(model._base_manager.using(db).filter(pk__in=pks))
+
+    query = queryset.query.chain(sql.UpdateQuery)
+    query.add_update_values(values)
+    query.annotations = {}
+    query.clear_ordering(force=True)
+    compiler = query.get_compiler(db)
+    compiler.pre_sql_setup()
+    update_sql, params = compiler.as_sql()
+    if not update_sql:
+        return []
+
+    fields = model._meta.concrete_fields
+    qn = connection.ops.quote_name
+    returning = ', '.join(qn(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        cursor.execute(f'{update_sql} RETURNING {returning}', params)
+        rows = cursor.fetchall()
+
+    # 与 ORM 查询一样应用数据库值转换（如 SQLite 的日期时间、布尔值）
+    converters = []
+    for index, field in enumerate(fields):
+        col = field.get_col(model._meta.db_table)
+        field_converters = connection.ops.get_db_converters(col) + col.get_db_converters(connection)
+        if field_converters:
+            converters.append((index, col, field_converters))
+
+    field_names = [field.attname for field in fields]
+    instances = []
+    for row in rows:
+        row = list(row)
+        for index, col, field_converters in converters:
+            for converter in field_converters:
+                row[index] = converter(row[index], col, connection)
+        instances.append(model.from_db(db, field_names, row))
+    return instances
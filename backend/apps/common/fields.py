@@ -0,0 +1,56 @@
+from django.core.exceptions import ValidationError
+from django.db import models
+
+
+class ChoiceCodeField(models.PositiveSmallIntegerField):
+    """
+    以小整数存储、以字符串取值读写的选项字段
+
+    存储值为取值在 choices 中的下标，因此排序和范围查询按 choices 的顺序进行，
+    如 priority__gte='medium'。Python 和 API 中仍然使用字符串取值。
+    已有数据依赖下标，新增选项只能追加到 choices 末尾。
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.codes = {value: index for index, (value, _) in enumerate(self.choices or [])}
+
+    @property
+    def validators(self):
+        # 取值为字符串，不使用整数范围校验
+        return [*self.default_validators, *self._validators]
+
+    def from_db_value(self, value, expression, connection):
+        if value is None or not 0 <= value < len(self.choices):
+            # 超出范围的存储值原样返回，不影响读取
+            return value
+        return self.choices[value][0]
+
+    def to_python(self, value):
+        if value is None or value in self.codes:
+            return value
+        if isinstance(value, int) and 0 <= value < len(self.choices):
+            return self.choices[value][0]
+        raise ValidationError(
+            self.error_messages['invalid_choice'],
+            code='invalid_choice',
+            params={'value': value},
+        )
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return value
+        if isinstance(value, int) and not isinstance(value, bool):
+            if 0 <= value < len(self.choices):
+                return value
+        else:
+            try:
+                return self.codes[value]
+            except (KeyError, TypeError):
+                pass
+        raise ValidationError(
+            self.error_messages['invalid_choice'],
+            code='invalid_choice',
+            params={'value': value},
+        )
@@ -0,0 +1,20 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from .routers import pin_to_primary
+
+
+class ReplicaStickinessMiddleware:
+    """
+    写请求成功后，在粘滞窗口内让该用户的读请求走主库
+
+    DRF 认证后会把用户写回 Django 请求，因此响应阶段可以拿到 JWT 用户。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request, response)
+        return response
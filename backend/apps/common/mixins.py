@@ -0,0 +1,100 @@
+from rest_framework.permissions import SAFE_METHODS
+
+from .routers import is_pinned_to_primary, use_replica
+
+
+def parse_field_list(value):
+    """将逗号分隔的查询参数解析为字段集合"""
+    if value is None:
+        return None
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    稀疏字段视图混入
+
+    读取 ?fields= / ?omit= / ?expand= 参数，传递给序列化器，
+    并对未请求的模型字段执行 defer，避免加载无用的列。
+    仅对只读请求生效，写请求始终使用完整字段。
+    """
+
+    def get_sparse_fieldset(self):
+        """返回 (fields, omit, expand)，未指定的参数为 None"""
+        if not hasattr(self, '_sparse_fieldset'):
+            params = self.request.query_params
+            if self.request.method in SAFE_METHODS:
+                self._sparse_fieldset = (
+                    parse_field_list(params.get('fields')),
+                    parse_field_list(params.get('omit')),
+                    parse_field_list(params.get('expand')),
+                )
+            else:
+                self._sparse_fieldset = (None, None, None)
+        return self._sparse_fieldset
+
+    def get_requested_fields(self):
+        """返回本次请求实际输出的字段集合"""
+        fields, omit, _ = self.get_sparse_fieldset()
+        requested = set(self.get_serializer_class().Meta.fields)
+        if fields is not None:
+            requested &= fields
+        if omit:
+            requested -= omit
+        return requested
+
+    def wants_field(self, name):
+        return name in self.get_requested_fields()
+
+    def is_expanded(self, name):
+        _, _, expand = self.get_sparse_fieldset()
+        return self.wants_field(name) and (expand is None or name in expand)
+
+    def defer_unrequested_fields(self, queryset):
+        """对序列化器会输出但本次未请求的模型列执行 defer"""
+        serializer_fields = set(self.get_serializer_class().Meta.fields)
+        requested = self.get_requested_fields()
+        model = queryset.model
+        deferred = [
+            field.name for field in model._meta.concrete_fields
+            if not field.primary_key
+            and field.name in serializer_fields
+            and field.name not in requested
+        ]
+        if deferred:
+            queryset = queryset.defer(*deferred)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        fields, omit, expand = self.get_sparse_fieldset()
+        kwargs.setdefault('fields', fields)
+        kwargs.setdefault('omit', omit)
+        kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
+
+
+class ReplicaReadMixin:
+    """
+    只读副本视图混入
+
+    replica_actions 中的只读 action 在只读副本上执行，
+    用户处于写后粘滞窗口内时仍走主库。
+    """
+    replica_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        self._replica_context = None
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and self.action in self.replica_actions
+            and not is_pinned_to_primary(request)
+        ):
+            self._replica_context = use_replica()
+            self._replica_context.__enter__()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if getattr(self, '_replica_context', None) is not None:
+            self._replica_context.__exit__(None, None, None)
+            self._replica_context = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,76 @@
+"""
+读写分离数据库路由
+
+只读副本在 settings.DATABASE_REPLICAS 中声明。读请求默认仍走主库，
+由视图通过 use_replica() 显式切换；用户写入后的一段时间内，
+其读请求固定走主库（read-your-writes）。
+"""
+
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+STICKY_COOKIE = 'db_primary_until'
+
+_read_alias = contextvars.ContextVar('read_alias', default=None)
+
+
+class ReplicaRouter:
+    """将处于 use_replica() 上下文中的读操作路由到只读副本"""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本与主库数据相同，允许跨库关联
+        return True
+
+
+@contextmanager
+def use_replica():
+    """在上下文中将读操作路由到随机选择的只读副本"""
+    replicas = getattr(settings, 'DATABASE_REPLICAS', [])
+    token = _read_alias.set(random.choice(replicas) if replicas else None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def _sticky_key(user_id):
+    return f'db:primary:{user_id}'
+
+
+def is_pinned_to_primary(request):
+    """用户最近有写入时，读请求需要走主库"""
+    # 批量请求中的子请求需要读到同一批次中的写入
+    if getattr(request, 'in_batch', False):
+        return True
+    try:
+        if float(request.COOKIES.get(STICKY_COOKIE, 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return cache.get(_sticky_key(user.pk)) is not None
+    return False
+
+
+def pin_to_primary(request, response):
+    """写入后在缓存和 cookie 中记录主库粘滞窗口"""
+    seconds = settings.REPLICA_STICKY_SECONDS
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(_sticky_key(user.pk), 1, seconds)
+    response.set_cookie(
+        STICKY_COOKIE, str(time.time() + seconds),
+        max_age=seconds, httponly=True, samesite='Lax'
+    )
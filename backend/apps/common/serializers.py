@@ -0,0 +1,68 @@
+from rest_framework import serializers
+from rest_framework.serializers import raise_errors_on_nested_writes
+from rest_framework.utils import model_meta
+
+
+class DynamicFieldsMixin:
+    """
+    动态字段序列化器混入
+
+    支持通过 fields / omit / expand 参数裁剪输出字段：
+    - fields: 只保留列出的字段
+    - omit: 去掉列出的字段
+    - expand: 只展开列出的嵌套字段，其余可展开字段只返回主键；
+      为 None 时保持原有行为，全部展开
+    """
+
+    def __init__(self, *args, fields=None, omit=None, expand=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._expand = expand
+
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+        for name in omit or ():
+            self.fields.pop(name, None)
+
+    def is_expanded(self, name):
+        """判断嵌套字段是否需要展开"""
+        return self._expand is None or name in self._expand
+
+
+class UpdateFieldsMixin:
+    """
+    更新时只写入本次修改的列
+
+    与 ModelSerializer.update 行为一致，但使用 save(update_fields=...)，
+    避免整行回写覆盖并发修改的其他字段。
+    """
+
+    def update(self, instance, validated_data):
+        raise_errors_on_nested_writes('update', self, validated_data)
+        info = model_meta.get_field_info(instance)
+
+        update_fields = []
+        m2m_fields = []
+        for attr, value in validated_data.items():
+            if attr in info.relations and info.relations[attr].to_many:
+                m2m_fields.append((attr, value))
+            else:
+                setattr(instance, attr, value)
+                update_fields.append(attr)
+
+        # auto_now 字段需要显式加入才会更新
+        update_fields += [
+            field.name for field in instance._meta.concrete_fields
+            if getattr(field, 'auto_now', False)
+        ]
+        instance.save(update_fields=update_fields)
+
+        for attr, value in m2m_fields:
+            getattr(instance, attr).set(value)
+
+        return instance
+
+
+class DynamicFieldsModelSerializer(DynamicFieldsMixin, UpdateFieldsMixin, serializers.ModelSerializer):
+    pass
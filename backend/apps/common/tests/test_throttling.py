@@ -0,0 +1,79 @@
+import pytest
+from django.core.cache import cache
+
+from apps.common.throttling import consume, parse_rate
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def throttle(settings):
+    # 补充速率很低，测试期间可以忽略补充的令牌
+    settings.THROTTLE = {
+        'ENABLED': True,
+        'USER_RATE': '1/day', 'USER_BURST': 20,
+        'IP_RATE': '1/day', 'IP_BURST': 3,
+    }
+    return settings.THROTTLE
+
+
+def tokens(key):
+    return cache.get(key)[0]
+
+
+def test_parse_rate():
+    assert parse_rate('600/min') == 10
+    assert parse_rate('2/s') == 2
+    assert parse_rate('86400/day') == 1
+
+
+def test_bucket_drains_and_refills():
+    assert consume('bucket', 3, 1, 2, now=100) == (True, 1, 0)
+    allowed, left, wait = consume('bucket', 3, 1, 2, now=100)
+    assert not allowed and left == 1 and wait == 1
+    # 1 秒后补充 1 个令牌
+    assert consume('bucket', 3, 1, 2, now=101)[0]
+
+
+def test_cost_above_capacity_is_capped():
+    assert consume('bucket', 3, 1, 10, now=100) == (True, 0, 0)
+
+
+def test_refund_never_exceeds_capacity():
+    consume('bucket', 3, 1, 1, now=100)
+    assert consume('bucket', 3, 1, -1, now=100)[1] == 3
+    assert consume('bucket', 3, 1, -5, now=100)[1] == 3
+
+
+@pytest.mark.django_db
+def test_user_tokens_refunded_when_ip_bucket_rejects(api_client, user, throttle):
+    for _ in range(3):
+        assert api_client.get('/api/projects/').status_code == 200
+    response = api_client.get('/api/projects/')
+    assert response.status_code == 429
+    assert int(response['Retry-After']) > 0
+    # 被 IP 桶拒绝的请求不消耗用户桶
+    assert tokens(f'throttle:user:{user.pk}') == pytest.approx(17)
+
+
+@pytest.mark.django_db
+def test_user_bucket_rejection_does_not_touch_ip_bucket(api_client, user, throttle):
+    throttle.update(USER_BURST=12, IP_BURST=100)
+    # statistics 消耗 10 个令牌
+    assert api_client.get('/api/tasks/statistics/').status_code == 200
+    assert api_client.get('/api/tasks/statistics/').status_code == 429
+    assert tokens(f'throttle:user:{user.pk}') == pytest.approx(2)
+    assert tokens('throttle:ip:127.0.0.1') == pytest.approx(90)
+    assert api_client.get('/api/projects/').status_code == 200
+
+
+@pytest.mark.django_db
+def test_disabled_throttle_allows_everything(api_client, throttle):
+    throttle['ENABLED'] = False
+    for _ in range(5):
+        assert api_client.get('/api/projects/').status_code == 200
@@ -0,0 +1,161 @@
+"""
+令牌桶限流
+
+每个用户、每个 IP 各有一个令牌桶，按固定速率补充令牌，容量即允许的突发量。
+请求按视图声明的 throttle_costs 消耗令牌，开销大的接口消耗更多。
+
+桶状态保存在默认缓存中：Redis 通过 Lua 脚本原子更新，
+其他缓存（如 locmem）在进程内加锁后读改写。
+"""
+
+import math
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'sec': 1, 'm': 60, 'min': 60, 'h': 3600, 'hour': 3600, 'd': 86400, 'day': 86400}
+
+# 返回 {是否允许, 剩余令牌, 需要等待的秒数}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local cost = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= cost then
+    tokens = math.min(capacity, tokens - cost)
+    allowed = 1
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+_lock = threading.Lock()
+
+# 当前 worker 的限流计数，{(桶类型, action, 结果): 次数}
+counters = Counter()
+
+
+def count(scope, action, result):
+    with _lock:
+        counters[(scope, action, result)] += 1
+
+
+def parse_rate(rate):
+    """'600/min' -> 每秒补充的令牌数"""
+    num, period = rate.split('/')
+    return int(num) / DURATIONS[period.strip().lower()]
+
+
+def _redis_client(key):
+    """默认缓存为 Redis 时返回底层客户端，否则返回 None"""
+    # django.core.cache.backends.redis.RedisCache
+    backend = getattr(cache, '_cache', None)
+    if backend is not None and hasattr(backend, 'get_client'):
+        return backend.get_client(key, write=True)
+    # django_redis.cache.RedisCache
+    client = getattr(cache, 'client', None)
+    if client is not None and hasattr(client, 'get_client'):
+        return client.get_client(write=True)
+    return None
+
+
+def consume(key, capacity, rate, cost, now=None):
+    """
+    从令牌桶中取出 cost 个令牌，返回 (是否允许, 剩余令牌, 需要等待的秒数)
+
+    cost 为负数时退还令牌（不超过容量）。
+    """
+    now = time.time() if now is None else now
+    # 单次开销超过桶容量时按容量计，避免永远无法通过
+    cost = min(cost, capacity)
+    client = _redis_client(key)
+    if client is not None:
+        allowed, tokens, wait = client.eval(
+            TOKEN_BUCKET_SCRIPT, 1, cache.make_and_validate_key(key), capacity, rate, now, cost
+        )
+        return bool(allowed), float(tokens), float(wait)
+
+    timeout = math.ceil(capacity / rate) + 1
+    with _lock:
+        tokens, ts = cache.get(key) or (capacity, now)
+        tokens = min(capacity, tokens + max(0.0, now - ts) * rate)
+        if tokens >= cost:
+            allowed, wait = True, 0.0
+            tokens = min(capacity, tokens - cost)
+        else:
+            allowed, wait = False, (cost - tokens) / rate
+        cache.set(key, (tokens, now), timeout)
+    return allowed, tokens, wait
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    令牌桶限流
+
+    已登录用户同时受用户桶和 IP 桶限制，匿名请求只受 IP 桶限制。
+    视图可通过 throttle_costs = {action: 令牌数} 声明开销，默认消耗 1 个令牌。
+    """
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_cost(self, view):
+        action = getattr(view, 'action', None) or view.request.method.lower()
+        return getattr(view, 'throttle_costs', {}).get(action, 1)
+
+    def get_buckets(self, request):
+        config = settings.THROTTLE
+        buckets = []
+        if request.user and request.user.is_authenticated and config['USER_RATE']:
+            buckets.append(('user', request.user.pk, config['USER_RATE'], config['USER_BURST']))
+        if config['IP_RATE']:
+            buckets.append(('ip', self.get_ident(request), config['IP_RATE'], config['IP_BURST']))
+        return buckets
+
+    def allow_request(self, request, view):
+        if not settings.THROTTLE['ENABLED']:
+            return True
+        cost = self.get_cost(view)
+        action = getattr(view, 'action', None) or view.__class__.__name__
+        now = time.time()
+        consumed = []
+        for scope, ident, rate, burst in self.get_buckets(request):
+            key, refill = f'throttle:{scope}:{ident}', parse_rate(rate)
+            allowed, _, wait = consume(key, burst, refill, cost, now)
+            if not allowed:
+                # 被后面的桶拒绝时退还前面已扣除的令牌
+                for args in consumed:
+                    consume(*args, now)
+                count(scope, action, 'throttled')
+                self.wait_seconds = wait
+                return False
+            consumed.append((key, burst, refill, -min(cost, burst)))
+        count('all', action, 'allowed')
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+def throttle_stats():
+    """当前 worker 的限流计数"""
+    stats = {}
+    with _lock:
+        items = list(counters.items())
+    for (scope, action, result), value in items:
+        name = result if scope == 'all' else f'{scope}_{result}'
+        stats.setdefault(action, {})[name] = value
+    return stats
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import DatabasePoolStatsView, ThrottleStatsView
+
+urlpatterns = [
+    path('db-pool/', DatabasePoolStatsView.as_view(), name='db-pool-stats'),
+    path('throttle/', ThrottleStatsView.as_view(), name='throttle-stats'),
+]
@@ -0,0 +1,58 @@
+import time
+
+from django.db import connections
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .throttling import throttle_stats
+
+
+def connection_stats(alias):
+    """返回单个数据库连接（池）的配置和当前状态"""
+    connection = connections[alias]
+    settings_dict = connection.settings_dict
+    options = settings_dict.get('OPTIONS', {})
+
+    if options.get('pool'):
+        mode = 'pool'
+    elif settings_dict.get('CONN_MAX_AGE'):
+        mode = 'persistent'
+    else:
+        mode = 'per_request'
+
+    stats = {
+        'alias': alias,
+        'vendor': connection.vendor,
+        'mode': mode,
+        'conn_max_age': settings_dict.get('CONN_MAX_AGE'),
+        'conn_health_checks': settings_dict.get('CONN_HEALTH_CHECKS'),
+        'server_side_cursors': not settings_dict.get('DISABLE_SERVER_SIDE_CURSORS', False),
+        'connected': connection.connection is not None,
+    }
+    if connection.close_at is not None:
+        stats['expires_in'] = round(connection.close_at - time.monotonic(), 1)
+
+    # psycopg3 连接池统计（Django 5.1+）
+    pool = getattr(connection, 'pool', None) if mode == 'pool' else None
+    if pool is not None:
+        stats['pool'] = pool.get_stats()
+    return stats
+
+
+class DatabasePoolStatsView(APIView):
+    """数据库连接池状态，仅管理员可见（统计为当前 worker 进程）"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({
+            'databases': [connection_stats(alias) for alias in connections]
+        })
+
+
+class ThrottleStatsView(APIView):
+    """限流计数，仅管理员可见（统计为当前 worker 进程）"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response({'actions': throttle_stats()})
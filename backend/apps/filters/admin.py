@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from apps.sharding.admin import ShardedModelAdmin
+from .models import SavedFilter
+
+
+@admin.register(SavedFilter)
+class SavedFilterAdmin(ShardedModelAdmin):
+    list_display = ['name', 'user', 'order', 'created_at']
+    search_fields = ['name']
@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class FiltersConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.filters'
+    verbose_name = '智能清单'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,59 @@
+"""
+智能清单侧边栏计数
+
+用户所有清单的数量在一次聚合查询中计算（COUNT(*) FILTER (WHERE ...)），
+结果按用户缓存，任务、标签或清单变更后失效。默认缓存为进程内缓存时，
+其他 worker 的失效不可见，缓存键中加入用户的数据版本号（见 apps.common.cache）。
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from apps.common import cache as shared_cache
+from apps.metrics.registry import cache_lookup
+from apps.tasks.models import Task
+from .dsl import FilterError, compile_query
+from .models import SavedFilter
+
+
+def cache_key(user_id):
+    # 清单中可能包含“今天”等相对时间，按日期区分缓存
+    key = f'saved_filters:counts:{user_id}:{timezone.localdate().isoformat()}'
+    if not shared_cache.is_shared():
+        key += f':{shared_cache.user_version(user_id)}'
+    return key
+
+
+def invalidate(user_id):
+    if shared_cache.is_shared():
+        cache.delete(cache_key(user_id))
+
+
+def compute_counts(user_id):
+    """返回 {清单ID: 任务数}，条件不合法的清单计为 None"""
+    now = timezone.now()
+    counts, aggregates = {}, {}
+    for saved_filter in SavedFilter.objects.filter(user_id=user_id).only('id', 'query'):
+        try:
+            condition = compile_query(saved_filter.query, now)
+        except FilterError:
+            counts[saved_filter.pk] = None
+            continue
+        aggregates[f'filter_{saved_filter.pk}'] = Count('pk', filter=condition)
+
+    if aggregates:
+        totals = Task.objects.filter(user_id=user_id, is_deleted=False).aggregate(**aggregates)
+        for alias, total in totals.items():
+            counts[int(alias.removeprefix('filter_'))] = total
+    return counts
+
+
+def get_counts(user_id):
+    counts = cache.get(cache_key(user_id))
+    cache_lookup('filter_counts', counts is not None)
+    if counts is None:
+        counts = compute_counts(user_id)
+        cache.set(cache_key(user_id), counts, settings.SAVED_FILTER_COUNTS_TIMEOUT)
+    return counts
@@ -0,0 +1,229 @@
+"""
+智能清单筛选 DSL
+
+筛选条件为 JSON，编译为作用于 Task 的 Q 对象：
+
+    {"and": [条件, ...]}  {"or": [条件, ...]}  {"not": 条件}
+    {"field": 字段, "op": 操作符, "value": 值}
+
+字段与操作符：
+    status       eq / ne / in
+    priority     eq / ne / in / gt / gte / lt / lte（按 none < low < medium < high 比较）
+    project      eq / in / isnull
+    tag          any / all / none（值为标签ID列表）
+    due_date、start_date、completed_at、created_at
+                 before / after / between（日期或时间）、within（相对区间）、isnull
+    is_starred   eq
+    title        contains
+
+标签条件编译为 EXISTS 子查询，不会因关联多个标签而产生重复行；
+子查询带上分区键 user_id，分区表上只扫描一个分区。
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from apps.tags.models import TaskTag
+from apps.tasks.models import Task
+
+MAX_DEPTH = 6
+MAX_CONDITIONS = 50
+
+PRIORITY_RANK = [value for value, _ in Task.PRIORITY_CHOICES]
+STATUS_VALUES = [value for value, _ in Task.STATUS_CHOICES]
+DATE_FIELDS = ('due_date', 'start_date', 'completed_at', 'created_at')
+RELATIVE_RANGES = ('today', 'tomorrow', 'this_week', 'next_7_days', 'past', 'future')
+
+FIELD_OPS = {
+    'status': {'eq', 'ne', 'in'},
+    'priority': {'eq', 'ne', 'in', 'gt', 'gte', 'lt', 'lte'},
+    'project': {'eq', 'in', 'isnull'},
+    'tag': {'any', 'all', 'none'},
+    'is_starred': {'eq'},
+    'title': {'contains'},
+    **{field: {'before', 'after', 'between', 'within', 'isnull'} for field in DATE_FIELDS},
+}
+
+
+class FilterError(ValueError):
+    """筛选条件不合法"""
+
+
+def compile_query(query, now=None):
+    """编译筛选条件，返回 Q；不合法时抛出 FilterError"""
+    compiler = _Compiler(now or timezone.now())
+    if query in (None, {}):
+        return Q()
+    return compiler.node(query, 0)
+
+
+def validate_query(query):
+    compile_query(query)
+    return query
+
+
+class _Compiler:
+    def __init__(self, now):
+        self.now = now
+        self.conditions = 0
+
+    def node(self, node, depth):
+        if not isinstance(node, dict):
+            raise FilterError('条件必须是对象')
+        if depth > MAX_DEPTH:
+            raise FilterError(f'条件嵌套不能超过 {MAX_DEPTH} 层')
+
+        if 'and' in node or 'or' in node:
+            key = 'and' if 'and' in node else 'or'
+            children = node[key]
+            if len(node) != 1 or not isinstance(children, list) or not children:
+                raise FilterError(f'{key} 必须是非空列表')
+            result = Q()
+            for child in children:
+                compiled = self.node(child, depth + 1)
+                result = result & compiled if key == 'and' else result | compiled
+            return result
+
+        if 'not' in node:
+            if len(node) != 1:
+                raise FilterError('not 只能包含一个条件')
+            return ~self.node(node['not'], depth + 1)
+
+        self.conditions += 1
+        if self.conditions > MAX_CONDITIONS:
+            raise FilterError(f'条件数量不能超过 {MAX_CONDITIONS} 个')
+        return self.leaf(node)
+
+    def leaf(self, node):
+        field, op, value = node.get('field'), node.get('op'), node.get('value')
+        if set(node) - {'field', 'op', 'value'}:
+            raise FilterError('条件只能包含 field、op、value')
+        if field not in FIELD_OPS:
+            raise FilterError(f'不支持的字段: {field}')
+        if op not in FIELD_OPS[field]:
+            raise FilterError(f'字段 {field} 不支持操作符 {op}')
+
+        if field == 'status':
+            return self.choice('status', op, value, STATUS_VALUES)
+        if field == 'priority':
+            return self.priority(op, value)
+        if field == 'project':
+            return self.project(op, value)
+        if field == 'tag':
+            return self.tag(op, value)
+        if field == 'is_starred':
+            if not isinstance(value, bool):
+                raise FilterError('is_starred 的值必须是布尔值')
+            return Q(is_starred=value)
+        if field == 'title':
+            if not isinstance(value, str) or not value:
+                raise FilterError('title 的值必须是非空字符串')
+            return Q(title__icontains=value)
+        return self.date(field, op, value)
+
+    def choice(self, field, op, value, allowed):
+        values = value if op == 'in' else [value]
+        if not isinstance(values, list) or not values or any(v not in allowed for v in values):
+            raise FilterError(f'{field} 的值必须是 {", ".join(allowed)} 之一')
+        if op == 'ne':
+            return ~Q(**{field: value})
+        return Q(**{f'{field}__in': values})
+
+    def priority(self, op, value):
+        if op in ('eq', 'ne', 'in'):
+            return self.choice('priority', op, value, PRIORITY_RANK)
+        if value not in PRIORITY_RANK:
+            raise FilterError(f'priority 的值必须是 {", ".join(PRIORITY_RANK)} 之一')
+        # 优先级以整数存储，比较直接作用于整数列
+        return Q(**{f'priority__{op}': value})
+
+    def ids(self, field, value):
+        if (
+            not isinstance(value, list) or not value
+            or not all(isinstance(v, int) and not isinstance(v, bool) for v in value)
+        ):
+            raise FilterError(f'{field} 的值必须是非空ID列表')
+        return value
+
+    def project(self, op, value):
+        if op == 'isnull':
+            if not isinstance(value, bool):
+                raise FilterError('isnull 的值必须是布尔值')
+            return Q(project__isnull=value)
+        ids = self.ids('project', value if op == 'in' else [value])
+        return Q(project_id__in=ids)
+
+    def tag(self, op, value):
+        ids = self.ids('tag', value)
+        task_tags = TaskTag.objects.filter(task_id=OuterRef('pk'), user_id=OuterRef('user_id'))
+        if op == 'any':
+            return Q(Exists(task_tags.filter(tag_id__in=ids)))
+        if op == 'none':
+            return ~Q(Exists(task_tags.filter(tag_id__in=ids)))
+        result = Q()
+        for tag_id in ids:
+            result &= Q(Exists(task_tags.filter(tag_id=tag_id)))
+        return result
+
+    def date(self, field, op, value):
+        if op == 'isnull':
+            if not isinstance(value, bool):
+                raise FilterError('isnull 的值必须是布尔值')
+            return Q(**{f'{field}__isnull': value})
+        if op == 'within':
+            start, end = self.relative(value)
+        elif op == 'between':
+            if not isinstance(value, list) or len(value) != 2:
+                raise FilterError('between 的值必须是 [开始, 结束]')
+            start, _ = self.moment(value[0])
+            _, end = self.moment(value[1])
+        elif op == 'before':
+            start, end = None, self.moment(value)[0]
+        else:
+            start, end = self.moment(value)[1], None
+
+        q = Q()
+        if start is not None:
+            q &= Q(**{f'{field}__gte': start})
+        if end is not None:
+            q &= Q(**{f'{field}__lt': end})
+        return q
+
+    def moment(self, value):
+        """解析日期或时间，返回覆盖的区间 [开始, 结束)；时间值的区间为该时刻"""
+        if not isinstance(value, str):
+            raise FilterError('日期格式应为 YYYY-MM-DD 或 ISO 8601 时间')
+        # 先按日期解析：parse_datetime 也接受纯日期（当天零点），after/between 会少算一天
+        try:
+            day = parse_date(value)
+            moment = None if day is not None else parse_datetime(value)
+        except ValueError:
+            moment = day = None
+        if moment is not None:
+            if timezone.is_naive(moment):
+                moment = timezone.make_aware(moment)
+            return moment, moment
+        if day is not None:
+            start = timezone.make_aware(datetime.combine(day, time.min))
+            return start, start + timedelta(days=1)
+        raise FilterError('日期格式应为 YYYY-MM-DD 或 ISO 8601 时间')
+
+    def relative(self, value):
+        if value not in RELATIVE_RANGES:
+            raise FilterError(f'within 的值必须是 {", ".join(RELATIVE_RANGES)} 之一')
+        if value == 'past':
+            return None, self.now
+        if value == 'future':
+            return self.now, None
+        today = timezone.localdate(self.now)
+        start_day, days = {
+            'today': (today, 1),
+            'tomorrow': (today + timedelta(days=1), 1),
+            'this_week': (today - timedelta(days=today.weekday()), 7),
+            'next_7_days': (today, 7),
+        }[value]
+        start = timezone.make_aware(datetime.combine(start_day, time.min))
+        return start, start + timedelta(days=days)
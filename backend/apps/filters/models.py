@@ -0,0 +1,31 @@
+from django.db import models
+from django.conf import settings
+
+
+class SavedFilter(models.Model):
+    """
+    智能清单（保存的任务筛选条件）
+
+    query 为筛选 DSL，见 apps.filters.dsl。
+    """
+    name = models.CharField(max_length=100, verbose_name='名称')
+    query = models.JSONField(default=dict, verbose_name='筛选条件')
+    color = models.CharField(max_length=7, default='#6366F1', verbose_name='颜色')
+    order = models.IntegerField(default=0, verbose_name='排序')
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='saved_filters',
+        verbose_name='所属用户'
+    )
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'saved_filters'
+        verbose_name = '智能清单'
+        verbose_name_plural = verbose_name
+        ordering = ['order', 'id']
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from .dsl import FilterError, validate_query
+from .models import SavedFilter
+
+
+class SavedFilterSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SavedFilter
+        fields = ['id', 'name', 'query', 'color', 'order', 'user', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+
+    def validate_query(self, value):
+        try:
+            return validate_query(value)
+        except FilterError as exc:
+            raise serializers.ValidationError(str(exc))
@@ -0,0 +1,22 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.common.cache import bump_user_version
+from apps.realtime.events import data_changed
+from . import counts
+from .models import SavedFilter
+
+
+@receiver(data_changed)
+def invalidate_counts_on_change(sender, user_id, **kwargs):
+    counts.invalidate(user_id)
+
+
+@receiver(post_save, sender=SavedFilter)
+@receiver(post_delete, sender=SavedFilter)
+def invalidate_counts_on_filter_change(sender, instance, using='default', **kwargs):
+    counts.invalidate(instance.user_id)
+    # 清单不经过 notify_change，提交后单独递增数据版本号
+    user_id = instance.user_id
+    transaction.on_commit(lambda: bump_user_version(user_id), using=using, robust=True)
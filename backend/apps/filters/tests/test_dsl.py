@@ -0,0 +1,143 @@
+from datetime import datetime
+
+import pytest
+from django.utils import timezone
+
+from apps.filters.dsl import MAX_CONDITIONS, MAX_DEPTH, FilterError, compile_query
+from apps.projects.models import Project
+from apps.tags.models import Tag, TaskTag
+from apps.tasks.models import Task
+
+
+def at(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+def leaf(field, op, value):
+    return {'field': field, 'op': op, 'value': value}
+
+
+def nested(depth):
+    query = leaf('is_starred', 'eq', True)
+    for _ in range(depth):
+        query = {'not': query}
+    return query
+
+
+@pytest.mark.parametrize('query', [
+    [],
+    {'and': []},
+    {'or': leaf('is_starred', 'eq', True)},
+    {'and': [leaf('is_starred', 'eq', True)], 'or': [leaf('is_starred', 'eq', True)]},
+    {'not': leaf('is_starred', 'eq', True), 'field': 'title'},
+    leaf('owner', 'eq', 1),
+    leaf('status', 'gt', 'todo'),
+    leaf('status', 'eq', 'done'),
+    leaf('status', 'in', []),
+    leaf('priority', 'gte', 'urgent'),
+    leaf('project', 'in', [1, True]),
+    leaf('tag', 'any', []),
+    leaf('is_starred', 'eq', 'yes'),
+    leaf('title', 'contains', ''),
+    leaf('due_date', 'before', '2024-13-01'),
+    leaf('due_date', 'between', ['2024-01-01']),
+    leaf('due_date', 'within', 'next_month'),
+    leaf('due_date', 'isnull', 'true'),
+    {'field': 'title', 'op': 'contains', 'value': 'a', 'extra': 1},
+    nested(MAX_DEPTH + 1),
+    {'or': [leaf('is_starred', 'eq', True)] * (MAX_CONDITIONS + 1)},
+])
+def test_invalid_queries_raise_filter_error(query):
+    with pytest.raises(FilterError):
+        compile_query(query)
+
+
+def test_empty_query_matches_everything():
+    assert compile_query(None) == compile_query({})
+    compile_query(nested(MAX_DEPTH))
+
+
+@pytest.mark.django_db
+class TestCompiledQueries:
+    @pytest.fixture(autouse=True)
+    def data(self, user, make_user):
+        self.project = Project.objects.create(user=user, name='工作')
+        self.tags = [Tag.objects.create(user=user, name=name) for name in ('a', 'b')]
+        self.tasks = {}
+        for title, fields, tags in [
+            ('report', {'priority': 'high', 'project': self.project, 'due_date': at(2024, 1, 1, 23, 30)}, [0, 1]),
+            ('review', {'priority': 'medium', 'status': 'in_progress', 'due_date': at(2024, 1, 2, 0, 0)}, [0]),
+            ('cleanup', {'priority': 'low', 'status': 'completed', 'is_starred': True}, [1]),
+            ('idea', {}, []),
+        ]:
+            task = Task.objects.create(user=user, title=title, **fields)
+            for index in tags:
+                TaskTag.objects.create(task=task, tag=self.tags[index], user=user)
+            self.tasks[title] = task
+        # 其他用户的任务不应影响结果（标签子查询按 user_id 关联）
+        Task.objects.create(user=make_user(), title='other', priority='high')
+        self.user = user
+
+    def titles(self, query, now=None):
+        queryset = Task.objects.filter(user=self.user).filter(compile_query(query, now=now))
+        titles = list(queryset.values_list('title', flat=True))
+        assert len(titles) == len(set(titles)), '标签条件不应产生重复行'
+        return sorted(titles)
+
+    def test_priority_compares_by_rank(self):
+        assert self.titles(leaf('priority', 'gte', 'medium')) == ['report', 'review']
+        assert self.titles(leaf('priority', 'lt', 'low')) == ['idea']
+
+    def test_status_ne_and_in(self):
+        assert self.titles(leaf('status', 'ne', 'completed')) == ['idea', 'report', 'review']
+        assert self.titles(leaf('status', 'in', ['completed', 'in_progress'])) == ['cleanup', 'review']
+
+    def test_tags_any_all_none(self):
+        a, b = (tag.pk for tag in self.tags)
+        assert self.titles(leaf('tag', 'any', [a, b])) == ['cleanup', 'report', 'review']
+        assert self.titles(leaf('tag', 'all', [a, b])) == ['report']
+        assert self.titles(leaf('tag', 'none', [a])) == ['cleanup', 'idea']
+
+    def test_project(self):
+        assert self.titles(leaf('project', 'eq', self.project.pk)) == ['report']
+        assert self.titles(leaf('project', 'isnull', True)) == ['cleanup', 'idea', 'review']
+
+    def test_dates_cover_whole_local_days(self):
+        assert self.titles(leaf('due_date', 'before', '2024-01-02')) == ['report']
+        assert self.titles(leaf('due_date', 'after', '2024-01-01')) == ['review']
+        assert self.titles(leaf('due_date', 'between', ['2024-01-01', '2024-01-02'])) == ['report', 'review']
+        assert self.titles(leaf('due_date', 'after', '2024-01-01T23:30:00')) == ['report', 'review']
+        assert self.titles(leaf('due_date', 'isnull', True)) == ['cleanup', 'idea']
+
+    def test_relative_ranges_use_given_now(self):
+        now = at(2024, 1, 1, 12)
+        assert self.titles(leaf('due_date', 'within', 'today'), now=now) == ['report']
+        assert self.titles(leaf('due_date', 'within', 'tomorrow'), now=now) == ['review']
+        assert self.titles(leaf('due_date', 'within', 'past'), now=now) == []
+        assert self.titles(leaf('due_date', 'within', 'next_7_days'), now=now) == ['report', 'review']
+
+    def test_boolean_combinations(self):
+        query = {'or': [
+            {'and': [leaf('is_starred', 'eq', True), leaf('title', 'contains', 'CLEAN')]},
+            {'not': {'or': [leaf('priority', 'ne', 'medium'), leaf('status', 'eq', 'todo')]}},
+        ]}
+        assert self.titles(query) == ['cleanup', 'review']
+
+
+@pytest.mark.django_db
+def test_saved_filter_api_validates_and_counts_follow_writes(api_client, django_capture_on_commit_callbacks):
+    response = api_client.post('/api/filters/', {'name': 'x', 'query': leaf('status', 'eq', 'done')}, format='json')
+    assert response.status_code == 400
+    assert 'query' in response.data
+
+    response = api_client.post('/api/filters/', {'name': '高优先级', 'query': leaf('priority', 'gte', 'high')}, format='json')
+    assert response.status_code == 201
+    pk = str(response.data['id'])
+    assert api_client.get('/api/filters/counts/').data == {pk: 0}
+
+    # 计数缓存在事务提交后失效
+    with django_capture_on_commit_callbacks(execute=True):
+        api_client.post('/api/tasks/', {'title': 't', 'priority': 'high'}, format='json')
+    assert api_client.get('/api/filters/counts/').data == {pk: 1}
+    response = api_client.get(f'/api/tasks/?saved_filter={pk}')
+    assert [task['title'] for task in response.data['results']] == ['t']
@@ -0,0 +1,10 @@
+from django.urls import path, include
+from rest_framework.routers import DefaultRouter
+from .views import SavedFilterViewSet
+
+router = DefaultRouter()
+router.register(r'', SavedFilterViewSet, basename='saved-filter')
+
+urlpatterns = [
+    path('', include(router.urls)),
+]
@@ -0,0 +1,22 @@
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from .counts import get_counts
+from .models import SavedFilter
+from .serializers import SavedFilterSerializer
+
+
+class SavedFilterViewSet(viewsets.ModelViewSet):
+    serializer_class = SavedFilterSerializer
+
+    def get_queryset(self):
+        return SavedFilter.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        """所有清单的任务数（缓存到下一次写入）"""
+        counts = get_counts(request.user.pk)
+        return Response({str(pk): count for pk, count in counts.items()})
@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# 在新进程中按 gunicorn 的顺序加载应用并预热，结果以 JSON 输出到 stdout
+SCRIPT = '''
+import json, os, resource, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
+import todo_project.wsgi
+loaded = time.perf_counter() - start
+loaded_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+from todo_project import warmup
+steps = warmup.run()
+print(json.dumps({
+    'loaded': loaded,
+    'loaded_rss': loaded_rss,
+    'steps': steps,
+    'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """解析 -X importtime 的输出，返回 [(模块, 自身微秒, 累计微秒)]"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        modules.append((parts[2].strip(), int(parts[0]), int(parts[1])))
+    return modules
+
+
+def package(module):
+    parts = module.split('.')
+    # 项目代码按应用分组
+    if parts[0] in ('apps', 'todo_project'):
+        return '.'.join(parts[:2])
+    return parts[0]
+
+
+class Command(BaseCommand):
+    help = '在新进程中加载应用并预热，按包和模块输出导入耗时以及内存占用'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=15, help='每个列表显示的条数')
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT],
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode != 0:
+            raise CommandError(f'加载应用失败：\n{result.stderr[-2000:]}')
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        modules = parse_importtime(result.stderr)
+        limit = options['limit']
+
+        by_package = Counter()
+        for module, self_us, _ in modules:
+            by_package[package(module)] += self_us
+        total = sum(by_package.values())
+
+        self.stdout.write(
+            f'导入 {len(modules)} 个模块，导入耗时 {total / 1e6:.2f}s，'
+            f'加载应用共 {report["loaded"]:.2f}s，峰值 RSS {report["loaded_rss"] / 1024:.1f} MB'
+        )
+        self.stdout.write('\n按包（自身耗时）：')
+        for name, us in by_package.most_common(limit):
+            self.stdout.write(f'  {us / 1000:8.1f}ms  {us / total:6.1%}  {name}')
+
+        self.stdout.write('\n最慢的模块（自身耗时 / 累计耗时）：')
+        for module, self_us, cumulative_us in sorted(modules, key=lambda m: m[1], reverse=True)[:limit]:
+            self.stdout.write(f'  {self_us / 1000:8.1f}ms  {cumulative_us / 1000:8.1f}ms  {module}')
+
+        self.stdout.write('\n预热：')
+        for name, count, seconds in report['steps']:
+            self.stdout.write(f'  {seconds * 1000:8.1f}ms  {name}（{count} 项）')
+        self.stdout.write(f'预热后峰值 RSS {report["rss"] / 1024:.1f} MB')
@@ -0,0 +1,72 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .registry import DB_DURATION, DB_QUERIES, LATENCY, REQUESTS
+
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+
+def view_label(request, view_func):
+    """DRF 视图为 类名.action（如 TaskViewSet.statistics），其他视图为 URL 名称"""
+    cls = getattr(view_func, 'cls', None)
+    if cls is not None:
+        method = request.method.lower()
+        actions = getattr(view_func, 'actions', None) or {}
+        return f'{cls.__name__}.{actions.get(method, method)}'
+    match = request.resolver_match
+    if match is not None and match.app_name == 'admin':
+        return 'admin'
+    return getattr(match, 'view_name', None) or 'other'
+
+
+class QueryStats:
+    """数据库执行包装：统计查询数和耗时"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+class MetricsMiddleware:
+    """
+    记录每个请求的次数、耗时、数据库查询数和查询耗时，按视图和 action 分组
+
+    流式响应只统计到返回响应对象为止。METRICS['ENABLED'] 为 False 时不加载。
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.metrics_view = view_label(request, view_func)
+
+    def __call__(self, request):
+        queries = QueryStats()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        view = getattr(request, 'metrics_view', 'unmatched')
+        method = request.method if request.method in METHODS else 'other'
+        REQUESTS.inc(view, method, str(response.status_code))
+        LATENCY.observe(duration, view, method)
+        DB_QUERIES.observe(queries.count, view)
+        DB_DURATION.observe(queries.duration, view)
+        return response
@@ -0,0 +1,129 @@
+"""
+指标定义与 Prometheus 文本格式输出
+
+计数器和直方图的数值写入当前线程的存储（见 store），直方图每个区间单独计数，
+输出时再累加为 Prometheus 的 le 累计桶。连接状态等瞬时值在抓取时由 gauges() 计算。
+"""
+
+from bisect import bisect_left
+
+from django.db import connections
+
+from apps.common.views import connection_stats
+from . import store
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+_metrics = {}
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_labels(names, values):
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in zip(names, values)) + '}'
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics[name] = self
+
+    def header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class CounterMetric(Metric):
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        store.add((self.name, labelvalues), amount)
+
+    def render(self, samples):
+        lines = self.header()
+        for labelvalues, value in sorted(samples.get(self.name, {}).items()):
+            lines.append(f'{self.name}{format_labels(self.labelnames, labelvalues)} {format_value(value)}')
+        return lines
+
+
+class HistogramMetric(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self.bounds = [format_value(bound) for bound in self.buckets] + ['+Inf']
+
+    def observe(self, value, *labelvalues):
+        bound = self.bounds[bisect_left(self.buckets, value)]
+        store.add((f'{self.name}_bucket', (*labelvalues, bound)), 1)
+        store.add((f'{self.name}_sum', labelvalues), value)
+
+    def render(self, samples):
+        lines = self.header()
+        buckets = samples.get(f'{self.name}_bucket', {})
+        sums = samples.get(f'{self.name}_sum', {})
+        names = (*self.labelnames, 'le')
+        for labelvalues in sorted(sums):
+            cumulative = 0
+            for bound in self.bounds:
+                cumulative += buckets.get((*labelvalues, bound), 0)
+                labels = format_labels(names, (*labelvalues, bound))
+                lines.append(f'{self.name}_bucket{labels} {format_value(cumulative)}')
+            labels = format_labels(self.labelnames, labelvalues)
+            lines.append(f'{self.name}_count{labels} {format_value(cumulative)}')
+            lines.append(f'{self.name}_sum{labels} {format_value(sums[labelvalues])}')
+        return lines
+
+
+REQUESTS = CounterMetric('http_requests_total', '请求数', ['view', 'method', 'status'])
+LATENCY = HistogramMetric('http_request_duration_seconds', '请求耗时（秒）', ['view', 'method'])
+DB_QUERIES = HistogramMetric('http_request_db_queries', '每个请求的数据库查询数', ['view'], QUERY_BUCKETS)
+DB_DURATION = HistogramMetric('http_request_db_duration_seconds', '每个请求的数据库查询总耗时（秒）', ['view'])
+CACHE = CounterMetric('cache_lookups_total', '缓存查找次数，result 为 hit 或 miss', ['cache', 'result'])
+
+
+def cache_lookup(name, hit):
+    CACHE.inc(name, 'hit' if hit else 'miss')
+
+
+def gauges():
+    """当前 worker（处理本次抓取的进程）的数据库连接和连接池状态"""
+    values = {}
+    for alias in connections:
+        stats = connection_stats(alias)
+        values.setdefault('db_connection_open', {})[alias] = stats['connected']
+        # psycopg3 连接池统计，如 pool_size、pool_available、requests_waiting
+        for key, value in stats.get('pool', {}).items():
+            values.setdefault(f'db_{key}', {})[alias] = value
+
+    lines = []
+    for name, by_alias in values.items():
+        lines += [f'# HELP {name} 当前 worker 的数据库连接状态', f'# TYPE {name} gauge']
+        lines += [f'{name}{format_labels(["alias"], [alias])} {format_value(value)}' for alias, value in by_alias.items()]
+    return lines
+
+
+def render():
+    samples = {}
+    for (name, labelvalues), value in store.collect().items():
+        samples.setdefault(name, {})[labelvalues] = value
+    lines = []
+    for metric in _metrics.values():
+        lines += metric.render(samples)
+    lines += gauges()
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,264 @@
+"""
+指标数值存储
+
+每个线程写自己的存储，记录时不加锁：
+- 配置了 METRICS['DIR'] 时为目录下的 mmap 文件（{pid}_{序号}.db），多个 gunicorn worker
+  各写各的文件，/metrics 读取目录下所有文件求和
+- 否则为进程内的字典，只汇总当前进程
+线程退出后其存储交还给进程，由之后新建的线程继续使用，存储数量不超过同时存在的线程数
+（runserver 每个请求一个线程）。
+
+文件格式：开头 8 字节为已用长度，之后依次为 [4 字节键长][JSON 键，补齐到 8 字节][8 字节 double]。
+写入新键时先写条目再更新已用长度，读取方只解析已用长度以内的部分。
+已退出进程的文件在读取时合并到 merged.db 后删除（持文件锁，不影响记录）。
+"""
+
+import fcntl
+import json
+import mmap
+import os
+import struct
+import threading
+import weakref
+from collections import Counter
+
+from django.conf import settings
+
+INITIAL_SIZE = 1 << 16
+HEADER = struct.Struct('Q')
+KEY_LENGTH = struct.Struct('i')
+VALUE = struct.Struct('d')
+MERGED = 'merged.db'
+LOCK = '.lock'
+
+_local = threading.local()
+_memory_stores = []
+# 已退出线程交还的存储，只属于 _pool_pid 进程
+_free_stores = []
+_pool_pid = None
+_created = 0
+_lock = threading.Lock()
+
+
+def encode_key(key):
+    return json.dumps(key, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def decode_key(raw):
+    name, labels = json.loads(raw)
+    return name, tuple(labels)
+
+
+def entry_size(key_length):
+    return KEY_LENGTH.size + key_length + (-(KEY_LENGTH.size + key_length) % 8) + VALUE.size
+
+
+def read_entries(data):
+    """解析文件内容，返回 [(键, 值, 值的偏移)]"""
+    if len(data) < HEADER.size:
+        return []
+    used = min(HEADER.unpack_from(data, 0)[0], len(data))
+    entries, offset = [], HEADER.size
+    while offset + KEY_LENGTH.size <= used:
+        (length,) = KEY_LENGTH.unpack_from(data, offset)
+        value_offset = offset + entry_size(length) - VALUE.size
+        if length <= 0 or value_offset + VALUE.size > used:
+            break
+        key = decode_key(bytes(data[offset + KEY_LENGTH.size:offset + KEY_LENGTH.size + length]))
+        entries.append((key, VALUE.unpack_from(data, value_offset)[0], value_offset))
+        offset = value_offset + VALUE.size
+    return entries
+
+
+class FileStore:
+    """单写者的 mmap 文件"""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        size = os.fstat(self.fd).st_size
+        if size < INITIAL_SIZE:
+            os.ftruncate(self.fd, INITIAL_SIZE)
+            size = INITIAL_SIZE
+        self.map = mmap.mmap(self.fd, size)
+        self.used = HEADER.unpack_from(self.map, 0)[0] or HEADER.size
+        self.positions = {key: offset for key, _, offset in read_entries(self.map)}
+
+    def append(self, key):
+        raw = encode_key(list(key))
+        size = entry_size(len(raw))
+        if self.used + size > len(self.map):
+            new_size = len(self.map) * 2
+            while self.used + size > new_size:
+                new_size *= 2
+            self.map.close()
+            os.ftruncate(self.fd, new_size)
+            self.map = mmap.mmap(self.fd, new_size)
+        offset = self.used
+        KEY_LENGTH.pack_into(self.map, offset, len(raw))
+        self.map[offset + KEY_LENGTH.size:offset + KEY_LENGTH.size + len(raw)] = raw
+        value_offset = offset + size - VALUE.size
+        VALUE.pack_into(self.map, value_offset, 0.0)
+        self.used += size
+        HEADER.pack_into(self.map, 0, self.used)
+        self.positions[key] = value_offset
+        return value_offset
+
+    def add(self, key, amount):
+        offset = self.positions.get(key)
+        if offset is None:
+            offset = self.append(key)
+        VALUE.pack_into(self.map, offset, VALUE.unpack_from(self.map, offset)[0] + amount)
+
+
+class MemoryStore:
+    def __init__(self):
+        self.values = {}
+
+    def add(self, key, amount):
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+
+def directory():
+    return settings.METRICS['DIR']
+
+
+class StoreOwner:
+    """保存在线程局部变量中，线程退出时被回收，将存储交还给进程"""
+
+    def __init__(self, store, pid):
+        self.store = store
+        self.pid = pid
+        weakref.finalize(self, release, store, pid)
+
+
+def release(store, pid):
+    with _lock:
+        if pid == _pool_pid:
+            _free_stores.append(store)
+
+
+def acquire(pid):
+    """取一个空闲的存储，没有时新建（进程 fork 后不使用父进程的存储）"""
+    global _pool_pid, _created
+    with _lock:
+        if _pool_pid != pid:
+            _pool_pid, _created = pid, 0
+            _free_stores.clear()
+            _memory_stores.clear()
+        if _free_stores:
+            return _free_stores.pop()
+        _created += 1
+        number = _created
+    path = directory()
+    if path:
+        os.makedirs(path, exist_ok=True)
+        return FileStore(os.path.join(path, f'{pid}_{number}.db'))
+    store = MemoryStore()
+    with _lock:
+        _memory_stores.append(store)
+    return store
+
+
+def get_store():
+    """当前线程的存储"""
+    owner = getattr(_local, 'owner', None)
+    pid = os.getpid()
+    if owner is None or owner.pid != pid:
+        owner = _local.owner = StoreOwner(acquire(pid), pid)
+    return owner.store
+
+
+def add(key, amount=1.0):
+    get_store().add(key, amount)
+
+
+def file_pid(name):
+    try:
+        return int(name.split('_', 1)[0])
+    except ValueError:
+        return None
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def merge_dead(path):
+    """将已退出进程的文件合并到 merged.db，避免 worker 重启后文件不断增多"""
+    dead = [
+        name for name in os.listdir(path)
+        if name.endswith('.db') and name != MERGED
+        and (pid := file_pid(name)) is not None and pid != os.getpid() and not is_alive(pid)
+    ]
+    if not dead:
+        return
+    with open(os.path.join(path, LOCK), 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            merged = FileStore(os.path.join(path, MERGED))
+            for name in dead:
+                file_path = os.path.join(path, name)
+                try:
+                    with open(file_path, 'rb') as f:
+                        entries = read_entries(f.read())
+                except FileNotFoundError:
+                    continue
+                for key, value, _ in entries:
+                    merged.add(key, value)
+                os.unlink(file_path)
+            merged.map.flush()
+            merged.map.close()
+            os.close(merged.fd)
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def clear():
+    """删除指标目录中的所有文件（gunicorn 主进程启动 worker 前调用），返回删除的文件数"""
+    path = directory()
+    if not path or not os.path.isdir(path):
+        return 0
+    removed = 0
+    for name in os.listdir(path):
+        if name.endswith('.db'):
+            os.unlink(os.path.join(path, name))
+            removed += 1
+    return removed
+
+
+def collect():
+    """汇总所有存储，返回 {(样本名, 标签值): 数值}"""
+    totals = Counter()
+    path = directory()
+    if path and os.path.isdir(path):
+        merge_dead(path)
+        with open(os.path.join(path, LOCK), 'a') as lock:
+            # 共享锁：读取期间不会有文件被合并删除
+            fcntl.flock(lock, fcntl.LOCK_SH)
+            try:
+                for name in os.listdir(path):
+                    if not name.endswith('.db'):
+                        continue
+                    try:
+                        with open(os.path.join(path, name), 'rb') as f:
+                            data = f.read()
+                    except FileNotFoundError:
+                        continue
+                    for key, value, _ in read_entries(data):
+                        totals[key] += value
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+    else:
+        with _lock:
+            stores = list(_memory_stores)
+        for store in stores:
+            for key, value in list(store.values.items()):
+                totals[key] += value
+    return totals
@@ -0,0 +1,44 @@
+import hmac
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from drf_spectacular.utils import extend_schema
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.permissions import BasePermission
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
+
+from .registry import render
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+SCRAPER = 'metrics-scraper'
+
+
+class ScrapeTokenAuthentication(BaseAuthentication):
+    """抓取端携带 Authorization: Bearer <METRICS['TOKEN']>"""
+
+    def authenticate(self, request):
+        token = settings.METRICS['TOKEN']
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        if token and hmac.compare_digest(header.encode(), f'Bearer {token}'.encode()):
+            return AnonymousUser(), SCRAPER
+        return None
+
+
+class MetricsAccess(BasePermission):
+    """抓取令牌或管理员"""
+
+    def has_permission(self, request, view):
+        return request.auth == SCRAPER or bool(request.user and request.user.is_staff)
+
+
+class MetricsView(APIView):
+    """Prometheus 文本格式的指标（配置 METRICS['DIR'] 时汇总所有 worker）"""
+    authentication_classes = [ScrapeTokenAuthentication, *api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    permission_classes = [MetricsAccess]
+    throttle_classes = []
+
+    @extend_schema(exclude=True)
+    def get(self, request):
+        return HttpResponse(render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,7 @@
+from django.apps import AppConfig
+
+
+class OpenapiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.openapi'
+    verbose_name = 'API 文档'
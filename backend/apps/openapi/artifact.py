@@ -0,0 +1,102 @@
+"""
+预生成的 OpenAPI schema
+
+schema 由 manage.py openapi_schema 生成为 YAML 和 JSON 两个文件并检入仓库（OPENAPI_SCHEMA['DIR']），
+进程内首次使用时读入并预先压缩一份 gzip，之后每次请求只返回内存中的字节。
+OPENAPI_SCHEMA['USE_FILE'] 为 False（默认开发环境）或文件不存在时，改为在首次使用时从代码生成一次。
+
+每种格式和编码的 ETag 为内容的 SHA-256（强校验），内容不变 ETag 就不变。
+"""
+
+import gzip
+import hashlib
+import threading
+
+from django.conf import settings
+from drf_spectacular.renderers import OpenApiJsonRenderer, OpenApiYamlRenderer
+from drf_spectacular.settings import spectacular_settings
+
+RENDERERS = {
+    'yaml': OpenApiYamlRenderer,
+    'json': OpenApiJsonRenderer,
+}
+
+_artifact = None
+_lock = threading.Lock()
+
+
+def generate():
+    """从代码生成 schema，返回 {格式: 字节}"""
+    generator = spectacular_settings.DEFAULT_GENERATOR_CLASS(urlconf=spectacular_settings.SERVE_URLCONF)
+    schema = generator.get_schema(request=None, public=spectacular_settings.SERVE_PUBLIC)
+    return {
+        name: renderer().render(schema, renderer.media_type, {})
+        for name, renderer in RENDERERS.items()
+    }
+
+
+def path(name):
+    return settings.OPENAPI_SCHEMA['DIR'] / f'schema.{name}'
+
+
+def read_files():
+    """读取检入的 schema 文件，缺少任一文件时返回 None"""
+    contents = {}
+    for name in RENDERERS:
+        try:
+            contents[name] = path(name).read_bytes()
+        except FileNotFoundError:
+            return None
+    return contents
+
+
+def write_files(contents):
+    settings.OPENAPI_SCHEMA['DIR'].mkdir(parents=True, exist_ok=True)
+    for name, content in contents.items():
+        path(name).write_bytes(content)
+
+
+def etag(content):
+    return f'"{hashlib.sha256(content).hexdigest()[:32]}"'
+
+
+class Variant:
+    def __init__(self, content, encoding=None):
+        self.content = content
+        self.encoding = encoding
+        self.etag = etag(content)
+
+
+class Artifact:
+    """
+    各格式的原文和 gzip 压缩版本
+
+    source 为 file（读取检入的文件）或 generated（进程内生成）。
+    """
+
+    def __init__(self, contents, source):
+        self.source = source
+        self.variants = {
+            name: {
+                None: Variant(content),
+                # mtime=0 使压缩结果只取决于内容
+                'gzip': Variant(gzip.compress(content, compresslevel=9, mtime=0), 'gzip'),
+            }
+            for name, content in contents.items()
+        }
+
+    def variant(self, name, gzip_ok):
+        return self.variants[name]['gzip' if gzip_ok else None]
+
+
+def get_artifact():
+    global _artifact
+    if _artifact is None:
+        with _lock:
+            if _artifact is None:
+                contents = read_files() if settings.OPENAPI_SCHEMA['USE_FILE'] else None
+                if contents is not None:
+                    _artifact = Artifact(contents, 'file')
+                else:
+                    _artifact = Artifact(generate(), 'generated')
+    return _artifact
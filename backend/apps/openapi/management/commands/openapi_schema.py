@@ -0,0 +1,47 @@
+import difflib
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.openapi.artifact import RENDERERS, generate, path, read_files, write_files
+
+MAX_DIFF_LINES = 200
+
+
+class Command(BaseCommand):
+    help = '从代码重新生成 OpenAPI schema 文件（YAML 和 JSON）'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='只检查：检入的文件与代码生成的结果不一致时输出差异并以非零状态退出'
+        )
+
+    def handle(self, *args, **options):
+        contents = generate()
+        if not options['check']:
+            write_files(contents)
+            for name in RENDERERS:
+                self.stdout.write(self.style.SUCCESS(f'已写入 {path(name)}'))
+            return
+
+        current = read_files()
+        if current is None:
+            raise CommandError('schema 文件不存在，先运行 manage.py openapi_schema')
+        drifted = [name for name in RENDERERS if current[name] != contents[name]]
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS('schema 与代码一致'))
+            return
+
+        # YAML 的差异更易读，只输出一份
+        name = 'yaml' if 'yaml' in drifted else drifted[0]
+        diff = list(difflib.unified_diff(
+            current[name].decode().splitlines(),
+            contents[name].decode().splitlines(),
+            fromfile=f'{path(name)}（检入）',
+            tofile=f'{path(name)}（代码）',
+            lineterm='',
+        ))
+        self.stdout.write('\n'.join(diff[:MAX_DIFF_LINES]))
+        if len(diff) > MAX_DIFF_LINES:
+            self.stdout.write(f'……共 {len(diff)} 行差异')
+        raise CommandError('schema 与检入的文件不一致，运行 manage.py openapi_schema 更新后提交')
@@ -0,0 +1,52 @@
+import re
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from drf_spectacular.views import SpectacularAPIView
+
+from .artifact import get_artifact
+
+accepts_gzip = re.compile(r'\bgzip\b')
+
+
+def etag_matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    # If-None-Match 使用弱比较
+    return '*' in etags or etag in etags or f'W/{etag}' in etags
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    返回预生成的 schema（见 artifact），内容协商与 SpectacularAPIView 相同
+
+    带 lang 或 version 参数的请求仍按请求实时生成。
+    """
+
+    def _get_schema_response(self, request):
+        version = self.api_version or request.version or self._get_version_parameter(request)
+        if version or request.GET.get('lang') or self.custom_settings or self.patterns:
+            return super()._get_schema_response(request)
+
+        renderer = request.accepted_renderer
+        gzip_ok = bool(accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+        variant = get_artifact().variant(renderer.format, gzip_ok)
+
+        if etag_matches(request, variant.etag):
+            response = HttpResponseNotModified()
+        else:
+            content_type = request.accepted_media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = HttpResponse(variant.content, content_type=content_type)
+            response['Content-Disposition'] = f'inline; filename="{self._get_filename(request, None)}"'
+            if variant.encoding:
+                response['Content-Encoding'] = variant.encoding
+        response['ETag'] = variant.etag
+        # 每次使用前向服务端校验，内容未变时返回 304
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ['Accept', 'Accept-Encoding'])
+        return response
@@ -0,0 +1,78 @@
+from django.contrib import admin
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import path, reverse
+from django.utils.html import format_html, format_html_join
+
+from .models import ProfileCapture
+
+TOP_STACKS = 20
+
+
+@admin.register(ProfileCapture)
+class ProfileCaptureAdmin(admin.ModelAdmin):
+    list_display = [
+        'created_at', 'method', 'path', 'status_code', 'duration_ms', 'query_count', 'query_ms',
+        'user', 'collapsed_link',
+    ]
+    list_filter = ['method', 'status_code', 'created_at']
+    search_fields = ['path']
+    date_hierarchy = 'created_at'
+    exclude = ['stacks', 'queries', 'serializers']
+    readonly_fields = ['top_stacks', 'serializer_table', 'query_table']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        urls = [
+            path(
+                '<int:pk>/collapsed/',
+                self.admin_site.admin_view(self.collapsed_view),
+                name='profiling_profilecapture_collapsed',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def collapsed_view(self, request, pk):
+        """下载折叠栈文件，可用 flamegraph.pl 生成火焰图或导入 speedscope"""
+        if not self.has_view_permission(request):
+            return HttpResponse(status=403)
+        capture = get_object_or_404(ProfileCapture, pk=pk)
+        response = HttpResponse(capture.stacks + '\n', content_type='text/plain; charset=utf-8')
+        response['Content-Disposition'] = f'attachment; filename="profile-{capture.pk}.folded"'
+        return response
+
+    @admin.display(description='火焰图')
+    def collapsed_link(self, obj):
+        url = reverse('admin:profiling_profilecapture_collapsed', args=[obj.pk])
+        return format_html('<a href="{}">下载折叠栈</a>', url)
+
+    @admin.display(description='采样最多的调用栈')
+    def top_stacks(self, obj):
+        lines = [line.rpartition(' ') for line in obj.stacks.splitlines()[:TOP_STACKS]]
+        rows = format_html_join(
+            '', '<tr><td>{}</td><td>{}</td></tr>',
+            ((count, ' → '.join(stack.split(';')[-8:])) for stack, _, count in lines),
+        )
+        link = self.collapsed_link(obj)
+        return format_html('<p>共 {} 次采样，{}</p><table>{}</table>', obj.sample_count, link, rows)
+
+    @admin.display(description='序列化器耗时（毫秒）')
+    def serializer_table(self, obj):
+        rows = format_html_join('', '<tr><td>{}</td><td>{}</td></tr>', obj.serializers.items())
+        return format_html('<table>{}</table>', rows)
+
+    @admin.display(description='查询列表')
+    def query_table(self, obj):
+        rows = format_html_join(
+            '', '<tr><td>{}</td><td>{}</td><td><code>{}</code><br><small>{}</small></td></tr>',
+            ((query['ms'], query['alias'], query['sql'], query['params']) for query in obj.queries),
+        )
+        return format_html(
+            '<p>共 {} 条，{} 毫秒，记录了前 {} 条</p><table>{}</table>',
+            obj.query_count, obj.query_ms, len(obj.queries), rows,
+        )
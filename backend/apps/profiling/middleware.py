@@ -0,0 +1,115 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import ProfileCapture
+from .sampler import profile
+
+HEADER = 'HTTP_X_PROFILE'
+QUERY_PARAM = '_profile'
+MAX_PARAMS_LENGTH = 500
+
+
+def is_triggered(request):
+    return HEADER in request.META or QUERY_PARAM in request.GET
+
+
+def staff_user(request):
+    """请求的管理员用户（会话或 JWT），不是管理员时返回 None"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        try:
+            result = JWTAuthentication().authenticate(request)
+        except APIException:
+            result = None
+        user = result[0] if result else None
+    if user is not None and user.is_active and user.is_staff:
+        return user
+    return None
+
+
+class QueryLog:
+    """数据库执行包装：按顺序记录查询"""
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.entries = []
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            if len(self.entries) < self.limit:
+                self.entries.append({
+                    'alias': context['connection'].alias,
+                    'sql': sql,
+                    'params': repr(params)[:MAX_PARAMS_LENGTH],
+                    'many': many,
+                    'ms': round(duration * 1000, 3),
+                })
+
+
+class ProfilingMiddleware:
+    """
+    管理员请求带 X-Profile 请求头或 _profile 查询参数时，在采样剖析下执行该请求，
+    记录调用栈、查询列表和序列化器耗时，响应头 X-Profile-Id 为记录ID（在后台查看）
+
+    未带标记的请求只多一次字典查找；非管理员的标记被忽略。
+    流式响应只剖析到返回响应对象为止。PROFILING['ENABLED'] 为 False 时不加载。
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not is_triggered(request):
+            return self.get_response(request)
+        user = staff_user(request)
+        if user is None:
+            return self.get_response(request)
+
+        config = settings.PROFILING
+        queries = QueryLog(config['MAX_QUERIES'])
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response, sampler = profile(lambda: self.get_response(request), config['INTERVAL'])
+
+        capture = ProfileCapture.objects.using('default').create(
+            user_id=user.pk,
+            method=request.method[:10],
+            path=request.get_full_path()[:500],
+            status_code=response.status_code,
+            duration_ms=round(sampler.elapsed * 1000, 2),
+            interval_ms=round(sampler.period * 1000, 3),
+            sample_count=sampler.sample_count,
+            query_count=queries.count,
+            query_ms=round(queries.duration * 1000, 2),
+            stacks=sampler.collapsed(),
+            queries=queries.entries,
+            serializers=sampler.serializer_ms(),
+        )
+        prune(config['KEEP'])
+        response['X-Profile-Id'] = str(capture.pk)
+        return response
+
+
+def prune(keep):
+    """只保留最近 keep 条记录"""
+    captures = ProfileCapture.objects.using('default')
+    cutoff = captures.order_by('-pk').values_list('pk', flat=True)[keep:keep + 1].first()
+    if cutoff is not None:
+        captures.filter(pk__lte=cutoff).delete()
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileCapture',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10, verbose_name='请求方法')),
+                ('path', models.CharField(max_length=500, verbose_name='请求路径')),
+                ('status_code', models.PositiveSmallIntegerField(verbose_name='状态码')),
+                ('duration_ms', models.FloatField(verbose_name='耗时（毫秒）')),
+                ('interval_ms', models.FloatField(verbose_name='采样间隔（毫秒）')),
+                ('sample_count', models.PositiveIntegerField(default=0, verbose_name='采样数')),
+                ('query_count', models.PositiveIntegerField(default=0, verbose_name='查询数')),
+                ('query_ms', models.FloatField(default=0, verbose_name='查询耗时（毫秒）')),
+                ('stacks', models.TextField(blank=True, verbose_name='调用栈')),
+                ('queries', models.JSONField(default=list, verbose_name='查询列表')),
+                ('serializers', models.JSONField(default=dict, verbose_name='序列化器耗时')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='创建时间')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='触发的管理员')),
+            ],
+            options={
+                'verbose_name': '剖析记录',
+                'verbose_name_plural': '剖析记录',
+                'db_table': 'profile_captures',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import models
+
+
+class ProfileCapture(models.Model):
+    """
+    一次剖析请求的结果（只保存在 default 库）
+
+    只保留最近 PROFILING['KEEP'] 条。
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='触发的管理员'
+    )
+    method = models.CharField(max_length=10, verbose_name='请求方法')
+    path = models.CharField(max_length=500, verbose_name='请求路径')
+    status_code = models.PositiveSmallIntegerField(verbose_name='状态码')
+    duration_ms = models.FloatField(verbose_name='耗时（毫秒）')
+    interval_ms = models.FloatField(verbose_name='采样间隔（毫秒）')
+    sample_count = models.PositiveIntegerField(default=0, verbose_name='采样数')
+    query_count = models.PositiveIntegerField(default=0, verbose_name='查询数')
+    query_ms = models.FloatField(default=0, verbose_name='查询耗时（毫秒）')
+    # 折叠栈格式，每行为 "帧;帧;帧 次数"，可直接用于 flamegraph.pl 或 speedscope
+    stacks = models.TextField(blank=True, verbose_name='调用栈')
+    queries = models.JSONField(default=list, verbose_name='查询列表')
+    serializers = models.JSONField(default=dict, verbose_name='序列化器耗时')
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='创建时间')
+
+    class Meta:
+        db_table = 'profile_captures'
+        verbose_name = '剖析记录'
+        verbose_name_plural = verbose_name
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.duration_ms:.0f}ms)'
@@ -0,0 +1,134 @@
+"""
+采样剖析器
+
+后台线程每隔 interval 秒读取一次目标线程的调用栈（sys._current_frames），按折叠栈格式计数：
+"根帧;...;当前帧" -> 采样次数。纯 CPU 计算时目标线程每隔 sys.getswitchinterval() 才释放 GIL，
+剖析期间临时把切换间隔调到采样间隔，结束后恢复。
+
+栈中出现序列化器的 to_representation 时按序列化器类名计数，采样次数乘以实际采样周期
+（总耗时 / 采样数）即该序列化器的耗时（含嵌套序列化器，同一采样中每个类只计一次）。
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from rest_framework.serializers import BaseSerializer
+
+_switch_lock = threading.Lock()
+_switch_users = 0
+_switch_saved = None
+
+# 去掉标准库和第三方包的目录前缀，帧名称更短
+_prefixes = sorted(
+    {os.path.dirname(os.__file__) + os.sep, *(path + os.sep for path in sys.path if path)},
+    key=len,
+    reverse=True,
+)
+
+
+def short_path(filename):
+    for prefix in _prefixes:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def frame_name(code):
+    return f'{code.co_qualname} ({short_path(code.co_filename)}:{code.co_firstlineno})'.replace(';', ',')
+
+
+def lower_switch_interval(interval):
+    global _switch_users, _switch_saved
+    with _switch_lock:
+        if _switch_users == 0:
+            _switch_saved = sys.getswitchinterval()
+            sys.setswitchinterval(min(interval, _switch_saved))
+        _switch_users += 1
+
+
+def restore_switch_interval():
+    global _switch_users
+    with _switch_lock:
+        _switch_users -= 1
+        if _switch_users == 0:
+            sys.setswitchinterval(_switch_saved)
+
+
+class Sampler:
+    """对调用 start() 的线程采样，stop() 后读取 stacks 和 serializers"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self.serializers = Counter()
+        self.sample_count = 0
+        self.elapsed = 0.0
+        self._names = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+        self._started = 0.0
+
+    def start(self):
+        self._target = threading.get_ident()
+        self._started = time.perf_counter()
+        lower_switch_interval(self.interval)
+        self._thread = threading.Thread(target=self.run, name='profiling-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        restore_switch_interval()
+        self.elapsed = time.perf_counter() - self._started
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target)
+            if frame is not None:
+                self.sample(frame)
+
+    def sample(self, frame):
+        names, serializers = [], set()
+        while frame is not None:
+            code = frame.f_code
+            name = self._names.get(code)
+            if name is None:
+                name = self._names[code] = frame_name(code)
+            names.append(name)
+            if code.co_name == 'to_representation':
+                instance = frame.f_locals.get('self')
+                if isinstance(instance, BaseSerializer):
+                    serializers.add(type(instance).__name__)
+            frame = frame.f_back
+        names.reverse()
+        self.stacks[';'.join(names)] += 1
+        self.serializers.update(serializers)
+        self.sample_count += 1
+
+    def collapsed(self):
+        """折叠栈文本，每行 "帧;帧;帧 次数"，按次数降序"""
+        return '\n'.join(f'{stack} {count}' for stack, count in self.stacks.most_common())
+
+    @property
+    def period(self):
+        """实际的平均采样周期（秒）"""
+        return self.elapsed / self.sample_count if self.sample_count else self.interval
+
+    def serializer_ms(self):
+        period = self.period
+        return {name: round(count * period * 1000, 2) for name, count in self.serializers.most_common()}
+
+
+def profile(func, interval):
+    """在采样下执行 func()，返回 (结果, 采样器)"""
+    sampler = Sampler(interval)
+    sampler.start()
+    try:
+        result = func()
+    finally:
+        sampler.stop()
+    return result, sampler
@@ -1,9 +1,11 @@
 from django.contrib import admin
+
+from apps.sharding.admin import ShardedModelAdmin
 from .models import Project
 
 
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(ShardedModelAdmin):
     list_display = ['name', 'user', 'is_favorite', 'created_at']
     search_fields = ['name', 'description']
     list_filter = ['is_favorite', 'created_at']
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from .models import Project
+from apps.common.serializers import DynamicFieldsModelSerializer
 
 
 class ProjectSimpleSerializer(serializers.ModelSerializer):
@@ -10,7 +11,7 @@ class ProjectSimpleSerializer(serializers.ModelSerializer):
         read_only_fields = fields
 
 
-class ProjectSerializer(serializers.ModelSerializer):
+class ProjectSerializer(DynamicFieldsModelSerializer):
     tasks_count = serializers.SerializerMethodField()
     uncompleted_count = serializers.SerializerMethodField()
     completed_count = serializers.SerializerMethodField()
@@ -24,13 +25,20 @@ class ProjectSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
 
+    # 优先使用视图中 annotate 的计数，避免逐行查询
     def get_tasks_count(self, obj):
+        if hasattr(obj, 'tasks_total'):
+            return obj.tasks_total
         return obj.tasks.filter(is_deleted=False).count()
     
     def get_uncompleted_count(self, obj):
+        if hasattr(obj, 'uncompleted_total'):
+            return obj.uncompleted_total
         return obj.tasks.filter(is_deleted=False).exclude(status='completed').count()
     
     def get_completed_count(self, obj):
+        if hasattr(obj, 'completed_total'):
+            return obj.completed_total
         return obj.tasks.filter(is_deleted=False, status='completed').count()
 
     def create(self, validated_data):
@@ -1,12 +1,52 @@
 from rest_framework import viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.db.models import Count, F, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.http import Http404
+from django.utils import timezone
 from .models import Project
 from .serializers import ProjectSerializer
+from apps.common.db import update_returning
+from apps.common.mixins import ReplicaReadMixin, SparseFieldsetMixin
+from apps.realtime.events import notify_change
+from apps.tasks.models import ArchivedTask
 
+# 计数字段与对应的 annotate 表达式
+PROJECT_COUNT_ANNOTATIONS = {
+    'tasks_count': ('tasks_total', Q(tasks__is_deleted=False)),
+    'uncompleted_count': (
+        'uncompleted_total',
+        Q(tasks__is_deleted=False) & ~Q(tasks__status='completed'),
+    ),
+    'completed_count': (
+        'completed_total',
+        Q(tasks__is_deleted=False, tasks__status='completed'),
+    ),
+}
+# 已归档的任务都已完成，计入这两项
+ARCHIVED_COUNT_FIELDS = {'tasks_count', 'completed_count'}
 
-class ProjectViewSet(viewsets.ModelViewSet):
+
+def project_count_annotations(fields=None):
+    """返回 {别名: 聚合表达式}，fields 为需要的计数字段，None 表示全部"""
+    archived = ArchivedTask.objects.filter(project=OuterRef('pk')).order_by().values('project').annotate(
+        total=Count('pk')
+    ).values('total')
+    annotations = {}
+    for field, (alias, condition) in PROJECT_COUNT_ANNOTATIONS.items():
+        if fields is not None and field not in fields:
+            continue
+        expression = Count('tasks', filter=condition)
+        if field in ARCHIVED_COUNT_FIELDS:
+            expression = expression + Coalesce(Subquery(archived), Value(0))
+        annotations[alias] = expression
+    return annotations
+
+
+class ProjectViewSet(ReplicaReadMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = ProjectSerializer
+    replica_actions = {'list'}
 
     def get_queryset(self):
         queryset = Project.objects.filter(user=self.request.user)
@@ -16,22 +56,49 @@ class ProjectViewSet(viewsets.ModelViewSet):
         if is_pinned is not None:
             queryset = queryset.filter(is_pinned=is_pinned.lower() == 'true')
         
+        return self.optimize_queryset(queryset)
+
+    def optimize_queryset(self, queryset):
+        """只计算本次请求需要的任务计数，并在同一条查询中完成"""
+        queryset = self.defer_unrequested_fields(queryset)
+        annotations = project_count_annotations(
+            [field for field in PROJECT_COUNT_ANNOTATIONS if self.wants_field(field)]
+        )
+        if annotations:
+            # 聚合查询不会应用 Meta.ordering，需要显式排序
+            queryset = queryset.annotate(**annotations).order_by(*Project._meta.ordering)
         return queryset
 
+    def toggle_field(self, field):
+        """用单条 UPDATE 取反布尔字段，并在同一次往返中返回更新后的项目"""
+        try:
+            queryset = Project.objects.filter(user=self.request.user, pk=self.kwargs['pk'])
+            projects = update_returning(queryset, updated_at=timezone.now(), **{field: ~F(field)})
+        except (TypeError, ValueError):
+            raise Http404
+        if not projects:
+            raise Http404
+
+        project = projects[0]
+        notify_change(project.user_id, 'project', 'updated', [project.pk])
+
+        # 任务计数用一条聚合查询补齐
+        annotations = project_count_annotations()
+        counts = Project.objects.filter(pk=project.pk).annotate(**annotations).values(*annotations).get()
+        for key, value in counts.items():
+            setattr(project, key, value)
+        return project
+
     @action(detail=True, methods=['post'])
     def toggle_favorite(self, request, pk=None):
         """切换收藏状态"""
-        project = self.get_object()
-        project.is_favorite = not project.is_favorite
-        project.save()
+        project = self.toggle_field('is_favorite')
         serializer = self.get_serializer(project)
         return Response(serializer.data)
     
     @action(detail=True, methods=['post'])
     def toggle_pin(self, request, pk=None):
         """切换置顶状态"""
-        project = self.get_object()
-        project.is_pinned = not project.is_pinned
-        project.save()
+        project = self.toggle_field('is_pinned')
         serializer = self.get_serializer(project)
         return Response(serializer.data)
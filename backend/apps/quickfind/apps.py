@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class QuickfindConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.quickfind'
+    verbose_name = '快速查找'
+
+    def ready(self):
+        from . import signals  # noqa: F401
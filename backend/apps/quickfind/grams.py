@@ -0,0 +1,40 @@
+"""
+三元组切分
+
+字母数字单词的规则与 pg_trgm 一致：转为小写，每个单词前补两个空格、
+后补一个空格后取所有连续三个字符。
+
+中日韩文字没有空格分词，整段作为一个单词时无法命中中间的词语，
+因此按单字和相邻两字切分（如 "写周报" -> 写、周、报、写周、周报）。
+"""
+
+import re
+
+CJK = '\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af'
+CJK_RUN = re.compile(f'[{CJK}]+')
+WORD = re.compile(r'[^\W_]+')
+
+
+def has_cjk(text):
+    return CJK_RUN.search(text or '') is not None
+
+
+def trigrams(text, prefix=False):
+    """
+    返回三元组集合
+
+    prefix=True 时最后一个单词不补尾部空格，用于逐字输入的查询词，
+    使 "wor" 能完整命中 "work"。
+    """
+    words = WORD.findall(CJK_RUN.sub(r' \g<0> ', (text or '').casefold()))
+    grams = set()
+    for position, word in enumerate(words):
+        if CJK_RUN.fullmatch(word):
+            grams.update(word)
+            grams.update(word[i:i + 2] for i in range(len(word) - 1))
+            continue
+        padded = f'  {word} '
+        if prefix and position == len(words) - 1:
+            padded = padded[:-1]
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
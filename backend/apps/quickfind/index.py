@@ -0,0 +1,89 @@
+"""
+三元组表维护（PostgreSQL 以外的数据库）
+
+用户数据变更提交后（data_changed）按对象ID重新切分，三元组未变化的对象不写入；
+全量重建见 rebuild_search_index 命令。
+"""
+
+from collections import defaultdict
+
+from django.db import connections, router, transaction
+
+from apps.projects.models import Project
+from apps.tags.models import Tag
+from apps.tasks.models import Task
+from .grams import trigrams
+from .models import SearchGram
+
+# 变更事件中的 model -> (类型, 模型, 文本字段)
+SOURCES = {
+    'task': (1, Task, 'title'),
+    'project': (2, Project, 'name'),
+    'tag': (3, Tag, 'name'),
+}
+
+CHUNK_SIZE = 500
+
+
+def uses_side_table(using='default'):
+    return connections[using].vendor != 'postgresql'
+
+
+def build_rows(kind, rows):
+    return [
+        SearchGram(user_id=user_id, gram=gram, kind=kind, object_id=pk)
+        for pk, user_id, text in rows
+        for gram in trigrams(text)
+    ]
+
+
+def reindex(model_name, ids):
+    """重新切分指定对象，已删除的对象移除三元组，返回有变化的对象数"""
+    kind, model, field = SOURCES[model_name]
+    ids = list(ids)
+    changed = 0
+    for start in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[start:start + CHUNK_SIZE]
+        current = {
+            pk: (user_id, text)
+            for pk, user_id, text in model.objects.filter(pk__in=chunk).values_list('pk', 'user_id', field)
+        }
+        existing = defaultdict(set)
+        for object_id, gram in SearchGram.objects.filter(kind=kind, object_id__in=chunk).values_list('object_id', 'gram'):
+            existing[object_id].add(gram)
+
+        stale = [
+            pk for pk in set(chunk)
+            if existing.get(pk, set()) != (trigrams(current[pk][1]) if pk in current else set())
+        ]
+        if not stale:
+            continue
+        with transaction.atomic(using=router.db_for_write(SearchGram)):
+            SearchGram.objects.filter(kind=kind, object_id__in=stale).delete()
+            SearchGram.objects.bulk_create(build_rows(
+                kind, [(pk, *current[pk]) for pk in stale if pk in current]
+            ))
+        changed += len(stale)
+    return changed
+
+
+def rebuild(user_ids=None, chunk_size=2000):
+    """清空并重建三元组表，返回写入的行数"""
+    grams = SearchGram.objects.all()
+    if user_ids:
+        grams = grams.filter(user_id__in=user_ids)
+    grams.delete()
+
+    count = 0
+    for kind, model, field in SOURCES.values():
+        queryset = model.objects.order_by()
+        if user_ids:
+            queryset = queryset.filter(user_id__in=user_ids)
+        rows = []
+        for row in queryset.values_list('pk', 'user_id', field).iterator(chunk_size=chunk_size):
+            rows.append(row)
+            if len(rows) >= chunk_size:
+                count += len(SearchGram.objects.bulk_create(build_rows(kind, rows), batch_size=chunk_size))
+                rows = []
+        count += len(SearchGram.objects.bulk_create(build_rows(kind, rows), batch_size=chunk_size))
+    return count
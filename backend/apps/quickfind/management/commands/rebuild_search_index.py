@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.quickfind import index
+from apps.sharding.routers import use_shard
+
+
+class Command(BaseCommand):
+    help = '重建快速查找的三元组表（PostgreSQL 使用 pg_trgm 索引，无需重建）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='只重建指定用户，可重复')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if not index.uses_side_table():
+            self.stdout.write('PostgreSQL 使用 pg_trgm 索引，无需重建')
+            return
+        count = 0
+        for alias in settings.DATABASE_SHARDS:
+            with use_shard(alias):
+                count += index.rebuild(options['users'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'已写入 {count} 个三元组'))
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# PostgreSQL 上创建 pg_trgm 扩展和标题/名称的 GIN 索引，不使用三元组表；
+# 其他数据库根据已有数据填充三元组表。GIN 索引只存在于数据库中，不出现在模型状态里。
+TRIGRAM_INDEXES = [
+    ('tasks', 'Task', 'title', 'tasks_title_trgm_idx'),
+    ('projects', 'Project', 'name', 'projects_name_trgm_idx'),
+    ('tags', 'Tag', 'name', 'tags_name_trgm_idx'),
+]
+
+
+def trigram_index(field, name):
+    from django.contrib.postgres.indexes import GinIndex
+
+    return GinIndex(fields=[field], name=name, opclasses=['gin_trgm_ops'])
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        fill_search_grams(apps)
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for app_label, model_name, field, name in TRIGRAM_INDEXES:
+        schema_editor.add_index(apps.get_model(app_label, model_name), trigram_index(field, name))
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for app_label, model_name, field, name in TRIGRAM_INDEXES:
+        schema_editor.remove_index(apps.get_model(app_label, model_name), trigram_index(field, name))
+
+
+def fill_search_grams(apps):
+    from apps.quickfind.grams import trigrams
+
+    SearchGram = apps.get_model('quickfind', 'SearchGram')
+    for kind, (app_label, model_name, field, _) in enumerate(TRIGRAM_INDEXES, start=1):
+        model = apps.get_model(app_label, model_name)
+        rows = []
+        for pk, user_id, text in model.objects.values_list('pk', 'user_id', field).iterator(chunk_size=2000):
+            rows.extend(
+                SearchGram(user_id=user_id, gram=gram, kind=kind, object_id=pk)
+                for gram in trigrams(text)
+            )
+            if len(rows) >= 10000:
+                SearchGram.objects.bulk_create(rows)
+                rows = []
+        SearchGram.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('projects', '0003_project_is_pinned'),
+        ('tags', '0004_tag_usage_count'),
+        ('tasks', '0010_task_span_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchGram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gram', models.CharField(max_length=3, verbose_name='三元组')),
+                ('kind', models.PositiveSmallIntegerField(choices=[(1, '任务'), (2, '项目'), (3, '标签')], verbose_name='类型')),
+                ('object_id', models.BigIntegerField(verbose_name='对象ID')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='所属用户')),
+            ],
+            options={
+                'verbose_name': '快速查找三元组',
+                'verbose_name_plural': '快速查找三元组',
+                'db_table': 'search_grams',
+                'indexes': [models.Index(fields=['user', 'gram', 'object_id', 'kind'], name='search_gram_lookup_idx'), models.Index(fields=['kind', 'object_id'], name='search_gram_object_idx')],
+            },
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import models
+
+
+class SearchGram(models.Model):
+    """
+    快速查找的三元组表（PostgreSQL 以外的数据库使用）
+
+    每个任务标题、项目名称、标签名称的每个三元组一行，
+    PostgreSQL 直接使用 pg_trgm 的 GIN 索引，不写入此表。
+    """
+    KIND_CHOICES = [
+        (1, '任务'),
+        (2, '项目'),
+        (3, '标签'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_index=False,
+        related_name='+',
+        verbose_name='所属用户'
+    )
+    gram = models.CharField(max_length=3, verbose_name='三元组')
+    kind = models.PositiveSmallIntegerField(choices=KIND_CHOICES, verbose_name='类型')
+    object_id = models.BigIntegerField(verbose_name='对象ID')
+
+    class Meta:
+        db_table = 'search_grams'
+        verbose_name = '快速查找三元组'
+        verbose_name_plural = verbose_name
+        indexes = [
+            # 查询只需要索引中的列，不回表；同一三元组内按对象ID有序，可以倒序取最新的对象
+            models.Index(fields=['user', 'gram', 'object_id', 'kind'], name='search_gram_lookup_idx'),
+            models.Index(fields=['kind', 'object_id'], name='search_gram_object_idx'),
+        ]
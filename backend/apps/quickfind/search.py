@@ -0,0 +1,192 @@
+"""
+快速查找
+
+在任务标题、项目名称、标签名称中按三元组相似度查找：
+- PostgreSQL：pg_trgm 的 word_similarity（<% 运算符，走 gin_trgm_ops 索引），
+  含中日韩文字的查询改用 ILIKE
+- 其他数据库：三元组表按命中数取候选，相似度为查询三元组的命中比例
+
+候选再按标星/置顶、最近更新等加权排序。
+"""
+
+import math
+
+from django.db import connections, router
+from django.db.models import Value
+from django.utils import timezone
+
+from .grams import has_cjk, trigrams
+from .index import SOURCES, uses_side_table
+from .models import SearchGram
+
+# 每种类型最多取的候选数
+CANDIDATES = 50
+# 三元组表：至少命中查询三元组的比例
+MIN_SIMILARITY = 0.5
+# 三元组表：估算文档数时的计数上限，以及核对命中数的候选对象上限
+DF_CAP = 1000
+MAX_CANDIDATES = 500
+# 最近更新加权的半衰期（天）
+RECENCY_HALF_LIFE = 14
+
+WEIGHTS = {
+    'recency': 0.1,
+    'starred': 0.15,
+    'completed': -0.1,
+    'pinned': 0.15,
+    'favorite': 0.1,
+    'usage': 0.1,
+}
+
+# 返回的列，第二个为标题
+COLUMNS = {
+    'task': ['id', 'title', 'project_id', 'status', 'is_starred', 'due_date', 'updated_at'],
+    'project': ['id', 'name', 'color', 'is_pinned', 'is_favorite', 'updated_at'],
+    'tag': ['id', 'name', 'color', 'usage_count', 'updated_at'],
+}
+
+
+def base_queryset(model_name, user_id):
+    _, model, _ = SOURCES[model_name]
+    queryset = model.objects.filter(user_id=user_id)
+    if model_name == 'task':
+        queryset = queryset.filter(is_deleted=False)
+    return queryset
+
+
+def trigram_candidates(user_id, query):
+    """PostgreSQL：返回 [(类型, 行, 相似度)]"""
+    from django.contrib.postgres.search import TrigramWordSimilarity
+
+    candidates = []
+    for model_name, (_, _, field) in SOURCES.items():
+        queryset = base_queryset(model_name, user_id)
+        if has_cjk(query):
+            # pg_trgm 无法匹配中文词语内部，改用 ILIKE（同样可以使用 gin_trgm_ops 索引），
+            # 包含完整查询词即视为完全相似
+            queryset = queryset.filter(**{f'{field}__icontains': query}).annotate(
+                similarity=Value(1.0)
+            ).order_by('-updated_at')
+        else:
+            queryset = queryset.filter(**{f'{field}__trigram_word_similar': query}).annotate(
+                similarity=TrigramWordSimilarity(query, field)
+            ).order_by('-similarity')
+        rows = queryset.values(*COLUMNS[model_name], 'similarity')[:CANDIDATES]
+        candidates.extend((model_name, row, row.pop('similarity')) for row in rows)
+    return candidates
+
+
+def gram_hits(cursor, user_id, grams):
+    """
+    返回 {(类型, 对象ID): 命中的查询三元组数}，只包含命中数达到 MIN_SIMILARITY 的对象
+
+    对所有三元组做 GROUP BY 时，常见三元组（如单词首字母）会扫描大量行。
+    命中足够多三元组的对象，必然包含最少见的 len(grams) - 最少命中数 + 1 个三元组之一，
+    因此先估算各三元组的文档数（上限 DF_CAP），只从最少见的几个三元组中取候选
+    （按对象ID倒序，最多 MAX_CANDIDATES 个，查询不够具体时只保留较新的对象），
+    再在覆盖索引上逐个核对候选的命中数。
+    """
+    table = SearchGram._meta.db_table
+    grams = sorted(grams)
+    min_hits = max(1, math.ceil(len(grams) * MIN_SIMILARITY))
+
+    cursor.execute(' UNION ALL '.join(
+        f'SELECT %s, (SELECT COUNT(*) FROM (SELECT 1 FROM {table} WHERE user_id = %s AND gram = %s LIMIT {DF_CAP}) t)'
+        for _ in grams
+    ), [value for gram in grams for value in (gram, user_id, gram)])
+    frequencies = dict(cursor.fetchall())
+    drivers = sorted(grams, key=frequencies.get)[:len(grams) - min_hits + 1]
+
+    cursor.execute(
+        'SELECT object_id FROM ('
+        + ' UNION '.join(
+            f'SELECT * FROM (SELECT object_id FROM {table} WHERE user_id = %s AND gram = %s '
+            f'ORDER BY object_id DESC LIMIT {MAX_CANDIDATES}) t{i}'
+            for i in range(len(drivers))
+        )
+        + f') c ORDER BY object_id DESC LIMIT {MAX_CANDIDATES}',
+        [value for gram in drivers for value in (user_id, gram)],
+    )
+    object_ids = [row[0] for row in cursor.fetchall()]
+    if not object_ids:
+        return {}
+
+    cursor.execute(
+        f'SELECT kind, object_id, COUNT(*) FROM {table} '
+        f'WHERE user_id = %s AND gram IN ({", ".join(["%s"] * len(grams))}) '
+        f'AND object_id IN ({", ".join(["%s"] * len(object_ids))}) '
+        f'GROUP BY kind, object_id HAVING COUNT(*) >= %s '
+        f'ORDER BY COUNT(*) DESC, object_id DESC LIMIT {CANDIDATES * len(SOURCES)}',
+        [user_id, *grams, *object_ids, min_hits],
+    )
+    return {(kind, object_id): hits for kind, object_id, hits in cursor.fetchall()}
+
+
+def side_table_candidates(user_id, query):
+    """三元组表：相似度为命中的查询三元组比例，返回 [(类型, 行, 相似度)]"""
+    grams = trigrams(query, prefix=True)
+    if not grams:
+        return []
+    # 分库时三元组表在用户所在的分片上
+    with connections[router.db_for_read(SearchGram) or 'default'].cursor() as cursor:
+        hits = gram_hits(cursor, user_id, grams)
+
+    by_kind = {kind: {} for kind, _, _ in SOURCES.values()}
+    for (kind, object_id), count in hits.items():
+        by_kind[kind][object_id] = count / len(grams)
+
+    candidates = []
+    for model_name, (kind, _, _) in SOURCES.items():
+        similarities = by_kind[kind]
+        if not similarities:
+            continue
+        rows = base_queryset(model_name, user_id).filter(pk__in=similarities).values(*COLUMNS[model_name])
+        candidates.extend((model_name, row, similarities[row['id']]) for row in rows)
+    return candidates
+
+
+def score(model_name, row, similarity, now):
+    boost = 0.0
+    if model_name == 'task':
+        boost += WEIGHTS['starred'] * row['is_starred']
+        boost += WEIGHTS['completed'] * (row['status'] == 'completed')
+    elif model_name == 'project':
+        boost += WEIGHTS['pinned'] * row['is_pinned'] + WEIGHTS['favorite'] * row['is_favorite']
+    else:
+        boost += WEIGHTS['usage'] * row['usage_count'] / (row['usage_count'] + 10)
+    age = max((now - row['updated_at']).total_seconds(), 0) / 86400
+    boost += WEIGHTS['recency'] * 0.5 ** (age / RECENCY_HALF_LIFE)
+    return similarity + boost
+
+
+def search(user_id, query, limit=10):
+    """返回按得分排序的前 limit 个结果"""
+    query = query.strip()
+    if not query:
+        return []
+    if uses_side_table():
+        candidates = side_table_candidates(user_id, query)
+    else:
+        candidates = trigram_candidates(user_id, query)
+
+    now = timezone.now()
+    ranked = sorted(
+        ((score(model_name, row, similarity, now), similarity, model_name, row)
+         for model_name, row, similarity in candidates),
+        key=lambda item: item[0],
+        reverse=True,
+    )
+
+    results = []
+    for total, similarity, model_name, row in ranked[:limit]:
+        title_field = COLUMNS[model_name][1]
+        extra = {key: value for key, value in row.items() if key not in ('id', title_field, 'updated_at')}
+        results.append({
+            'type': model_name,
+            'id': row['id'],
+            'title': row[title_field],
+            'score': round(total, 4),
+            'similarity': round(similarity, 4),
+            **extra,
+        })
+    return results
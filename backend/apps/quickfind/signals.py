@@ -0,0 +1,10 @@
+from django.dispatch import receiver
+
+from apps.realtime.events import data_changed
+from . import index
+
+
+@receiver(data_changed)
+def update_search_grams(sender, model, ids, **kwargs):
+    if model in index.SOURCES and index.uses_side_table():
+        index.reindex(model, ids)
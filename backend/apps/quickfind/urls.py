@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import QuickFindView
+
+urlpatterns = [
+    path('', QuickFindView.as_view(), name='quickfind'),
+]
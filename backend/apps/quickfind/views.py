@@ -0,0 +1,22 @@
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .search import search
+
+MAX_LIMIT = 30
+
+
+class QuickFindView(APIView):
+    """快速查找任务、项目和标签：?q=关键词&limit=10"""
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), MAX_LIMIT)
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        query = request.query_params.get('q', '')[:100]
+        return Response({'results': search(request.user.pk, query, limit)})
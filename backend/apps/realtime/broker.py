@@ -0,0 +1,268 @@
+"""
+变更事件代理
+
+事件按用户分组保存在有界缓冲区中，订阅者按游标（事件ID）拉取，
+落后超过缓冲区的订阅者会收到 EventGap，由客户端重新全量同步。
+read/latest_id 供 WSGI 下的同步视图使用，aread/alatest_id 供 ASGI 下的异步视图使用。
+"""
+
+import asyncio
+import functools
+import itertools
+import json
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+
+class EventGap(Exception):
+    """游标之后的事件已被淘汰，无法增量续传"""
+
+
+class InProcessBackend:
+    """
+    进程内事件代理
+
+    只能在单个进程内分发事件，多 worker 部署请使用 RedisBackend。
+    超过 idle_timeout 秒没有新事件且没有连接在等待的用户，其缓冲区会被清除，
+    之后携带旧游标重连的客户端收到 EventGap。
+    """
+
+    def __init__(self, buffer_size=1000, batch_size=100, idle_timeout=600, **options):
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._buffers = defaultdict(lambda: deque(maxlen=self.buffer_size))
+        # 每个用户已被淘汰的最大事件ID
+        self._evicted = {}
+        # 每个用户最近一次发布的时间
+        self._published = {}
+        # 清除空闲用户时已分配的最大事件ID，早于它的游标可能对应已清除的缓冲区
+        self._pruned_id = 0
+        self._pruned_at = time.monotonic()
+        self._waiters = defaultdict(set)
+        # 以微秒时间戳为起点，进程重启后ID仍然递增
+        self._seq = itertools.count(time.time_ns() // 1000)
+
+    def _prune(self, now, last_id):
+        """清除空闲用户的缓冲区，最多每 idle_timeout / 10 秒执行一次（调用方持有锁）"""
+        if now - self._pruned_at < self.idle_timeout / 10:
+            return
+        self._pruned_at = now
+        idle = [
+            user_id for user_id, published in self._published.items()
+            if now - published > self.idle_timeout and user_id not in self._waiters
+        ]
+        for user_id in idle:
+            del self._published[user_id]
+            self._buffers.pop(user_id, None)
+            self._evicted.pop(user_id, None)
+        if idle:
+            self._pruned_id = last_id
+
+    def publish(self, user_id, event):
+        now = time.monotonic()
+        with self._lock:
+            event_id = next(self._seq)
+            self._prune(now, event_id)
+            buffer = self._buffers[user_id]
+            if len(buffer) == buffer.maxlen:
+                self._evicted[user_id] = buffer[0][0]
+            buffer.append((event_id, event))
+            self._published[user_id] = now
+            waiters = list(self._waiters.get(user_id, ()))
+
+        for wake in waiters:
+            wake()
+        return str(event_id)
+
+    def _since(self, user_id, cursor):
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            raise EventGap()
+        with self._lock:
+            if cursor < self._evicted.get(user_id, 0):
+                raise EventGap()
+            if user_id not in self._buffers and 0 < cursor < self._pruned_id:
+                raise EventGap()
+            events = [
+                (str(event_id), event)
+                for event_id, event in self._buffers.get(user_id, ())
+                if event_id > cursor
+            ]
+        return events[:self.batch_size]
+
+    def _add_waiter(self, user_id, wake):
+        with self._lock:
+            self._waiters[user_id].add(wake)
+
+    def _remove_waiter(self, user_id, wake):
+        with self._lock:
+            self._waiters[user_id].discard(wake)
+            if not self._waiters[user_id]:
+                del self._waiters[user_id]
+
+    def latest_id(self, user_id):
+        with self._lock:
+            buffer = self._buffers.get(user_id)
+            if buffer:
+                return str(buffer[-1][0])
+        return '0'
+
+    async def alatest_id(self, user_id):
+        return self.latest_id(user_id)
+
+    def read(self, user_id, cursor, timeout):
+        """返回游标之后的事件，没有新事件时最多等待 timeout 秒（阻塞当前线程）"""
+        events = self._since(user_id, cursor)
+        if events:
+            return events
+
+        event = threading.Event()
+        wake = event.set
+        self._add_waiter(user_id, wake)
+        try:
+            # 注册等待后再检查一次，避免错过并发发布的事件
+            events = self._since(user_id, cursor)
+            if events:
+                return events
+            if not event.wait(timeout):
+                return []
+            return self._since(user_id, cursor)
+        finally:
+            self._remove_waiter(user_id, wake)
+
+    async def aread(self, user_id, cursor, timeout):
+        """read 的异步版本，等待时不占用线程"""
+        events = self._since(user_id, cursor)
+        if events:
+            return events
+
+        event = asyncio.Event()
+        wake = functools.partial(asyncio.get_running_loop().call_soon_threadsafe, event.set)
+        self._add_waiter(user_id, wake)
+        try:
+            events = self._since(user_id, cursor)
+            if events:
+                return events
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+            return self._since(user_id, cursor)
+        finally:
+            self._remove_waiter(user_id, wake)
+
+
+class RedisBackend:
+    """
+    基于 Redis Stream 的事件代理，兼容任意实现了 XADD/XREAD 的服务
+
+    每个用户一个 stream，MAXLEN 限制保留的事件数量，多 worker 共享。
+    """
+
+    def __init__(self, url, buffer_size=1000, batch_size=100, key_prefix='realtime:user:', **options):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError as exc:
+            raise ImproperlyConfigured('RedisBackend 需要安装 redis 包') from exc
+
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.key_prefix = key_prefix
+        self._client = redis.Redis.from_url(url)
+        self._async_client = redis.asyncio.Redis.from_url(url)
+
+    def _key(self, user_id):
+        return f'{self.key_prefix}{user_id}'
+
+    @staticmethod
+    def _parse_id(event_id):
+        if isinstance(event_id, bytes):
+            event_id = event_id.decode()
+        ms, _, seq = str(event_id).partition('-')
+        try:
+            return int(ms), int(seq or 0)
+        except ValueError:
+            raise EventGap()
+
+    def publish(self, user_id, event):
+        event_id = self._client.xadd(
+            self._key(user_id),
+            {'data': json.dumps(event)},
+            maxlen=self.buffer_size,
+            approximate=True,
+        )
+        return event_id.decode() if isinstance(event_id, bytes) else event_id
+
+    def _behind(self, cursor, oldest):
+        """游标早于最旧事件（oldest 为 XRANGE COUNT 1 的结果）"""
+        return bool(oldest) and self._parse_id(cursor) < self._parse_id(oldest[0][0])
+
+    @staticmethod
+    def _check_evicted(info):
+        # 游标早于最旧事件，检查中间是否有事件被淘汰
+        if info.get('entries-added', 0) > info.get('length', 0):
+            raise EventGap()
+
+    @staticmethod
+    def _events(response):
+        events = []
+        for _, entries in response or ():
+            for event_id, fields in entries:
+                events.append((event_id.decode(), json.loads(fields[b'data'])))
+        return events
+
+    def latest_id(self, user_id):
+        entries = self._client.xrevrange(self._key(user_id), count=1)
+        return entries[0][0].decode() if entries else '0'
+
+    async def alatest_id(self, user_id):
+        entries = await self._async_client.xrevrange(self._key(user_id), count=1)
+        return entries[0][0].decode() if entries else '0'
+
+    def read(self, user_id, cursor, timeout):
+        # BLOCK 0 表示无限等待，等待时间至少 1 毫秒
+        key = self._key(user_id)
+        if cursor != '0' and self._behind(cursor, self._client.xrange(key, count=1)):
+            self._check_evicted(self._client.xinfo_stream(key))
+        response = self._client.xread({key: cursor}, count=self.batch_size, block=max(1, int(timeout * 1000)))
+        return self._events(response)
+
+    async def aread(self, user_id, cursor, timeout):
+        key = self._key(user_id)
+        if cursor != '0':
+            oldest = await self._async_client.xrange(key, count=1)
+            if self._behind(cursor, oldest):
+                self._check_evicted(await self._async_client.xinfo_stream(key))
+        response = await self._async_client.xread(
+            {key: cursor}, count=self.batch_size, block=max(1, int(timeout * 1000))
+        )
+        return self._events(response)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """按 REALTIME 配置创建（并缓存）事件代理"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                options = dict(settings.REALTIME)
+                backend_class = import_string(options.pop('BACKEND'))
+                _backend = backend_class(**{key.lower(): value for key, value in options.items()})
+    return _backend
+
+
+def publish(user_id, event):
+    return get_backend().publish(user_id, event)
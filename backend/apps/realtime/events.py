@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.dispatch import Signal
+
+from apps.common.cache import bump_user_version
+from apps.sharding.routers import db_for_user
+from .broker import publish
+
+# 用户数据在事务提交后发生变化（包括 queryset.update 等批量路径），
+# 参数 user_id、model、action、ids，用于失效按用户缓存的数据
+data_changed = Signal()
+
+
+def _committed(user_id, event):
+    bump_user_version(user_id)
+    data_changed.send_robust(sender=None, user_id=user_id, **event)
+    publish(user_id, event)
+
+
+def notify_change(user_id, model, action, ids):
+    """
+    在事务提交后向用户推送变更事件
+
+    model: task / project / tag / task_tag
+    action: created / updated / deleted
+    """
+    if user_id is None:
+        return
+    event = {'model': model, 'action': action, 'ids': list(ids)}
+    # 推送失败只记录日志，不影响写请求；等待用户所在分片上的事务提交
+    transaction.on_commit(lambda: _committed(user_id, event), using=db_for_user(user_id), robust=True)
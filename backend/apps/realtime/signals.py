@@ -0,0 +1,44 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.projects.models import Project
+from apps.tags.models import Tag, TaskTag
+from apps.tasks.models import Task
+from .events import notify_change
+
+MODEL_NAMES = {
+    Task: 'task',
+    Project: 'project',
+    Tag: 'tag',
+    TaskTag: 'task_tag',
+}
+
+
+def get_owner_id(instance):
+    """返回变更对象所属用户ID"""
+    if isinstance(instance, TaskTag):
+        # 优先使用已加载的关联对象，避免额外查询
+        for field in (TaskTag.tag.field, TaskTag.task.field):
+            if field.is_cached(instance):
+                return field.get_cached_value(instance).user_id
+        return Tag.objects.filter(pk=instance.tag_id).values_list('user_id', flat=True).first()
+    return instance.user_id
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=TaskTag)
+def on_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    action = 'created' if created else 'updated'
+    notify_change(get_owner_id(instance), MODEL_NAMES[sender], action, [instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=TaskTag)
+def on_deleted(sender, instance, **kwargs):
+    notify_change(get_owner_id(instance), MODEL_NAMES[sender], 'deleted', [instance.pk])
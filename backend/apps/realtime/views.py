@@ -0,0 +1,120 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, AuthenticationFailed
+
+from .broker import EventGap, get_backend
+
+# 客户端断线后的重连间隔（毫秒）
+RETRY_MS = 3000
+
+
+def authenticate(request):
+    """
+    解析 JWT，支持 Authorization 头或 ?token= 参数
+    （浏览器 EventSource 无法设置请求头）
+    """
+    authentication = JWTAuthentication()
+    raw_token = None
+    header = authentication.get_header(request)
+    if header is not None:
+        raw_token = authentication.get_raw_token(header)
+    if raw_token is None:
+        raw_token = request.GET.get('token')
+    if not raw_token:
+        return None
+    try:
+        validated_token = authentication.get_validated_token(raw_token)
+        return authentication.get_user(validated_token)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+
+
+def format_event(event_id, event_type, data):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n'
+
+
+def stream_events(user_id, cursor, duration):
+    """
+    WSGI 下的事件流，每个连接占用一个 worker 线程，最多持续 duration 秒后结束，
+    客户端按 retry 间隔携带 Last-Event-ID 重连续传
+    """
+    backend = get_backend()
+    heartbeat = settings.REALTIME['HEARTBEAT_INTERVAL']
+    deadline = time.monotonic() + duration
+
+    yield f'retry: {RETRY_MS}\n\n'
+    if cursor is None:
+        cursor = backend.latest_id(user_id)
+
+    while (remaining := deadline - time.monotonic()) > 0:
+        try:
+            events = backend.read(user_id, cursor, min(heartbeat, remaining))
+        except EventGap:
+            cursor = backend.latest_id(user_id)
+            yield format_event(cursor, 'reset', {})
+            continue
+
+        if not events:
+            yield ': heartbeat\n\n'
+            continue
+
+        for event_id, event in events:
+            cursor = event_id
+            yield format_event(event_id, 'change', event)
+
+
+async def astream_events(user_id, cursor):
+    """ASGI 下的事件流，等待时不占用线程，连接不限时长"""
+    backend = get_backend()
+    heartbeat = settings.REALTIME['HEARTBEAT_INTERVAL']
+
+    yield f'retry: {RETRY_MS}\n\n'
+    if cursor is None:
+        cursor = await backend.alatest_id(user_id)
+
+    while True:
+        try:
+            events = await backend.aread(user_id, cursor, heartbeat)
+        except EventGap:
+            # 错过的事件已被淘汰，通知客户端重新全量同步
+            cursor = await backend.alatest_id(user_id)
+            yield format_event(cursor, 'reset', {})
+            continue
+
+        if not events:
+            yield ': heartbeat\n\n'
+            continue
+
+        for event_id, event in events:
+            cursor = event_id
+            yield format_event(event_id, 'change', event)
+
+
+@require_GET
+def event_stream(request):
+    """
+    当前用户的变更事件流（Server-Sent Events）
+
+    WSGI（gunicorn gthread worker）下为同步生成器，持续 REALTIME['MAX_DURATION'] 秒后断开重连；
+    ASGI 下为异步生成器，长期保持连接。
+    """
+    user = authenticate(request)
+    if user is None:
+        return JsonResponse({'detail': '身份认证信息未提供或无效'}, status=401)
+
+    cursor = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    if isinstance(request, ASGIRequest):
+        events = astream_events(user.pk, cursor)
+    else:
+        events = stream_events(user.pk, cursor, settings.REALTIME['MAX_DURATION'])
+    response = StreamingHttpResponse(events, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # 关闭 nginx 缓冲，保证事件及时下发
+    response['X-Accel-Buffering'] = 'no'
+    return response
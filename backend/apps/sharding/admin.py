@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.contrib import admin
+from django.http import QueryDict
+
+from .models import UserShard
+from .routers import is_sharded, use_shard
+
+SHARD_PARAM = 'shard'
+
+
+@admin.register(UserShard)
+class UserShardAdmin(admin.ModelAdmin):
+    list_display = ['user', 'alias', 'moving', 'updated_at']
+    list_filter = ['alias', 'moving']
+    search_fields = ['user__username']
+    # 修改分片需要迁移数据，使用 move_user_shard 命令
+    readonly_fields = ['user', 'alias', 'moving', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+
+class ShardFilter(admin.SimpleListFilter):
+    """列表页选择查看的分片，查询由 ShardedModelAdmin 路由，默认 default"""
+
+    title = '分片'
+    parameter_name = SHARD_PARAM
+
+    def lookups(self, request, model_admin):
+        return [(alias, alias) for alias in settings.DATABASE_SHARDS]
+
+    def queryset(self, request, queryset):
+        return queryset
+
+    def get_facet_queryset(self, changelist):
+        # 各分片的数量不能在同一个查询中统计
+        return {}
+
+    def choices(self, changelist):
+        current = self.value() or 'default'
+        for lookup, title in self.lookup_choices:
+            yield {
+                'selected': current == lookup,
+                'query_string': changelist.get_query_string({self.parameter_name: lookup}),
+                'display': title,
+            }
+
+
+class ShardedModelAdmin(admin.ModelAdmin):
+    """
+    分片模型的后台
+
+    后台请求没有数据所属用户，按 ?shard= 选择的分片执行视图中的查询（包括模板渲染），
+    修改、删除页从列表页保存的筛选条件（_changelist_filters）中取分片。
+    """
+
+    def get_shard(self, request):
+        alias = request.GET.get(SHARD_PARAM)
+        if alias is None:
+            alias = QueryDict(request.GET.get('_changelist_filters', '')).get(SHARD_PARAM)
+        return alias if alias in settings.DATABASE_SHARDS else 'default'
+
+    def get_list_filter(self, request):
+        list_filter = super().get_list_filter(request)
+        if is_sharded():
+            return [ShardFilter, *list_filter]
+        return list_filter
+
+    def has_add_permission(self, request):
+        # 新对象应保存到所属用户的分片，通过接口创建
+        return not is_sharded() and super().has_add_permission(request)
+
+    def _on_shard(self, request, view, *args, **kwargs):
+        with use_shard(self.get_shard(request)):
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+            return response
+
+    def changelist_view(self, request, extra_context=None):
+        return self._on_shard(request, super().changelist_view, extra_context)
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        return self._on_shard(request, super().changeform_view, object_id, form_url, extra_context)
+
+    def delete_view(self, request, object_id, extra_context=None):
+        return self._on_shard(request, super().delete_view, object_id, extra_context)
+
+    def history_view(self, request, object_id, extra_context=None):
+        return self._on_shard(request, super().history_view, object_id, extra_context)
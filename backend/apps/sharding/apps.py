@@ -0,0 +1,10 @@
+from django.apps import AppConfig
+
+
+class ShardingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'apps.sharding'
+    verbose_name = '分库'
+
+    def ready(self):
+        from . import signals  # noqa: F401
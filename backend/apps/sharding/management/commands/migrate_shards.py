@@ -0,0 +1,16 @@
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from apps.sharding.routers import use_shard
+
+
+class Command(BaseCommand):
+    help = '依次在 default 和所有分片上执行数据库迁移'
+
+    def handle(self, *args, **options):
+        for alias in settings.DATABASE_SHARDS:
+            self.stdout.write(f'迁移 {alias}')
+            # 数据迁移中的 ORM 操作没有指定数据库，通过 use_shard 路由到正在迁移的分片
+            with use_shard(alias):
+                call_command('migrate', database=alias, interactive=False, verbosity=options['verbosity'])
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.sharding import rebalance
+
+
+class Command(BaseCommand):
+    help = '在线将用户数据迁移到其他分片'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', required=True, help='用户ID，可重复')
+        parser.add_argument('--to', required=True, choices=settings.DATABASE_SHARDS, help='目标分片')
+        parser.add_argument(
+            '--no-wait', action='store_false', dest='wait',
+            help='不等待各进程刷新分片缓存（仅在没有其他进程运行时使用）'
+        )
+
+    def handle(self, *args, **options):
+        for user_id in options['users']:
+            try:
+                copied = rebalance.move_user(user_id, options['to'], wait=options['wait'], log=self.stdout.write)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            if copied:
+                self.stdout.write(self.style.SUCCESS(f'用户 {user_id} 已迁移到 {options["to"]}'))
+            else:
+                self.stdout.write(f'用户 {user_id} 已在 {options["to"]}')
@@ -0,0 +1,12 @@
+from .routers import set_request
+
+
+class ShardMiddleware:
+    """记录当前请求，分片路由据此找到请求用户所在的分片"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        set_request(request)
+        return self.get_response(request)
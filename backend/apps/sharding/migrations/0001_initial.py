@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserShard',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='shard', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='用户')),
+                ('alias', models.CharField(db_index=True, max_length=50, verbose_name='分片')),
+                ('moving', models.BooleanField(default=False, verbose_name='迁移中')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+            ],
+            options={
+                'verbose_name': '用户分片',
+                'verbose_name_plural': '用户分片',
+                'db_table': 'user_shards',
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.db import models
+
+
+class UserShard(models.Model):
+    """
+    用户所在的分片（只保存在 default 库）
+
+    没有记录的用户属于 default。moving 为 True 时用户数据正在迁移，写操作返回 503。
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='shard',
+        verbose_name='用户'
+    )
+    alias = models.CharField(max_length=50, db_index=True, verbose_name='分片')
+    moving = models.BooleanField(default=False, verbose_name='迁移中')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+
+    class Meta:
+        db_table = 'user_shards'
+        verbose_name = '用户分片'
+        verbose_name_plural = verbose_name
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.alias}'
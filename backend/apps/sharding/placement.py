@@ -0,0 +1,90 @@
+"""
+分片分配与分片上的基础数据
+
+- 新用户按 ID 取模分配到 SHARDING['NEW_USER_SHARDS']（默认所有分片）之一
+- 分片上保存一份用户行，分片模型的外键可以照常约束
+- 每个分片的自增ID从 序号 * SHARDING['ID_BLOCK'] 开始，各分片的ID互不重叠，
+  迁移用户时原样复制主键（SQLite 复制后序列会跟随最大ID，只适合本地测试）
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, models
+from django.db.models import sql
+from django.db.models.constants import OnConflict
+
+from .models import UserShard
+from .routers import SHARDED_MODELS, forget
+
+
+def sharded_models():
+    return [apps.get_model(label) for label in sorted(SHARDED_MODELS)]
+
+
+def insert_raw(model, objs, using, ignore_conflicts=False):
+    """原样插入对象：保留主键和 auto_now 字段的值，不触发信号"""
+    if not objs:
+        return
+    fields = model._meta.local_concrete_fields
+    connection = connections[using]
+    batch_size = connection.ops.bulk_batch_size(fields, objs) or len(objs)
+    for start in range(0, len(objs), batch_size):
+        query = sql.InsertQuery(model, on_conflict=OnConflict.IGNORE if ignore_conflicts else None)
+        query.insert_values(fields, objs[start:start + batch_size], raw=True)
+        query.get_compiler(using=using).execute_sql()
+
+
+def copy_user(user, alias):
+    """在分片上保存一份用户行（已存在时跳过）"""
+    if alias == 'default':
+        return
+    User = get_user_model()
+    insert_raw(User, [User.objects.using('default').get(pk=user.pk)], alias, ignore_conflicts=True)
+
+
+def choose_shard(user_id):
+    shards = settings.SHARDING['NEW_USER_SHARDS'] or settings.DATABASE_SHARDS
+    return shards[user_id % len(shards)]
+
+
+def assign(user):
+    """为新用户分配分片，返回分片名"""
+    alias = choose_shard(user.pk)
+    copy_user(user, alias)
+    UserShard.objects.using('default').get_or_create(user_id=user.pk, defaults={'alias': alias})
+    forget(user.pk)
+    return alias
+
+
+def reserve_ids(using):
+    """将分片上自增主键的起点提高到本分片的区间，返回调整的表名列表"""
+    start = settings.DATABASE_SHARDS.index(using) * settings.SHARDING['ID_BLOCK']
+    if start == 0:
+        return []
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    adjusted = []
+    with connection.cursor() as cursor:
+        for model in sharded_models():
+            pk = model._meta.pk
+            if not isinstance(pk, models.AutoField):
+                continue
+            table = model._meta.db_table
+            cursor.execute(f'SELECT MAX({qn(pk.column)}) FROM {qn(table)}')
+            current = cursor.fetchone()[0] or 0
+            if current >= start:
+                continue
+            if connection.vendor == 'postgresql':
+                cursor.execute(
+                    'SELECT setval(pg_get_serial_sequence(%s, %s), %s, false)', [table, pk.column, start + 1]
+                )
+            elif connection.vendor == 'sqlite':
+                cursor.execute('DELETE FROM sqlite_sequence WHERE name = %s', [table])
+                cursor.execute('INSERT INTO sqlite_sequence (name, seq) VALUES (%s, %s)', [table, start])
+            elif connection.vendor == 'mysql':
+                cursor.execute(f'ALTER TABLE {qn(table)} AUTO_INCREMENT = {start + 1}')
+            else:
+                continue
+            adjusted.append(table)
+    return adjusted
@@ -0,0 +1,123 @@
+"""
+在线迁移用户到其他分片
+
+1. 标记迁移中，等待 MAP_TTL 秒让各进程刷新缓存，此后该用户的写操作返回 503，读操作不受影响
+2. 在一个事务中按依赖顺序原样复制用户数据到目标分片（主键不变）
+3. 切换分片并等待各进程刷新，读写转到目标分片
+4. 清除迁移标记，删除源分片上的数据
+
+复制失败时目标分片上的事务回滚，分片恢复为源分片。
+"""
+
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q
+
+from .models import UserShard
+from .placement import copy_user, insert_raw
+from .routers import forget, lookup
+
+# 被引用的表在前，删除时倒序
+COPY_ORDER = [
+    'projects.project',
+    'tags.tag',
+    'tasks.task',
+    'tags.tasktag',
+    'tasks.archivedtask',
+    'tasks.taskactivity',
+    'tasks.taskdailystat',
+    'filters.savedfilter',
+    'quickfind.searchgram',
+]
+CHUNK_SIZE = 2000
+
+
+def user_rows(model, user_id, using):
+    queryset = model._base_manager.using(using).order_by()
+    if model._meta.label_lower == 'tasks.taskactivity':
+        Task = apps.get_model('tasks', 'Task')
+        ArchivedTask = apps.get_model('tasks', 'ArchivedTask')
+        return queryset.filter(
+            Q(task_id__in=Task._base_manager.using(using).filter(user_id=user_id).values('pk'))
+            | Q(task_id__in=ArchivedTask._base_manager.using(using).filter(user_id=user_id).values('pk'))
+        )
+    return queryset.filter(user_id=user_id)
+
+
+def set_mapping(user_id, alias, moving):
+    UserShard.objects.using('default').update_or_create(
+        user_id=user_id, defaults={'alias': alias, 'moving': moving}
+    )
+    forget(user_id)
+
+
+def copy_rows(user_id, source, target):
+    """返回 {模型: 复制的行数}"""
+    copied = {}
+    with transaction.atomic(using=target):
+        for label in COPY_ORDER:
+            model = apps.get_model(label)
+            objs, count = [], 0
+            for obj in user_rows(model, user_id, source).iterator(chunk_size=CHUNK_SIZE):
+                objs.append(obj)
+                if len(objs) >= CHUNK_SIZE:
+                    insert_raw(model, objs, target)
+                    count += len(objs)
+                    objs = []
+            insert_raw(model, objs, target)
+            copied[label] = count + len(objs)
+    return copied
+
+
+def delete_rows(user_id, alias):
+    """跳过信号直接删除用户在 alias 上的数据"""
+    with transaction.atomic(using=alias):
+        for label in reversed(COPY_ORDER):
+            queryset = user_rows(apps.get_model(label), user_id, alias)
+            queryset._raw_delete(alias)
+        if alias != 'default':
+            users = get_user_model()._base_manager.using(alias).filter(pk=user_id)
+            users._raw_delete(alias)
+
+
+def move_user(user_id, target, wait=True, log=None):
+    """将用户迁移到 target 分片，返回 {模型: 复制的行数}"""
+    if target not in settings.DATABASE_SHARDS:
+        raise ValueError(f'未配置的分片：{target}')
+    log = log or (lambda message: None)
+    user = get_user_model().objects.using('default').filter(pk=user_id).first()
+    if user is None:
+        raise ValueError(f'用户 {user_id} 不存在')
+    forget(user_id)
+    source, moving = lookup(user_id)
+    if moving:
+        raise ValueError(f'用户 {user_id} 正在迁移')
+    if source == target:
+        return {}
+
+    def settle():
+        if wait:
+            time.sleep(settings.SHARDING['MAP_TTL'] + 1)
+
+    set_mapping(user_id, source, moving=True)
+    log(f'已标记迁移中，等待各进程停止写入（{source} -> {target}）')
+    settle()
+    try:
+        copy_user(user, target)
+        copied = copy_rows(user_id, source, target)
+    except Exception:
+        set_mapping(user_id, source, moving=False)
+        raise
+    log('复制完成：' + '，'.join(f'{label} {count}' for label, count in copied.items()))
+
+    set_mapping(user_id, target, moving=True)
+    log('已切换分片，等待各进程刷新')
+    settle()
+    set_mapping(user_id, target, moving=False)
+    delete_rows(user_id, source)
+    log(f'已删除 {source} 上的数据')
+    return copied
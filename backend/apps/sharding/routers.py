@@ -0,0 +1,180 @@
+"""
+按用户分库路由
+
+settings.DATABASE_SHARDS 列出所有分片（default 为 0 号分片），用户所在分片记录在 default 库的
+user_shards 表中，没有记录的用户属于 default。SHARDED_MODELS 中的数据只保存在所属用户的分片上，
+用户表等其余数据仍在 default，每个分片另存一份用户行供外键引用。
+
+分片依次按以下来源确定：
+1. use_shard() 显式指定（管理命令、fan_out 使用）
+2. hints 中的对象：已读出的对象所在的库、新对象的 user_id、相关管理器所属的用户
+3. 当前请求的用户（ShardMiddleware 记录）
+都没有时抛出 ShardUnscoped，不默认路由到某个分片（否则只会查到该分片上的数据）。请求以外的代码
+（管理命令、调度器）需要在 use_shard() 中执行或用 fan_out() 遍历分片，后台见 apps.sharding.admin。
+只配置了 default 时路由不做任何处理。
+"""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+SHARDED_MODELS = {
+    'projects.project',
+    'tags.tag',
+    'tags.tasktag',
+    'tasks.task',
+    'tasks.archivedtask',
+    'tasks.taskactivity',
+    'tasks.taskdailystat',
+    'filters.savedfilter',
+    'quickfind.searchgram',
+}
+
+_shard = contextvars.ContextVar('shard', default=None)
+_request = contextvars.ContextVar('shard_request', default=None)
+
+# 进程内缓存 {user_id: (分片, 迁移中, 过期时间)}
+_map = {}
+_map_lock = threading.Lock()
+MAP_SIZE = 10000
+
+
+class ShardMoving(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = '用户数据迁移中，请稍后重试'
+    default_code = 'shard_moving'
+
+
+class ShardUnscoped(RuntimeError):
+    """分片模型的查询无法确定所属分片"""
+
+
+def is_sharded():
+    return len(settings.DATABASE_SHARDS) > 1
+
+
+def lookup(user_id):
+    """返回 (分片, 是否迁移中)"""
+    now = time.monotonic()
+    entry = _map.get(user_id)
+    if entry is None or entry[2] <= now:
+        UserShard = apps.get_model('sharding', 'UserShard')
+        row = UserShard.objects.using('default').filter(user_id=user_id).values_list('alias', 'moving').first()
+        alias, moving = row or ('default', False)
+        entry = (alias, moving, now + settings.SHARDING['MAP_TTL'])
+        with _map_lock:
+            if len(_map) >= MAP_SIZE:
+                _map.clear()
+            _map[user_id] = entry
+    return entry[0], entry[1]
+
+
+def forget(user_id):
+    """丢弃本进程缓存的分片（其他进程在 MAP_TTL 秒内刷新）"""
+    _map.pop(user_id, None)
+
+
+def db_for_user(user_id):
+    if not is_sharded() or user_id is None:
+        return 'default'
+    return lookup(user_id)[0]
+
+
+def set_request(request):
+    """
+    记录当前请求，路由时再读取 request.user（DRF 认证后写回 Django 请求）
+
+    不在响应后清除：流式响应在中间件返回后才读取数据，下一个请求会覆盖。
+    """
+    _request.set(request)
+
+
+def request_user_id():
+    request = _request.get()
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return user.pk
+    return None
+
+
+@contextmanager
+def use_shard(alias):
+    """在上下文中将分片模型的读写路由到指定分片"""
+    if alias not in settings.DATABASE_SHARDS:
+        raise ValueError(f'未配置的分片：{alias}')
+    token = _shard.set(alias)
+    try:
+        yield
+    finally:
+        _shard.reset(token)
+
+
+def fan_out(func, shards=None):
+    """在每个分片上并行执行 func()，返回 {分片: 结果}"""
+    shards = list(shards or settings.DATABASE_SHARDS)
+
+    def run(alias):
+        with use_shard(alias):
+            try:
+                return func()
+            finally:
+                # 连接属于工作线程，用完关闭
+                connections.close_all()
+
+    if len(shards) == 1:
+        with use_shard(shards[0]):
+            return {shards[0]: func()}
+    with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix='shard') as executor:
+        return dict(zip(shards, executor.map(run, shards)))
+
+
+class ShardRouter:
+    """将分片模型路由到所属用户的分片，其余模型交给后面的路由"""
+
+    def route(self, model, hints, write):
+        if not is_sharded() or model._meta.label_lower not in SHARDED_MODELS:
+            return None
+        alias = _shard.get()
+        if alias is not None:
+            return alias
+
+        user_id = None
+        instance = hints.get('instance')
+        if instance is not None:
+            if instance._meta.label_lower in SHARDED_MODELS:
+                if instance._state.db in settings.DATABASE_SHARDS:
+                    return instance._state.db
+                user_id = getattr(instance, 'user_id', None)
+            elif instance._meta.label == settings.AUTH_USER_MODEL:
+                user_id = instance.pk
+        if user_id is None:
+            user_id = request_user_id()
+        if user_id is None:
+            raise ShardUnscoped(f'{model._meta.label} 分片未指定，请在 use_shard() 中执行或使用 fan_out()')
+
+        alias, moving = lookup(user_id)
+        if write and moving:
+            raise ShardMoving()
+        return alias
+
+    def db_for_read(self, model, **hints):
+        alias = self.route(model, hints, write=False)
+        # default 上的读操作交给读写分离路由
+        return None if alias == 'default' else alias
+
+    def db_for_write(self, model, **hints):
+        return self.route(model, hints, write=True)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 分片模型可以引用 default 上的用户
+        return True
+
+    # 不限制迁移：各分片建立完整的表结构，用户表用于外键，删除用户时级联查询的表也需要存在
@@ -0,0 +1,34 @@
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import placement
+from .routers import db_for_user, forget, is_sharded, use_shard
+
+
+@receiver(post_save, sender=get_user_model())
+def assign_shard(sender, instance, created, raw=False, using='default', **kwargs):
+    if not created or raw or using != 'default' or not is_sharded():
+        return
+    transaction.on_commit(lambda: placement.assign(instance), using='default', robust=True)
+
+
+@receiver(pre_delete, sender=get_user_model())
+def delete_shard_data(sender, instance, using='default', **kwargs):
+    """default 上的删除不会级联到其他库，先删除分片上的用户行及其数据"""
+    if using != 'default' or not is_sharded():
+        return
+    alias = db_for_user(instance.pk)
+    if alias != 'default':
+        with use_shard(alias), transaction.atomic(using=alias):
+            get_user_model().objects.using(alias).filter(pk=instance.pk).delete()
+    forget(instance.pk)
+
+
+@receiver(post_migrate, sender=apps.get_app_config('sharding'))
+def reserve_shard_ids(sender, using='default', **kwargs):
+    if using in settings.DATABASE_SHARDS:
+        placement.reserve_ids(using)
@@ -0,0 +1,6 @@
+from django.urls import path
+from .views import ShardStatsView
+
+urlpatterns = [
+    path('', ShardStatsView.as_view(), name='shard-stats'),
+]
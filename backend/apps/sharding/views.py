@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from apps.projects.models import Project
+from apps.tags.models import Tag
+from apps.tasks.models import ArchivedTask, Task
+from .models import UserShard
+from .routers import fan_out
+
+
+def shard_counts():
+    """当前分片（use_shard 指定）上的数据量"""
+    start = time.perf_counter()
+    counts = {
+        'users': Task.objects.order_by().values('user_id').distinct().count(),
+        'tasks': Task.objects.count(),
+        'archived_tasks': ArchivedTask.objects.count(),
+        'projects': Project.objects.count(),
+        'tags': Tag.objects.count(),
+    }
+    counts['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return counts
+
+
+class ShardStatsView(APIView):
+    """各分片的用户分布和数据量，仅管理员可见（并行查询所有分片）"""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        assigned = dict(
+            UserShard.objects.using('default').values_list('alias').annotate(total=Count('pk')).order_by()
+        )
+        moving = list(UserShard.objects.using('default').filter(moving=True).values_list('user_id', flat=True))
+        counts = fan_out(shard_counts)
+        return Response({
+            'shards': [
+                {
+                    'alias': alias,
+                    'vendor': connections[alias].vendor,
+                    'assigned_users': assigned.get(alias, 0),
+                    **counts[alias],
+                }
+                for alias in settings.DATABASE_SHARDS
+            ],
+            'moving_users': moving,
+        })
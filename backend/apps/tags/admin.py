@@ -1,15 +1,17 @@
 from django.contrib import admin
+
+from apps.sharding.admin import ShardedModelAdmin
 from .models import Tag, TaskTag
 
 
 @admin.register(Tag)
-class TagAdmin(admin.ModelAdmin):
-    list_display = ['name', 'color', 'user', 'created_at']
+class TagAdmin(ShardedModelAdmin):
+    list_display = ['name', 'color', 'user', 'usage_count', 'created_at']
     search_fields = ['name']
     list_filter = ['created_at']
 
 
 @admin.register(TaskTag)
-class TaskTagAdmin(admin.ModelAdmin):
+class TaskTagAdmin(ShardedModelAdmin):
     list_display = ['task', 'tag', 'created_at']
     list_filter = ['created_at']
@@ -5,3 +5,6 @@ class TagsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.tags'
     verbose_name = '标签管理'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.sharding.routers import use_shard
+from apps.tags import typeahead, usage
+from apps.tags.models import Tag
+
+
+class Command(BaseCommand):
+    help = '根据任务标签表重新计算标签使用次数'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='只重新计算指定用户，可重复')
+
+    def handle(self, *args, **options):
+        count = 0
+        for alias in settings.DATABASE_SHARDS:
+            with use_shard(alias):
+                queryset = Tag.objects.all()
+                if options['users']:
+                    queryset = queryset.filter(user_id__in=options['users'])
+                count += usage.recount(queryset)
+                for user_id in queryset.values_list('user_id', flat=True).distinct():
+                    typeahead.invalidate(user_id)
+        self.stdout.write(self.style.SUCCESS(f'已更新 {count} 个标签'))
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:39
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_usage_count(apps, schema_editor):
+    Tag = apps.get_model('tags', 'Tag')
+    TaskTag = apps.get_model('tags', 'TaskTag')
+    counts = TaskTag.objects.filter(tag_id=OuterRef('pk')).order_by().values('tag_id').annotate(
+        total=Count('pk')
+    ).values('total')
+    Tag.objects.update(usage_count=Coalesce(Subquery(counts), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0003_alter_tag_options_tag_order'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='usage_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='使用次数'),
+        ),
+        migrations.RunPython(backfill_usage_count, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', '-usage_count'], name='tags_user_usage_idx'),
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_user(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskTag = apps.get_model('tags', 'TaskTag')
+    TaskTag.objects.update(user_id=Subquery(Task.objects.filter(pk=OuterRef('task_id')).values('user_id')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tags', '0004_tag_usage_count'),
+        ('tasks', '0011_task_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tasktag',
+            name='user',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_tags', to=settings.AUTH_USER_MODEL, verbose_name='所属用户'),
+        ),
+        migrations.RunPython(backfill_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='tasktag',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_tags', to=settings.AUTH_USER_MODEL, verbose_name='所属用户'),
+        ),
+        migrations.AlterField(
+            model_name='tasktag',
+            name='task',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='task_tags', to='tasks.task', verbose_name='任务'),
+        ),
+    ]
@@ -9,6 +9,8 @@ class Tag(models.Model):
     name = models.CharField(max_length=50, verbose_name='标签名称')
     color = models.CharField(max_length=7, default='#10B981', verbose_name='颜色')
     order = models.IntegerField(default=0, verbose_name='排序')
+    # 关联的任务数，随任务标签的增删维护，见 apps.tags.usage
+    usage_count = models.PositiveIntegerField(default=0, verbose_name='使用次数')
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -24,6 +26,9 @@ class Tag(models.Model):
         verbose_name_plural = verbose_name
         unique_together = ['name', 'user']
         ordering = ['order', 'id']
+        indexes = [
+            models.Index(fields=['user', '-usage_count'], name='tags_user_usage_idx'),
+        ]
 
     def __str__(self):
         return self.name
@@ -32,13 +37,24 @@ class Tag(models.Model):
 class TaskTag(models.Model):
     """
     任务-标签关联模型
+
+    user 冗余保存任务的所属用户，作为 PostgreSQL 哈希分区的分区键（见 apps.tasks.partitions）。
+    分区表的主键包含 user_id，无法被单列外键引用，因此 task 外键不建数据库约束，
+    级联删除由 ORM 完成。
     """
     task = models.ForeignKey(
         'tasks.Task',
         on_delete=models.CASCADE,
         related_name='task_tags',
+        db_constraint=False,
         verbose_name='任务'
     )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='task_tags',
+        verbose_name='所属用户'
+    )
     tag = models.ForeignKey(
         Tag,
         on_delete=models.CASCADE,
@@ -55,3 +71,8 @@ class TaskTag(models.Model):
 
     def __str__(self):
         return f'{self.task.title} - {self.tag.name}'
+
+    def save(self, *args, **kwargs):
+        if self.user_id is None:
+            self.user_id = self.task.user_id
+        super().save(*args, **kwargs)
@@ -1,12 +1,13 @@
 from rest_framework import serializers
 from .models import Tag, TaskTag
+from apps.common.serializers import DynamicFieldsModelSerializer
 
 
-class TagSerializer(serializers.ModelSerializer):
+class TagSerializer(DynamicFieldsModelSerializer):
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'color', 'user', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'color', 'user', 'usage_count', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'user', 'usage_count', 'created_at', 'updated_at']
 
 
 class TaskTagSerializer(serializers.ModelSerializer):
@@ -0,0 +1,23 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from apps.realtime.events import data_changed
+from . import typeahead, usage
+from .models import TaskTag
+
+
+@receiver(post_save, sender=TaskTag)
+def increment_usage(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        usage.adjust({instance.tag_id: 1})
+
+
+@receiver(post_delete, sender=TaskTag)
+def decrement_usage(sender, instance, **kwargs):
+    usage.adjust({instance.tag_id: -1})
+
+
+@receiver(data_changed)
+def invalidate_typeahead(sender, user_id, model, **kwargs):
+    if model in ('tag', 'task_tag'):
+        typeahead.invalidate(user_id)
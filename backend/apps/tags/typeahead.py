@@ -0,0 +1,128 @@
+"""
+标签输入联想
+
+每个用户的标签构成一个按名称排序的内存索引：前缀匹配用二分查找，
+其余标签按子串、子序列模糊匹配，同一档内按使用次数排序。
+
+两级缓存：
+- 进程内 LRU，保存构建好的索引，按版本号校验
+- 共享缓存，按版本号保存标签行，其他 worker 构建索引时不必查询数据库
+
+标签或任务标签变更（事务提交后）时更换用户的版本号，两级缓存随之失效。
+默认缓存为进程内缓存时改用用户的数据版本号（见 apps.common.cache），
+其他 worker 的变更同样能使本进程的索引失效（任务变更也会使其失效）。
+"""
+
+import threading
+import uuid
+from bisect import bisect_left
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from apps.common import cache as shared_cache
+from apps.metrics.registry import cache_lookup
+from .models import Tag
+
+# 匹配档位：前缀 < 单词前缀/子串 < 子序列
+PREFIX, SUBSTRING, SUBSEQUENCE = range(3)
+
+_lock = threading.Lock()
+_local = OrderedDict()
+
+
+class TagIndex:
+    """单个用户的标签索引，rows 为 (id, name, color, usage_count)"""
+
+    def __init__(self, rows):
+        self.rows = sorted(rows, key=lambda row: (row[1].casefold(), row[0]))
+        self.keys = [row[1].casefold() for row in self.rows]
+
+    def prefix_range(self, term):
+        start = bisect_left(self.keys, term)
+        end = bisect_left(self.keys, term + '\U0010ffff', start)
+        return start, end
+
+    def search(self, term, limit):
+        """返回按 (匹配档位, 使用次数降序, 名称长度) 排序的前 limit 个标签"""
+        term = term.strip().casefold()
+        if not term:
+            ranked = sorted(self.rows, key=lambda row: (-row[3], row[1].casefold()))
+            return [self.to_dict(row) for row in ranked[:limit]]
+
+        start, end = self.prefix_range(term)
+        matches = [(PREFIX, row) for row in self.rows[start:end]]
+        for position, key in enumerate(self.keys):
+            if start <= position < end:
+                continue
+            if term in key:
+                matches.append((SUBSTRING, self.rows[position]))
+            elif is_subsequence(term, key):
+                matches.append((SUBSEQUENCE, self.rows[position]))
+
+        matches.sort(key=lambda match: (match[0], -match[1][3], len(match[1][1]), match[1][1].casefold()))
+        return [self.to_dict(row) for _, row in matches[:limit]]
+
+    @staticmethod
+    def to_dict(row):
+        return {'id': row[0], 'name': row[1], 'color': row[2], 'usage_count': row[3]}
+
+
+def is_subsequence(term, key):
+    chars = iter(key)
+    return all(char in chars for char in term)
+
+
+def version_key(user_id):
+    return f'tags:typeahead:version:{user_id}'
+
+
+def rows_key(user_id, version):
+    return f'tags:typeahead:rows:{user_id}:{version}'
+
+
+def invalidate(user_id):
+    if shared_cache.is_shared():
+        cache.set(version_key(user_id), uuid.uuid4().hex, settings.TAG_TYPEAHEAD['TIMEOUT'])
+
+
+def get_version(user_id):
+    if not shared_cache.is_shared():
+        return shared_cache.user_version(user_id)
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, settings.TAG_TYPEAHEAD['TIMEOUT'])
+        version = cache.get(key)
+    return version
+
+
+def get_index(user_id):
+    # 先读版本号再读数据，读取后发生的变更会更换版本号
+    version = get_version(user_id)
+    with _lock:
+        entry = _local.get(user_id)
+        if entry is not None and entry[0] == version:
+            _local.move_to_end(user_id)
+            cache_lookup('tag_typeahead_local', True)
+            return entry[1]
+    cache_lookup('tag_typeahead_local', False)
+
+    rows = cache.get(rows_key(user_id, version))
+    cache_lookup('tag_typeahead_shared', rows is not None)
+    if rows is None:
+        rows = list(Tag.objects.filter(user_id=user_id).values_list('id', 'name', 'color', 'usage_count'))
+        cache.set(rows_key(user_id, version), rows, settings.TAG_TYPEAHEAD['TIMEOUT'])
+
+    index = TagIndex(rows)
+    with _lock:
+        _local[user_id] = (version, index)
+        _local.move_to_end(user_id)
+        while len(_local) > settings.TAG_TYPEAHEAD['LOCAL_SIZE']:
+            _local.popitem(last=False)
+    return index
+
+
+def search(user_id, term, limit=10):
+    return get_index(user_id).search(term, limit)
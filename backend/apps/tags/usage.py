@@ -0,0 +1,47 @@
+"""
+标签使用次数
+
+Tag.usage_count 为关联的任务标签数（包括回收站中的任务，不包括已归档的任务）。
+单条增删由 signals 维护，bulk_create 等不触发信号的批量路径需要调用 adjust()，
+批量添加任务标签使用 add_tags()。
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from apps.realtime.events import notify_change
+from .models import Tag, TaskTag
+
+
+def adjust(deltas):
+    """按 {标签ID: 增量} 更新使用次数，增量相同的标签合并为一条 UPDATE"""
+    groups = defaultdict(list)
+    for tag_id, delta in Counter(deltas).items():
+        if delta:
+            groups[delta].append(tag_id)
+    for delta, tag_ids in groups.items():
+        Tag.objects.filter(pk__in=tag_ids).update(
+            usage_count=Greatest(F('usage_count') + delta, Value(0))
+        )
+
+
+def recount(queryset=None):
+    """按任务标签表重新计算使用次数，返回更新的标签数"""
+    queryset = Tag.objects.all() if queryset is None else queryset
+    counts = TaskTag.objects.filter(tag_id=OuterRef('pk')).order_by().values('tag_id').annotate(
+        total=Count('pk')
+    ).values('total')
+    return queryset.update(usage_count=Coalesce(Subquery(counts), Value(0)))
+
+
+def add_tags(task, tag_ids):
+    """批量创建任务标签，同步使用次数并推送变更（bulk_create 不触发信号）"""
+    task_tags = TaskTag.objects.bulk_create([
+        TaskTag(task=task, user_id=task.user_id, tag_id=tag_id) for tag_id in tag_ids
+    ])
+    if task_tags:
+        adjust(Counter(task_tag.tag_id for task_tag in task_tags))
+        notify_change(task.user_id, 'task_tag', 'created', [task_tag.pk for task_tag in task_tags])
+    return task_tags
@@ -1,14 +1,19 @@
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from .models import Tag, TaskTag
 from .serializers import TagSerializer, TaskTagSerializer
+from . import typeahead
+from apps.common.mixins import ReplicaReadMixin, SparseFieldsetMixin
 
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(ReplicaReadMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = TagSerializer
+    replica_actions = {'list'}
 
     def get_queryset(self):
-        return Tag.objects.filter(user=self.request.user)
+        queryset = Tag.objects.filter(user=self.request.user)
+        return self.defer_unrequested_fields(queryset)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
@@ -25,13 +30,25 @@ class TagViewSet(viewsets.ModelViewSet):
                 # 更新颜色（如果提供了新颜色）
                 if 'color' in request.data:
                     existing_tag.color = request.data['color']
-                    existing_tag.save()
+                    existing_tag.save(update_fields=['color', 'updated_at'])
                 serializer = self.get_serializer(existing_tag)
                 return Response(serializer.data, status=status.HTTP_200_OK)
         
         # 如果不存在，正常创建
         return super().create(request, *args, **kwargs)
 
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        """标签输入联想：?q= 前缀/模糊匹配，按使用次数排序"""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            return Response(
+                {'error': 'limit must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(typeahead.search(request.user.pk, request.query_params.get('q', ''), limit))
+
 
 class TaskTagViewSet(viewsets.ModelViewSet):
     serializer_class = TaskTagSerializer
@@ -0,0 +1,160 @@
+"""
+任务变更记录
+
+变更在事务提交后写入。ACTIVITY_LOG['WRITER'] 为 commit 时，请求中各事务提交的记录先收集起来，
+请求结束时按库一次 bulk_create（ActivityLogMiddleware，没有开启 ATOMIC_REQUESTS 时每次保存各自提交）；
+为 thread 时交给后台线程按批写入，不占用请求时间。
+"""
+
+import atexit
+import contextvars
+import logging
+import queue
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import close_old_connections, router, transaction
+
+from .models import TaskActivity
+
+logger = logging.getLogger(__name__)
+
+# 记录的字段，键为 rollup 状态中的字段名，值为记录中使用的名称
+TRACKED_FIELDS = {
+    'status': 'status',
+    'priority': 'priority',
+    'project_id': 'project',
+    'due_date': 'due_date',
+    'is_deleted': 'is_deleted',
+}
+
+
+def snapshot(task):
+    """提取任务被记录字段的当前值"""
+    return {field: getattr(task, field) for field in TRACKED_FIELDS}
+
+
+def diff(before, after):
+    """返回 {字段: [旧值, 新值]}，只包含变化的字段"""
+    return {
+        name: [before.get(field), after.get(field)]
+        for field, name in TRACKED_FIELDS.items()
+        if before.get(field) != after.get(field)
+    }
+
+
+def build(task_id, changes, action='updated'):
+    """没有变化时返回 None"""
+    if action == 'updated' and not changes:
+        return None
+    return TaskActivity(task_id=task_id, action=action, changes=changes)
+
+
+def log(*entries):
+    """在当前事务提交后写入记录，事务回滚时丢弃"""
+    entries = [entry for entry in entries if entry is not None]
+    if entries:
+        # 记录与任务在同一个库（分库时为用户所在分片），后台线程中无法再按请求路由
+        using = router.db_for_write(TaskActivity)
+        transaction.on_commit(lambda: _write(entries, using), using=using, robust=True)
+
+
+def log_changes(before_states, after_states):
+    """批量路径使用，before_states/after_states 为 {id: state}"""
+    log(*(
+        build(task_id, diff(before, after_states[task_id]))
+        for task_id, before in before_states.items()
+        if task_id in after_states
+    ))
+
+
+_pending = contextvars.ContextVar('activity_pending', default=None)
+
+
+@contextmanager
+def buffered():
+    """上下文中提交的记录在结束时按库合并写入"""
+    pending = defaultdict(list)
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+        for using, entries in pending.items():
+            try:
+                TaskActivity.objects.using(using).bulk_create(entries)
+            except Exception:
+                logger.exception('写入 %d 条任务变更记录失败', len(entries))
+
+
+def _write(entries, using):
+    if settings.ACTIVITY_LOG['WRITER'] == 'thread':
+        get_writer().submit(entries, using)
+    elif (pending := _pending.get()) is not None:
+        pending[using].extend(entries)
+    else:
+        TaskActivity.objects.using(using).bulk_create(entries)
+
+
+class BackgroundWriter:
+    """后台线程：积攒一批记录或等待 flush_interval 秒后批量写入"""
+
+    def __init__(self, batch_size=500, flush_interval=1.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        self.thread = threading.Thread(target=self.run, name='activity-writer', daemon=True)
+        self.thread.start()
+        atexit.register(self.flush)
+
+    def submit(self, entries, using='default'):
+        for entry in entries:
+            self.queue.put((using, entry))
+
+    def take_batch(self, timeout):
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=timeout))
+            while len(batch) < self.batch_size:
+                batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def write(self, batch):
+        by_db = defaultdict(list)
+        for using, entry in batch:
+            by_db[using].append(entry)
+        for using, entries in by_db.items():
+            try:
+                TaskActivity.objects.using(using).bulk_create(entries)
+            except Exception:
+                logger.exception('写入 %d 条任务变更记录失败', len(entries))
+
+    def flush(self):
+        """写入队列中剩余的记录（进程退出时调用）"""
+        while batch := self.take_batch(timeout=0):
+            self.write(batch)
+
+    def run(self):
+        while True:
+            batch = self.take_batch(timeout=self.flush_interval)
+            if batch:
+                close_old_connections()
+                self.write(batch)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                config = settings.ACTIVITY_LOG
+                _writer = BackgroundWriter(config['BATCH_SIZE'], config['FLUSH_INTERVAL'])
+    return _writer
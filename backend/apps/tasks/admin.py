@@ -1,10 +1,36 @@
 from django.contrib import admin
-from .models import Task
+
+from apps.sharding.admin import ShardedModelAdmin
+from .models import ArchivedTask, Task, TaskActivity, TaskDailyStat
 
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(ShardedModelAdmin):
     list_display = ['title', 'user', 'project', 'priority', 'status', 'due_date', 'created_at']
     search_fields = ['title', 'description']
     list_filter = ['priority', 'status', 'is_starred', 'created_at']
     date_hierarchy = 'created_at'
+
+
+@admin.register(TaskDailyStat)
+class TaskDailyStatAdmin(ShardedModelAdmin):
+    list_display = ['user', 'date', 'project_ref', 'priority', 'created_count', 'completed_count', 'overdue_count']
+    list_filter = ['date', 'priority']
+    date_hierarchy = 'date'
+
+
+@admin.register(TaskActivity)
+class TaskActivityAdmin(ShardedModelAdmin):
+    # 任务可能已归档，只显示ID
+    list_display = ['task_id', 'action', 'changes', 'created_at']
+    list_filter = ['action']
+    raw_id_fields = ['task']
+
+
+@admin.register(ArchivedTask)
+class ArchivedTaskAdmin(ShardedModelAdmin):
+    list_display = ['title', 'user', 'project', 'priority', 'completed_at', 'archived_at']
+    search_fields = ['title', 'description']
+    list_filter = ['priority', 'archived_at']
+    raw_id_fields = ['user', 'project']
+    date_hierarchy = 'completed_at'
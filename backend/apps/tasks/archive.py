@@ -0,0 +1,146 @@
+"""
+已完成任务归档
+
+完成超过 ARCHIVE['AFTER_DAYS'] 天的任务分批移入 tasks_archive 表，任务标签一并移走，
+活跃清单只需扫描任务表中的剩余任务。移动时直接执行 SQL，不触发信号：
+
+- 每日汇总保持不变，归档任务的贡献仍然有效（重建时同时读取两张表，见 rollup.rebuild）
+- 变更记录保留，恢复后仍可查看
+- 标签使用次数只统计任务表中的关联，移出、移回时同步调整
+
+有未归档子任务的任务不会归档。对已归档任务的写操作先调用 restore() 将其移回任务表。
+"""
+
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Case, Count, DateTimeField, Exists, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from apps.common.db import delete_rows
+from apps.realtime.events import notify_change
+from apps.tags.models import Tag, TaskTag
+from apps.tags.usage import add_tags, adjust
+from .models import ArchivedTask, Task
+
+# 任务表与归档表共有的列
+ARCHIVED_FIELDS = [
+    field.attname for field in ArchivedTask._meta.concrete_fields
+    if field.attname not in ('tag_ids', 'archived_at')
+]
+
+
+def archivable(cutoff, user_ids=None):
+    """可以归档的任务：完成时间早于 cutoff、不在回收站、没有未归档的子任务"""
+    queryset = Task.objects.filter(
+        completed_at__isnull=False,
+        completed_at__lt=cutoff,
+        status='completed',
+        is_deleted=False,
+    ).exclude(Exists(Task.objects.filter(parent_id=OuterRef('pk'))))
+    if user_ids:
+        queryset = queryset.filter(user_id__in=user_ids)
+    return queryset
+
+
+def archive_batch(cutoff, batch_size=None, user_ids=None):
+    """归档一批任务，返回归档的任务数"""
+    batch_size = batch_size or settings.ARCHIVE['BATCH_SIZE']
+    queryset = archivable(cutoff, user_ids).order_by('completed_at')
+    using = router.db_for_write(Task)
+    if connections[using].features.has_select_for_update_skip_locked:
+        # 多个归档进程并行时跳过彼此锁定的任务，同时阻止并发修改
+        queryset = queryset.select_for_update(skip_locked=True, of=('self',))
+
+    with transaction.atomic(using=using):
+        rows = list(queryset.values(*ARCHIVED_FIELDS)[:batch_size])
+        if not rows:
+            return 0
+        task_ids = [row['id'] for row in rows]
+        task_tags = list(TaskTag.objects.filter(task_id__in=task_ids).values_list('id', 'task_id', 'tag_id'))
+        tag_ids = defaultdict(list)
+        for _, task_id, tag_id in task_tags:
+            tag_ids[task_id].append(tag_id)
+
+        now = timezone.now()
+        ArchivedTask.objects.bulk_create([
+            ArchivedTask(**row, tag_ids=tag_ids[row['id']], archived_at=now) for row in rows
+        ])
+        delete_rows(TaskTag, [task_tag_id for task_tag_id, _, _ in task_tags], using)
+        adjust({tag_id: -count for tag_id, count in Counter(tag_id for _, _, tag_id in task_tags).items()})
+        delete_rows(Task, task_ids, using)
+
+        # 客户端收到 updated 后重新读取任务，详情接口会从归档表返回
+        by_user = defaultdict(list)
+        for row in rows:
+            by_user[row['user_id']].append(row['id'])
+        links_by_user = defaultdict(list)
+        users = {row['id']: row['user_id'] for row in rows}
+        for task_tag_id, task_id, _ in task_tags:
+            links_by_user[users[task_id]].append(task_tag_id)
+        for user_id, ids in by_user.items():
+            notify_change(user_id, 'task', 'updated', ids)
+            if links_by_user[user_id]:
+                notify_change(user_id, 'task_tag', 'deleted', links_by_user[user_id])
+    return len(rows)
+
+
+def restore(user_id, task_ids):
+    """
+    将已归档任务移回任务表，返回移回的任务ID列表
+
+    已归档的上级任务一并移回；父任务已被删除时置空，已删除的标签不再关联。
+    """
+    try:
+        pending = {int(pk) for pk in task_ids}
+    except (TypeError, ValueError):
+        return []
+
+    with transaction.atomic(using=router.db_for_write(ArchivedTask)):
+        rows, checked = {}, set()
+        while pending:
+            checked |= pending
+            found = ArchivedTask.objects.filter(user_id=user_id, pk__in=pending).select_for_update()
+            for row in found.values(*ARCHIVED_FIELDS, 'tag_ids'):
+                rows[row['id']] = row
+            # 继续查找同样已归档的上级任务
+            pending = {row['parent_id'] for row in rows.values() if row['parent_id'] is not None} - checked
+        if not rows:
+            return []
+
+        parents = {row['parent_id'] for row in rows.values()} - set(rows) - {None}
+        missing = parents - set(Task.objects.filter(pk__in=parents).values_list('pk', flat=True))
+        tag_lists = {pk: row.pop('tag_ids') for pk, row in rows.items()}
+        tasks = [
+            Task(**{**row, 'parent_id': None if row['parent_id'] in missing else row['parent_id']})
+            for row in rows.values()
+        ]
+        # bulk_create 不触发信号，每日汇总保持不变；auto_now 字段会被覆盖，随后用一条 UPDATE 写回原值
+        Task.objects.bulk_create(tasks)
+        Task.objects.filter(pk__in=rows).update(**{
+            field: Case(
+                *[When(pk=pk, then=Value(row[field])) for pk, row in rows.items()],
+                output_field=DateTimeField(),
+            )
+            for field in ('created_at', 'updated_at')
+        })
+        ArchivedTask.objects.filter(pk__in=rows).delete()
+
+        existing_tags = set(Tag.objects.filter(
+            user_id=user_id, pk__in={tag_id for tag_ids in tag_lists.values() for tag_id in tag_ids}
+        ).values_list('pk', flat=True))
+        for task in tasks:
+            add_tags(task, [tag_id for tag_id in tag_lists[task.pk] if tag_id in existing_tags])
+        notify_change(user_id, 'task', 'updated', list(rows))
+    return list(rows)
+
+
+def subtasks_count():
+    """已归档任务的子任务数（子任务只可能也在归档表中）"""
+    counts = ArchivedTask.objects.filter(parent_id=OuterRef('pk')).order_by().values('parent_id').annotate(
+        total=Count('pk')
+    ).values('total')
+    return Coalesce(Subquery(counts), Value(0))
+
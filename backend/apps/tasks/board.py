@@ -0,0 +1,92 @@
+"""
+看板视图
+
+按状态、优先级、项目或标签分列，每列用 ROW_NUMBER() OVER (PARTITION BY 列)
+在一次查询中取前 N 张卡片和列总数；后续卡片按列使用游标（键集分页）加载。
+"""
+
+import base64
+import json
+
+from django.db.models import Count, F, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils.dateparse import parse_datetime
+
+from .models import Task
+
+# group_by 参数 -> 分列字段
+BOARD_GROUPS = {
+    'status': 'status',
+    'priority': 'priority',
+    'project': 'project_id',
+    'tag': 'task_tags__tag_id',
+}
+
+# 卡片顺序，与 Task.Meta.ordering 一致，并以 id 保证唯一
+CARD_ORDERING = [F('order').asc(), F('created_at').desc(), F('id').desc()]
+
+
+def fixed_columns(group_by):
+    """状态和优先级的列固定，空列也返回"""
+    if group_by == 'status':
+        return [value for value, _ in Task.STATUS_CHOICES]
+    if group_by == 'priority':
+        return [value for value, _ in Task.PRIORITY_CHOICES]
+    return []
+
+
+def with_column(queryset, group_by):
+    return queryset.annotate(board_column=F(BOARD_GROUPS[group_by]))
+
+
+def rank(queryset, limit):
+    """每列取前 limit 张卡片，附带 board_position 和 board_count"""
+    partition = [F('board_column')]
+    return queryset.annotate(
+        board_position=Window(RowNumber(), partition_by=partition, order_by=CARD_ORDERING),
+        board_count=Window(Count('pk'), partition_by=partition),
+    ).filter(board_position__lte=limit)
+
+
+def parse_column(group_by, value):
+    """解析 ?column= 参数，'none' 表示无项目/无标签"""
+    if value == 'none':
+        return None
+    if group_by in ('project', 'tag'):
+        return int(value)
+    if value not in fixed_columns(group_by):
+        raise ValueError(value)
+    return value
+
+
+def filter_column(queryset, value):
+    if value is None:
+        return queryset.filter(board_column__isnull=True)
+    return queryset.filter(board_column=value)
+
+
+def encode_cursor(task):
+    raw = json.dumps([task.order, task.created_at.isoformat(), task.pk])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """格式错误时抛出 ValueError"""
+    try:
+        order, created_at, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        created_at = parse_datetime(created_at)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise ValueError(cursor)
+    if created_at is None:
+        raise ValueError(cursor)
+    return int(order), created_at, int(pk)
+
+
+def after_cursor(queryset, cursor):
+    """按 CARD_ORDERING 取游标之后的卡片"""
+    order, created_at, pk = decode_cursor(cursor)
+    return queryset.filter(
+        Q(order__gt=order)
+        | Q(order=order, created_at__lt=created_at)
+        | Q(order=order, created_at=created_at, pk__lt=pk)
+    )
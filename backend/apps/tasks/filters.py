@@ -0,0 +1,35 @@
+from django_filters import rest_framework as filters
+
+from apps.common.fields import ChoiceCodeField
+from .models import ArchivedTask, Task
+
+
+class TaskFilter(filters.FilterSet):
+    """
+    任务筛选
+
+    状态和优先级以整数存储，比较查询直接作用于整数列，
+    如 ?priority__gte=medium、?status__in=todo,in_progress。
+    """
+
+    class Meta:
+        model = Task
+        fields = {
+            'status': ['exact', 'in'],
+            'priority': ['exact', 'in', 'gt', 'gte', 'lt', 'lte'],
+            'project': ['exact'],
+            'is_starred': ['exact'],
+        }
+        filter_overrides = {
+            ChoiceCodeField: {
+                'filter_class': filters.ChoiceFilter,
+                'extra': lambda field: {'choices': field.choices},
+            },
+        }
+
+
+class ArchivedTaskFilter(TaskFilter):
+    """已归档任务筛选，参数与 TaskFilter 相同"""
+
+    class Meta(TaskFilter.Meta):
+        model = ArchivedTask
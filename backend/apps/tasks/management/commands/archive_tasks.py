@@ -0,0 +1,38 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.sharding.routers import use_shard
+from apps.tasks import archive
+
+
+class Command(BaseCommand):
+    help = '将完成超过指定天数的任务分批移入归档表'
+
+    def add_arguments(self, parser):
+        config = settings.ARCHIVE
+        parser.add_argument('--days', type=int, default=config['AFTER_DAYS'], help='完成超过多少天的任务')
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'])
+        parser.add_argument('--user', type=int, action='append', dest='users', help='只归档指定用户，可重复')
+        parser.add_argument('--max-batches', type=int, help='最多处理的批数，默认处理完为止')
+        parser.add_argument('--sleep', type=float, default=0, help='每批之间暂停的秒数，降低对线上的影响')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        total = batches = 0
+        # 依次处理各分片，--max-batches 为所有分片合计
+        for alias in settings.DATABASE_SHARDS:
+            with use_shard(alias):
+                while options['max_batches'] is None or batches < options['max_batches']:
+                    count = archive.archive_batch(cutoff, options['batch_size'], options['users'])
+                    if not count:
+                        break
+                    total += count
+                    batches += 1
+                    self.stdout.write(f'第 {batches} 批（{alias}）：{count} 个任务')
+                    if options['sleep']:
+                        time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f'共归档 {total} 个任务'))
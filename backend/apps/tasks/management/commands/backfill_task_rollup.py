@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.sharding.routers import use_shard
+from apps.tasks import rollup
+
+
+class Command(BaseCommand):
+    help = '根据任务表和归档表重建每日汇总数据'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='只重建指定用户，可重复')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        count = 0
+        for alias in settings.DATABASE_SHARDS:
+            with use_shard(alias):
+                count += rollup.rebuild(options['users'], chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'已写入 {count} 行每日汇总'))
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.tasks import partitions
+
+
+class Command(BaseCommand):
+    help = '将 tasks 和 task_tags 转换为按用户哈希分区的分区表（仅 PostgreSQL）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--partitions', type=int, default=16, help='分区数')
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--sql', action='store_true', help='只输出将要执行的 SQL')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if not partitions.supports_partitioning(using):
+            self.stdout.write('当前数据库不支持声明式分区，保持普通表')
+            return
+        if options['partitions'] < 2:
+            raise CommandError('分区数至少为 2')
+
+        if options['sql']:
+            for statement in partitions.partition_sql(options['partitions'], using):
+                self.stdout.write(f'{statement};')
+            return
+
+        converted = partitions.partition(options['partitions'], using)
+        if not converted:
+            self.stdout.write('任务表已经是分区表')
+            return
+        self.stdout.write(self.style.SUCCESS(f'已分区：{", ".join(converted)}（{options["partitions"]} 个分区）'))
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.sharding.routers import use_shard
+from apps.tasks.reminders import ReminderScheduler, get_sink
+
+
+class Command(BaseCommand):
+    help = '运行截止时间提醒调度器'
+
+    def add_arguments(self, parser):
+        config = settings.REMINDERS
+        parser.add_argument('--sink', help='通知出口类路径，默认使用 REMINDERS["SINK"]')
+        parser.add_argument('--horizon', type=int, default=config['HORIZON'], help='每次加载未来多少秒内的提醒')
+        parser.add_argument('--refill-interval', type=int, default=config['REFILL_INTERVAL'])
+        parser.add_argument('--batch-size', type=int, default=config['BATCH_SIZE'])
+        parser.add_argument('--once', action='store_true', help='只处理当前到期的提醒后退出')
+        parser.add_argument(
+            '--shard', default='default', choices=settings.DATABASE_SHARDS, help='分库时每个分片运行一个调度器'
+        )
+
+    def handle(self, *args, **options):
+        with use_shard(options['shard']):
+            self.schedule(options)
+
+    def schedule(self, options):
+        scheduler = ReminderScheduler(
+            get_sink(options['sink']),
+            horizon=options['horizon'],
+            refill_interval=options['refill_interval'],
+            batch_size=options['batch_size'],
+        )
+        if options['once']:
+            sent = scheduler.run_once()
+            self.stdout.write(self.style.SUCCESS(f'已发送 {sent} 条提醒'))
+            return
+        self.stdout.write('提醒调度器已启动')
+        try:
+            scheduler.run_forever()
+        except KeyboardInterrupt:
+            pass
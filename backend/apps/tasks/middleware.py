@@ -0,0 +1,16 @@
+from django.conf import settings
+
+from . import activity
+
+
+class ActivityLogMiddleware:
+    """commit 模式下收集整个请求提交的任务变更记录，响应前按库一次写入"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if settings.ACTIVITY_LOG['WRITER'] != 'commit':
+            return self.get_response(request)
+        with activity.buffered():
+            return self.get_response(request)
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_is_deleted'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='日期')),
+                ('project_ref', models.BigIntegerField(default=0, verbose_name='项目ID')),
+                ('priority', models.CharField(default='none', max_length=10, verbose_name='优先级')),
+                ('created_count', models.IntegerField(default=0, verbose_name='创建数')),
+                ('completed_count', models.IntegerField(default=0, verbose_name='完成数')),
+                ('due_count', models.IntegerField(default=0, verbose_name='到期数')),
+                ('overdue_count', models.IntegerField(default=0, verbose_name='逾期数')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_daily_stats', to=settings.AUTH_USER_MODEL, verbose_name='所属用户')),
+            ],
+            options={
+                'verbose_name': '任务每日汇总',
+                'verbose_name_plural': '任务每日汇总',
+                'db_table': 'task_daily_stats',
+                'constraints': [models.UniqueConstraint(fields=('user', 'date', 'project_ref', 'priority'), name='uniq_task_daily_stat')],
+            },
+        ),
+    ]
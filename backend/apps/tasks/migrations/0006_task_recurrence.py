@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_is_pinned'),
+        ('tasks', '0005_task_daily_stat'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='recurrence',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='重复规则'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='recurrence_start',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='重复起始时间'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('recurrence', ''), _negated=True), fields=['user', 'due_date'], name='tasks_recurring_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_recurrence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='next_reminder_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='下次提醒时间'),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='reminder_offsets',
+            field=models.JSONField(blank=True, default=list, verbose_name='提醒时间'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:25
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_reminders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskActivity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('action', models.CharField(choices=[('created', '创建'), ('updated', '修改')], default='updated', max_length=10, verbose_name='操作')),
+                ('changes', models.JSONField(blank=True, default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='变更内容')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='时间')),
+                ('task', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='activities', to='tasks.task', verbose_name='任务')),
+            ],
+            options={
+                'verbose_name': '任务变更记录',
+                'verbose_name_plural': '任务变更记录',
+                'db_table': 'task_activities',
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['task', '-created_at'], name='task_activity_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,97 @@
+# 状态和优先级改为小整数存储：先写入临时整数列，再替换原来的字符串列
+
+import apps.common.fields
+from django.db import migrations, models
+from django.db.models import Case, Value, When
+
+PRIORITIES = ['none', 'low', 'medium', 'high']
+STATUSES = ['todo', 'in_progress', 'completed']
+
+
+def encode(field, values):
+    return Case(
+        *[When(**{field: value}, then=Value(code)) for code, value in enumerate(values)],
+        default=Value(0),
+    )
+
+
+def decode(field, values):
+    return Case(
+        *[When(**{field: code}, then=Value(value)) for code, value in enumerate(values)],
+        default=Value(values[0]),
+    )
+
+
+def to_codes(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskDailyStat = apps.get_model('tasks', 'TaskDailyStat')
+    Task.objects.update(
+        priority_code=encode('priority', PRIORITIES),
+        status_code=encode('status', STATUSES),
+    )
+    TaskDailyStat.objects.update(priority_code=encode('priority', PRIORITIES))
+
+
+def to_strings(apps, schema_editor):
+    Task = apps.get_model('tasks', 'Task')
+    TaskDailyStat = apps.get_model('tasks', 'TaskDailyStat')
+    Task.objects.update(
+        priority=decode('priority_code', PRIORITIES),
+        status=decode('status_code', STATUSES),
+    )
+    TaskDailyStat.objects.update(priority=decode('priority_code', PRIORITIES))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_activity'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='taskdailystat',
+            name='uniq_task_daily_stat',
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='priority_code',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='status_code',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='taskdailystat',
+            name='priority_code',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.RunPython(to_codes, to_strings),
+        migrations.RemoveField(model_name='task', name='priority'),
+        migrations.RemoveField(model_name='task', name='status'),
+        migrations.RemoveField(model_name='taskdailystat', name='priority'),
+        migrations.RenameField(model_name='task', old_name='priority_code', new_name='priority'),
+        migrations.RenameField(model_name='task', old_name='status_code', new_name='status'),
+        migrations.RenameField(model_name='taskdailystat', old_name='priority_code', new_name='priority'),
+        migrations.AlterField(
+            model_name='task',
+            name='priority',
+            field=apps.common.fields.ChoiceCodeField(choices=[('none', '无'), ('low', '低'), ('medium', '中'), ('high', '高')], default='none', verbose_name='优先级'),
+        ),
+        migrations.AlterField(
+            model_name='task',
+            name='status',
+            field=apps.common.fields.ChoiceCodeField(choices=[('todo', '待办'), ('in_progress', '进行中'), ('completed', '已完成')], default='todo', verbose_name='状态'),
+        ),
+        migrations.AlterField(
+            model_name='taskdailystat',
+            name='priority',
+            field=apps.common.fields.ChoiceCodeField(choices=[('none', '无'), ('low', '低'), ('medium', '中'), ('high', '高')], default='none', verbose_name='优先级'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskdailystat',
+            constraint=models.UniqueConstraint(fields=('user', 'date', 'project_ref', 'priority'), name='uniq_task_daily_stat'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# PostgreSQL 上额外创建 (user, tstzrange(开始, 截止)) 的 GiST 索引，其他数据库跳过。
+# 索引只存在于数据库中，不出现在模型状态里。
+def create_span_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from apps.tasks.spans import span_index
+
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    schema_editor.add_index(apps.get_model('tasks', 'Task'), span_index())
+
+
+def drop_span_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from apps.tasks.spans import span_index
+
+    schema_editor.remove_index(apps.get_model('tasks', 'Task'), span_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_is_pinned'),
+        ('tasks', '0009_integer_status_priority'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'due_date'], name='tasks_user_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['user', 'start_date'], name='tasks_user_start_idx'),
+        ),
+        migrations.RunPython(create_span_index, drop_span_index),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:56
+
+import apps.common.fields
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0003_project_is_pinned'),
+        ('tasks', '0010_task_span_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('parent_id', models.BigIntegerField(blank=True, db_index=True, null=True, verbose_name='父任务ID')),
+                ('title', models.CharField(max_length=255, verbose_name='标题')),
+                ('description', models.TextField(blank=True, null=True, verbose_name='描述')),
+                ('priority', apps.common.fields.ChoiceCodeField(choices=[('none', '无'), ('low', '低'), ('medium', '中'), ('high', '高')], default='none', verbose_name='优先级')),
+                ('status', apps.common.fields.ChoiceCodeField(choices=[('todo', '待办'), ('in_progress', '进行中'), ('completed', '已完成')], default='completed', verbose_name='状态')),
+                ('start_date', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('due_date', models.DateTimeField(blank=True, null=True, verbose_name='截止时间')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('recurrence', models.CharField(blank=True, default='', max_length=255, verbose_name='重复规则')),
+                ('recurrence_start', models.DateTimeField(blank=True, null=True, verbose_name='重复起始时间')),
+                ('reminder_offsets', models.JSONField(blank=True, default=list, verbose_name='提醒时间')),
+                ('order', models.IntegerField(default=0, verbose_name='排序')),
+                ('is_starred', models.BooleanField(default=False, verbose_name='是否标星')),
+                ('tag_ids', models.JSONField(blank=True, default=list, verbose_name='标签ID')),
+                ('created_at', models.DateTimeField(verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(verbose_name='更新时间')),
+                ('archived_at', models.DateTimeField(verbose_name='归档时间')),
+            ],
+            options={
+                'verbose_name': '已归档任务',
+                'verbose_name_plural': '已归档任务',
+                'db_table': 'tasks_archive',
+                'ordering': ['-completed_at', '-id'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='taskactivity',
+            name='task',
+            field=models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='activities', to='tasks.task', verbose_name='任务'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed_at__isnull', False)), fields=['completed_at'], name='tasks_completed_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='project',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_tasks', to='projects.project', verbose_name='所属项目'),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_tasks', to=settings.AUTH_USER_MODEL, verbose_name='所属用户'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['user', '-completed_at'], name='tasks_archive_user_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+
+# 重建 GiST 索引：跨度边界改为 LEAST/GREATEST（见 apps.tasks.spans），
+# 开始时间晚于截止时间的任务不再导致写入时计算索引表达式报错。
+def recreate_span_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from apps.tasks.spans import SPAN_INDEX_NAME, span_index
+
+    schema_editor.execute(f'DROP INDEX IF EXISTS {schema_editor.quote_name(SPAN_INDEX_NAME)}')
+    schema_editor.add_index(apps.get_model('tasks', 'Task'), span_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0012_task_parent_no_constraint'),
+    ]
+
+    operations = [
+        migrations.RunPython(recreate_span_index, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,8 @@
 from django.db import models
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.common.fields import ChoiceCodeField
 
 
 class Task(models.Model):
@@ -35,22 +38,23 @@ class Task(models.Model):
         related_name='tasks',
         verbose_name='所属项目'
     )
+    # 分区表（见 partitions.py）的主键为 (id, user_id)，不能被单列外键引用，级联删除由 ORM 完成
     parent = models.ForeignKey(
         'self',
         on_delete=models.CASCADE,
         null=True,
         blank=True,
+        db_constraint=False,
         related_name='subtasks',
         verbose_name='父任务'
     )
-    priority = models.CharField(
-        max_length=10,
+    # 以小整数存储，按选项顺序排序和比较，见 ChoiceCodeField
+    priority = ChoiceCodeField(
         choices=PRIORITY_CHOICES,
         default='none',
         verbose_name='优先级'
     )
-    status = models.CharField(
-        max_length=20,
+    status = ChoiceCodeField(
         choices=STATUS_CHOICES,
         default='todo',
         verbose_name='状态'
@@ -58,6 +62,12 @@ class Task(models.Model):
     start_date = models.DateTimeField(null=True, blank=True, verbose_name='开始时间')
     due_date = models.DateTimeField(null=True, blank=True, verbose_name='截止时间')
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name='完成时间')
+    # 重复规则（RRULE 子集），系列只保存当前实例，见 recurrence.py
+    recurrence = models.CharField(max_length=255, blank=True, default='', verbose_name='重复规则')
+    recurrence_start = models.DateTimeField(null=True, blank=True, verbose_name='重复起始时间')
+    # 截止前多少分钟提醒，如 [10, 60]；next_reminder_at 为下一次待发送的提醒，见 reminders.py
+    reminder_offsets = models.JSONField(default=list, blank=True, verbose_name='提醒时间')
+    next_reminder_at = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name='下次提醒时间')
     order = models.IntegerField(default=0, verbose_name='排序')
     is_starred = models.BooleanField(default=False, verbose_name='是否标星')
     is_deleted = models.BooleanField(default=False, verbose_name='是否删除')
@@ -69,6 +79,152 @@ class Task(models.Model):
         verbose_name = '任务'
         verbose_name_plural = verbose_name
         ordering = ['order', '-created_at']
+        indexes = [
+            # 日历按时间跨度查询，见 spans.py（PostgreSQL 另有 GiST 索引）
+            models.Index(fields=['user', 'due_date'], name='tasks_user_due_idx'),
+            models.Index(fields=['user', 'start_date'], name='tasks_user_start_idx'),
+            # 只索引重复任务，日历/今日视图据此展开系列
+            models.Index(
+                fields=['user', 'due_date'],
+                condition=~models.Q(recurrence=''),
+                name='tasks_recurring_idx',
+            ),
+            # 归档任务按完成时间扫描，见 archive.py
+            models.Index(
+                fields=['completed_at'],
+                condition=models.Q(completed_at__isnull=False),
+                name='tasks_completed_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return self.title
+
+
+class TaskDailyStat(models.Model):
+    """
+    任务每日汇总
+
+    按用户、日期、项目、优先级累计创建数、完成数、到期数和逾期数，
+    由任务状态变更增量维护，用于长周期趋势和热力图。
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='task_daily_stats',
+        verbose_name='所属用户'
+    )
+    date = models.DateField(verbose_name='日期')
+    # 项目删除后汇总数据需要保留，因此只记录ID，0 表示无项目
+    project_ref = models.BigIntegerField(default=0, verbose_name='项目ID')
+    priority = ChoiceCodeField(choices=Task.PRIORITY_CHOICES, default='none', verbose_name='优先级')
+    created_count = models.IntegerField(default=0, verbose_name='创建数')
+    completed_count = models.IntegerField(default=0, verbose_name='完成数')
+    due_count = models.IntegerField(default=0, verbose_name='到期数')
+    overdue_count = models.IntegerField(default=0, verbose_name='逾期数')
+
+    class Meta:
+        db_table = 'task_daily_stats'
+        verbose_name = '任务每日汇总'
+        verbose_name_plural = verbose_name
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'date', 'project_ref', 'priority'],
+                name='uniq_task_daily_stat',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.date}'
+
+
+class TaskActivity(models.Model):
+    """
+    任务变更记录
+
+    只追加不修改，changes 只保存变化的字段 {字段: [旧值, 新值]}，
+    由 apps.tasks.activity 缓冲后批量写入。任务归档后记录保留，
+    因此不建外键约束，任务被永久删除时由 signals 清理。
+    """
+    ACTION_CHOICES = [
+        ('created', '创建'),
+        ('updated', '修改'),
+    ]
+
+    # (task, created_at) 联合索引已覆盖按任务查询，不再单独建外键索引
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.DO_NOTHING,
+        related_name='activities',
+        db_index=False,
+        db_constraint=False,
+        verbose_name='任务'
+    )
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES, default='updated', verbose_name='操作')
+    changes = models.JSONField(default=dict, blank=True, encoder=DjangoJSONEncoder, verbose_name='变更内容')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='时间')
+
+    class Meta:
+        db_table = 'task_activities'
+        verbose_name = '任务变更记录'
+        verbose_name_plural = verbose_name
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['task', '-created_at'], name='task_activity_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.task_id} {self.action}'
+
+
+class ArchivedTask(models.Model):
+    """
+    已归档任务
+
+    完成超过一定天数的任务由 apps.tasks.archive 分批移入本表，主键与原任务相同，
+    任务标签以ID列表保存。父任务只记录ID，恢复时父任务已不存在则置空。
+    """
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks',
+        verbose_name='所属用户'
+    )
+    project = models.ForeignKey(
+        'projects.Project',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_tasks',
+        verbose_name='所属项目'
+    )
+    parent_id = models.BigIntegerField(null=True, blank=True, db_index=True, verbose_name='父任务ID')
+    title = models.CharField(max_length=255, verbose_name='标题')
+    description = models.TextField(blank=True, null=True, verbose_name='描述')
+    priority = ChoiceCodeField(choices=Task.PRIORITY_CHOICES, default='none', verbose_name='优先级')
+    status = ChoiceCodeField(choices=Task.STATUS_CHOICES, default='completed', verbose_name='状态')
+    start_date = models.DateTimeField(null=True, blank=True, verbose_name='开始时间')
+    due_date = models.DateTimeField(null=True, blank=True, verbose_name='截止时间')
+    completed_at = models.DateTimeField(null=True, blank=True, verbose_name='完成时间')
+    recurrence = models.CharField(max_length=255, blank=True, default='', verbose_name='重复规则')
+    recurrence_start = models.DateTimeField(null=True, blank=True, verbose_name='重复起始时间')
+    reminder_offsets = models.JSONField(default=list, blank=True, verbose_name='提醒时间')
+    order = models.IntegerField(default=0, verbose_name='排序')
+    is_starred = models.BooleanField(default=False, verbose_name='是否标星')
+    tag_ids = models.JSONField(default=list, blank=True, verbose_name='标签ID')
+    created_at = models.DateTimeField(verbose_name='创建时间')
+    updated_at = models.DateTimeField(verbose_name='更新时间')
+    archived_at = models.DateTimeField(verbose_name='归档时间')
+
+    class Meta:
+        db_table = 'tasks_archive'
+        verbose_name = '已归档任务'
+        verbose_name_plural = verbose_name
+        ordering = ['-completed_at', '-id']
+        indexes = [
+            models.Index(fields=['user', '-completed_at'], name='tasks_archive_user_idx'),
+        ]
 
     def __str__(self):
         return self.title
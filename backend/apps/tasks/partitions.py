@@ -0,0 +1,130 @@
+"""
+任务表按用户哈希分区（仅 PostgreSQL，可选）
+
+tasks 和 task_tags 转换为按 user_id 哈希分区的分区表，视图中的查询都带有 user_id 条件，
+规划器只扫描一个分区（分区裁剪），各分区独立 VACUUM，膨胀不会影响其他用户。
+
+ORM 兼容性：
+- 分区表的主键和唯一约束必须包含分区键，主键改为 (id, user_id)，Django 仍以 id 作为主键，
+  id 由全局序列生成，保持唯一
+- 单列外键无法引用分区表，指向任务的外键（Task.parent、TaskTag.task、TaskActivity.task）
+  不建数据库约束，级联删除由 ORM 完成
+- task_tags 的 (task, tag) 唯一约束改为 (task, tag, user)，任务只属于一个用户，语义不变
+- 之后修改这两张表唯一约束的迁移需要手动处理
+
+转换在一个事务中完成，期间锁表，数据量大时应在维护窗口执行：
+    python manage.py partition_tasks --partitions 16
+其他数据库不做任何处理。
+"""
+
+import re
+
+from django.db import connections, transaction
+
+from apps.tags.models import TaskTag
+from .models import Task
+
+PARTITIONED_MODELS = [Task, TaskTag]
+PARTITION_KEY = 'user_id'
+
+
+def supports_partitioning(using='default'):
+    return connections[using].vendor == 'postgresql'
+
+
+def is_partitioned(table, using='default'):
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_class WHERE relname = %s AND relkind = 'p' AND pg_table_is_visible(oid)",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def with_partition_key(definition):
+    """唯一索引必须包含分区键，在列清单末尾追加 user_id"""
+    match = re.match(r'^(CREATE UNIQUE INDEX .* USING \w+ \()(.*?)(\).*)$', definition)
+    if match is None or PARTITION_KEY in match.group(2):
+        return definition
+    return f'{match.group(1)}{match.group(2)}, {PARTITION_KEY}{match.group(3)}'
+
+
+def existing_definitions(cursor, table):
+    """读取表上除主键以外的索引定义，以及外键约束定义"""
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s AND indexname <> %s "
+        "AND schemaname = current_schema() ORDER BY indexname",
+        [table, f'{table}_pkey'],
+    )
+    indexes = [with_partition_key(definition) for _, definition in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+        "WHERE conrelid = %s::regclass AND contype = 'f' ORDER BY conname",
+        [table],
+    )
+    foreign_keys = cursor.fetchall()
+    return indexes, foreign_keys
+
+
+def table_sql(cursor, model, partitions):
+    """返回将 model 的表转换为哈希分区表的 SQL 语句列表"""
+    qn = cursor.db.ops.quote_name
+    table = model._meta.db_table
+    pk = model._meta.pk.column
+    old = f'{table}_unpartitioned'
+    sequence = f'{table}_part_{pk}_seq'
+    indexes, foreign_keys = existing_definitions(cursor, table)
+
+    statements = [
+        f'LOCK TABLE {qn(table)} IN ACCESS EXCLUSIVE MODE',
+        f'ALTER TABLE {qn(table)} RENAME TO {qn(old)}',
+        # 不复制自增标识，改用普通序列，从当前最大ID之后继续
+        f'CREATE TABLE {qn(table)} (LIKE {qn(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE) '
+        f'PARTITION BY HASH ({qn(PARTITION_KEY)})',
+        f'CREATE SEQUENCE {qn(sequence)} AS bigint OWNED BY {qn(table)}.{qn(pk)}',
+        f'SELECT setval({sequence!r}, (SELECT COALESCE(MAX({qn(pk)}), 0) + 1 FROM {qn(old)}), false)',
+        f'ALTER TABLE {qn(table)} ALTER COLUMN {qn(pk)} SET DEFAULT nextval({sequence!r}::regclass)',
+    ]
+    statements += [
+        f'CREATE TABLE {qn(f"{table}_p{remainder}")} PARTITION OF {qn(table)} '
+        f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+        for remainder in range(partitions)
+    ]
+    statements += [
+        f'INSERT INTO {qn(table)} SELECT * FROM {qn(old)}',
+        # 旧表的索引和约束随表删除，名称随后在新表上复用
+        f'DROP TABLE {qn(old)}',
+        f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(f"{table}_pkey")} PRIMARY KEY ({qn(pk)}, {qn(PARTITION_KEY)})',
+    ]
+    statements += indexes
+    statements += [
+        f'ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(name)} {definition}' for name, definition in foreign_keys
+    ]
+    statements.append(f'ANALYZE {qn(table)}')
+    return statements
+
+
+def partition_sql(partitions, using='default'):
+    """返回尚未分区的表的转换 SQL"""
+    statements = []
+    with connections[using].cursor() as cursor:
+        for model in PARTITIONED_MODELS:
+            if not is_partitioned(model._meta.db_table, using):
+                statements += table_sql(cursor, model, partitions)
+    return statements
+
+
+def partition(partitions, using='default'):
+    """在一个事务中转换所有尚未分区的表，返回转换的表名列表"""
+    if partitions < 2:
+        raise ValueError('分区数至少为 2')
+    converted = []
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        for model in PARTITIONED_MODELS:
+            table = model._meta.db_table
+            if is_partitioned(table, using):
+                continue
+            for statement in table_sql(cursor, model, partitions):
+                cursor.execute(statement)
+            converted.append(table)
+    return converted
@@ -0,0 +1,215 @@
+"""
+重复任务
+
+重复规则使用 RRULE 子集：FREQ=DAILY|WEEKLY|MONTHLY|YEARLY，
+可选 INTERVAL、BYDAY（仅 WEEKLY）、COUNT、UNTIL，例如
+FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,WE;COUNT=10。
+
+每个系列只保存一行“当前实例”任务，后续日期在查询时按规则计算；
+完成当前实例时才创建下一次实例。计算直接定位到查询窗口，
+不会从系列起点逐个遍历。
+"""
+
+import calendar
+import math
+from collections import namedtuple
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from django.db import router, transaction
+from django.utils import timezone
+
+FREQUENCIES = ('DAILY', 'WEEKLY', 'MONTHLY', 'YEARLY')
+WEEKDAYS = ('MO', 'TU', 'WE', 'TH', 'FR', 'SA', 'SU')
+
+Rule = namedtuple('Rule', ['freq', 'interval', 'byday', 'count', 'until'])
+
+
+@lru_cache(maxsize=1024)
+def parse_rule(value):
+    """解析重复规则，格式错误时抛出 ValueError"""
+    parts = {}
+    for item in value.upper().removeprefix('RRULE:').split(';'):
+        if not item:
+            continue
+        key, sep, val = item.partition('=')
+        if not sep or not val:
+            raise ValueError(f'无效的规则片段: {item}')
+        parts[key] = val
+
+    freq = parts.pop('FREQ', None)
+    if freq not in FREQUENCIES:
+        raise ValueError('FREQ 必须是 DAILY、WEEKLY、MONTHLY 或 YEARLY')
+
+    interval = int(parts.pop('INTERVAL', 1))
+    if interval < 1:
+        raise ValueError('INTERVAL 必须大于 0')
+
+    byday = ()
+    if 'BYDAY' in parts:
+        if freq != 'WEEKLY':
+            raise ValueError('BYDAY 仅支持 WEEKLY')
+        days = parts.pop('BYDAY').split(',')
+        if any(day not in WEEKDAYS for day in days):
+            raise ValueError('BYDAY 只能包含 MO,TU,WE,TH,FR,SA,SU')
+        byday = tuple(sorted({WEEKDAYS.index(day) for day in days}))
+
+    count = None
+    if 'COUNT' in parts:
+        count = int(parts.pop('COUNT'))
+        if count < 1:
+            raise ValueError('COUNT 必须大于 0')
+
+    until = None
+    if 'UNTIL' in parts:
+        raw = parts.pop('UNTIL')
+        try:
+            until = datetime.strptime(raw[:8], '%Y%m%d').date()
+        except ValueError:
+            raise ValueError('UNTIL 格式应为 YYYYMMDD')
+
+    if parts:
+        raise ValueError(f'不支持的规则字段: {", ".join(parts)}')
+
+    return Rule(freq, interval, byday, count, until)
+
+
+def _local(value):
+    return timezone.localtime(value).replace(tzinfo=None)
+
+
+def _aware(value):
+    return timezone.make_aware(value)
+
+
+def _add_months(dtstart, months):
+    """按月偏移，目标月份没有该日期时返回 None（与 RRULE 一致，跳过该月）"""
+    month_index = dtstart.month - 1 + months
+    year, month = dtstart.year + month_index // 12, month_index % 12 + 1
+    if dtstart.day > calendar.monthrange(year, month)[1]:
+        return None
+    return dtstart.replace(year=year, month=month)
+
+
+def _iter_from(rule, dtstart, start):
+    """
+    从窗口起点附近开始按顺序产生 (序号, 本地时间)，序号从 0 开始计数，
+    用于 COUNT 判断。dtstart、start 均为本地 naive 时间。
+    """
+    if rule.freq == 'DAILY':
+        step = timedelta(days=rule.interval)
+        k = max(0, math.ceil((start - dtstart) / step))
+        while True:
+            yield k, dtstart + k * step
+            k += 1
+
+    elif rule.freq == 'WEEKLY':
+        days = rule.byday or (dtstart.weekday(),)
+        week0 = dtstart - timedelta(days=dtstart.weekday())
+        # 第一周中早于 dtstart 的日期不计入
+        skipped = sum(1 for day in days if day < dtstart.weekday())
+        span = timedelta(weeks=rule.interval)
+        w = max(0, math.floor((start - week0) / span))
+        while True:
+            week_start = week0 + w * span
+            for position, day in enumerate(days):
+                index = w * len(days) + position - skipped
+                if index >= 0:
+                    yield index, week_start + timedelta(days=day)
+            w += 1
+
+    else:
+        months_per_step = rule.interval * (12 if rule.freq == 'YEARLY' else 1)
+        months_to_start = (start.year - dtstart.year) * 12 + start.month - dtstart.month
+        k = max(0, months_to_start // months_per_step)
+        # 日期为 29~31 号时部分月份会被跳过，序号需要逐个计算
+        index = k
+        if dtstart.day > 28:
+            index = sum(1 for i in range(k) if _add_months(dtstart, i * months_per_step))
+        while True:
+            value = _add_months(dtstart, k * months_per_step)
+            if value is not None:
+                yield index, value
+                index += 1
+            k += 1
+
+
+@lru_cache(maxsize=4096)
+def occurrences(rule_value, dtstart, start, end):
+    """
+    返回系列在 [start, end) 内的所有发生时间（aware datetime 元组）
+
+    参数均可哈希，相同窗口的计算结果会被缓存。
+    """
+    rule = parse_rule(rule_value)
+    local_start, local_end, local_dtstart = _local(start), _local(end), _local(dtstart)
+    result = []
+    for index, value in _iter_from(rule, local_dtstart, local_start):
+        if rule.count is not None and index >= rule.count:
+            break
+        if rule.until is not None and value.date() > rule.until:
+            break
+        if value >= local_end:
+            break
+        if value >= local_start and value >= local_dtstart:
+            result.append(_aware(value))
+    return tuple(result)
+
+
+def next_occurrence(rule_value, dtstart, after):
+    """返回 after 之后的下一次发生时间，系列结束时返回 None"""
+    rule = parse_rule(rule_value)
+    local_after = _local(after) + timedelta(microseconds=1)
+    for index, value in _iter_from(rule, _local(dtstart), local_after):
+        if rule.count is not None and index >= rule.count:
+            return None
+        if rule.until is not None and value.date() > rule.until:
+            return None
+        if value >= local_after:
+            return _aware(value)
+
+
+def materialize_next(task):
+    """
+    已完成的重复任务生成下一次实例，返回新任务；系列结束时返回 None
+
+    重复规则转移到新实例上，已完成的实例只保留为历史记录。
+    """
+    from apps.tags.models import TaskTag
+    from apps.tags.usage import add_tags
+    from .models import Task
+
+    if not task.recurrence or task.due_date is None:
+        return None
+
+    rule = task.recurrence
+    with transaction.atomic(using=router.db_for_write(Task, instance=task)):
+        Task.objects.filter(pk=task.pk).update(recurrence='', updated_at=timezone.now())
+        task.recurrence = ''
+
+        due_date = next_occurrence(rule, task.recurrence_start, task.due_date)
+        if due_date is None:
+            return None
+
+        start_date = None
+        if task.start_date is not None:
+            start_date = due_date - (task.due_date - task.start_date)
+
+        next_task = Task.objects.create(
+            title=task.title,
+            description=task.description,
+            user_id=task.user_id,
+            project_id=task.project_id,
+            parent_id=task.parent_id,
+            priority=task.priority,
+            order=task.order,
+            is_starred=task.is_starred,
+            start_date=start_date,
+            due_date=due_date,
+            recurrence=rule,
+            recurrence_start=task.recurrence_start,
+            reminder_offsets=task.reminder_offsets,
+        )
+        tag_ids = TaskTag.objects.filter(task_id=task.pk).values_list('tag_id', flat=True)
+        add_tags(next_task, tag_ids)
+    return next_task
@@ -0,0 +1,217 @@
+"""
+截止时间提醒
+
+任务的 reminder_offsets 为截止前的分钟数列表，next_reminder_at 记录下一次
+待发送的提醒时间（带索引）。调度器只按索引加载未来一段时间窗口内的提醒，
+放入最小堆中按时间弹出，批量投递到可插拔的通知出口。
+"""
+
+import heapq
+import json
+import logging
+import time
+import urllib.request
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+
+def compute_next_reminder(due_date, offsets, after):
+    """返回 after 之后最近的一次提醒时间，没有时返回 None"""
+    if due_date is None or not offsets:
+        return None
+    upcoming = [
+        due_date - timedelta(minutes=offset)
+        for offset in offsets
+        if due_date - timedelta(minutes=offset) > after
+    ]
+    return min(upcoming) if upcoming else None
+
+
+def expected_next_reminder(task, now=None):
+    if task.is_deleted or task.status == 'completed':
+        return None
+    return compute_next_reminder(task.due_date, task.reminder_offsets, now or timezone.now())
+
+
+def sync_next_reminders(task_ids):
+    """批量路径（queryset.update 等）修改任务后重新计算下一次提醒时间"""
+    now = timezone.now()
+    changed = []
+    for task in Task.objects.filter(id__in=task_ids).only(
+        'id', 'due_date', 'reminder_offsets', 'status', 'is_deleted', 'next_reminder_at'
+    ):
+        expected = expected_next_reminder(task, now)
+        if task.next_reminder_at != expected:
+            task.next_reminder_at = expected
+            changed.append(task)
+    if changed:
+        for task in changed:
+            task.updated_at = now
+        Task.objects.bulk_update(changed, ['next_reminder_at', 'updated_at'])
+
+
+class LogSink:
+    """将提醒写入日志"""
+
+    def __init__(self, **options):
+        pass
+
+    def send(self, reminders):
+        for reminder in reminders:
+            logger.info('提醒: 用户 %(user_id)s 的任务「%(title)s」将于 %(due_date)s 到期', reminder)
+
+
+class WebhookSink:
+    """将一批提醒以 JSON 数组 POST 到 webhook"""
+
+    def __init__(self, webhook_url, timeout=10, **options):
+        self.webhook_url = webhook_url
+        self.timeout = timeout
+
+    def send(self, reminders):
+        body = json.dumps(reminders, default=str).encode()
+        request = urllib.request.Request(
+            self.webhook_url, data=body, headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class MemorySink:
+    """保存在内存中，供本地开发和测试使用"""
+
+    def __init__(self, **options):
+        self.sent = []
+
+    def send(self, reminders):
+        self.sent.extend(reminders)
+
+
+def get_sink(path=None):
+    """按 settings.REMINDERS 创建通知出口"""
+    config = settings.REMINDERS
+    sink_class = import_string(path or config['SINK'])
+    return sink_class(**config.get('OPTIONS', {}))
+
+
+class ReminderScheduler:
+    """
+    提醒调度器
+
+    - 每隔 refill_interval 秒，按 next_reminder_at 索引重新扫描 horizon 窗口内的提醒，
+      被提前、推迟或新移入窗口的提醒都会加载（不依赖 updated_at）
+    - 堆顶到期后批量校验任务当前状态，投递后按读取时的状态条件写回下一次提醒时间
+    - 堆中过期（任务已修改）的条目在弹出时丢弃，已取消的提醒在投递前按数据库状态过滤
+    """
+
+    def __init__(self, sink, horizon=3600, refill_interval=60, batch_size=500, clock=timezone.now):
+        self.sink = sink
+        self.horizon = timedelta(seconds=horizon)
+        self.refill_interval = timedelta(seconds=refill_interval)
+        self.batch_size = batch_size
+        self.clock = clock
+        self.heap = []
+        # task_id -> 堆中有效的提醒时间
+        self.scheduled = {}
+        self.loaded_until = None
+        self.last_refill = None
+
+    def schedule(self, task_id, when):
+        if when is None:
+            self.scheduled.pop(task_id, None)
+            return
+        if self.scheduled.get(task_id) == when:
+            return
+        self.scheduled[task_id] = when
+        heapq.heappush(self.heap, (when, task_id))
+
+    def refill(self, now):
+        until = now + self.horizon
+        # 窗口内的提醒数量有限，每次整段扫描索引；堆中已有相同时间的条目不会重复加入
+        for task_id, when in Task.objects.filter(next_reminder_at__lte=until).order_by().values_list(
+            'id', 'next_reminder_at'
+        ).iterator():
+            self.schedule(task_id, when)
+        self.loaded_until = until
+        self.last_refill = now
+
+    def pop_due(self, now):
+        due = {}
+        while self.heap and self.heap[0][0] <= now and len(due) < self.batch_size:
+            when, task_id = heapq.heappop(self.heap)
+            if self.scheduled.get(task_id) == when:
+                due[task_id] = when
+                del self.scheduled[task_id]
+        return due
+
+    def fire(self, due, now):
+        """投递一批到期提醒，返回实际发送的数量"""
+        tasks = list(Task.objects.filter(
+            id__in=list(due),
+            next_reminder_at__lte=now,
+            is_deleted=False,
+        ).exclude(status='completed').only(
+            'id', 'user_id', 'title', 'due_date', 'reminder_offsets', 'next_reminder_at'
+        ))
+        # 已删除或已完成但仍留有提醒时间的任务清除提醒，不再每次扫描时重新加载
+        fired = {task.pk for task in tasks}
+        Task.objects.filter(id__in=[pk for pk in due if pk not in fired], next_reminder_at__lte=now).filter(
+            Q(is_deleted=True) | Q(status='completed')
+        ).update(next_reminder_at=None, updated_at=now)
+        if not tasks:
+            return 0
+
+        self.sink.send([
+            {
+                'task_id': task.pk,
+                'user_id': task.user_id,
+                'title': task.title,
+                'due_date': task.due_date.isoformat(),
+                'remind_at': task.next_reminder_at.isoformat(),
+            }
+            for task in tasks
+        ])
+
+        # 按读取时的截止时间和提醒时间条件更新：期间用户修改了任务时保存已重新计算提醒，不覆盖
+        with transaction.atomic(using=router.db_for_write(Task)):
+            for task in tasks:
+                next_at = compute_next_reminder(task.due_date, task.reminder_offsets, task.next_reminder_at)
+                updated = Task.objects.filter(
+                    pk=task.pk, due_date=task.due_date, next_reminder_at=task.next_reminder_at
+                ).update(next_reminder_at=next_at, updated_at=now)
+                if updated and next_at is not None and next_at <= self.loaded_until:
+                    self.schedule(task.pk, next_at)
+        return len(tasks)
+
+    def run_once(self):
+        now = self.clock()
+        if self.last_refill is None or now - self.last_refill >= self.refill_interval:
+            self.refill(now)
+        sent = 0
+        while True:
+            due = self.pop_due(now)
+            if not due:
+                break
+            sent += self.fire(due, now)
+        return sent
+
+    def seconds_until_next(self):
+        now = self.clock()
+        wake = self.last_refill + self.refill_interval
+        if self.heap:
+            wake = min(wake, self.heap[0][0])
+        return max(0.0, (wake - now).total_seconds())
+
+    def run_forever(self, max_sleep=5.0):
+        while True:
+            self.run_once()
+            time.sleep(min(max_sleep, self.seconds_until_next()))
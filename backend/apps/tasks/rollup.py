@@ -0,0 +1,144 @@
+"""
+任务每日汇总的增量维护
+
+每个任务根据当前状态对若干 (日期, 项目, 优先级, 计数字段) 贡献 1，
+状态变化时比较变更前后的贡献，只把差值写入 TaskDailyStat。
+"""
+
+from collections import Counter
+
+from django.db import IntegrityError, router, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ArchivedTask, Task, TaskDailyStat
+
+# 计算贡献所需的任务字段
+ROLLUP_FIELDS = [
+    'id', 'user_id', 'project_id', 'priority', 'status', 'is_deleted',
+    'created_at', 'completed_at', 'due_date',
+]
+
+
+def local_date(value):
+    return timezone.localtime(value).date()
+
+
+def task_state(task):
+    """从模型实例提取计算贡献所需的字段"""
+    return {field: getattr(task, field) for field in ROLLUP_FIELDS}
+
+
+def contributions(state):
+    """返回任务对汇总表的贡献 Counter[(user_id, date, project_ref, priority, field)]"""
+    result = Counter()
+    if state is None or state['is_deleted'] or state['created_at'] is None:
+        return result
+
+    key = (state['user_id'], state['project_id'] or 0, state['priority'])
+
+    def add(value, field):
+        user_id, project_ref, priority = key
+        result[(user_id, local_date(value), project_ref, priority, field)] += 1
+
+    add(state['created_at'], 'created_count')
+
+    completed = state['status'] == 'completed' and state['completed_at'] is not None
+    if completed:
+        add(state['completed_at'], 'completed_count')
+
+    if state['due_date'] is not None:
+        add(state['due_date'], 'due_count')
+        # 未完成或晚于截止时间完成的任务计为逾期，查询时只统计已过去的日期
+        if not completed or state['completed_at'] > state['due_date']:
+            add(state['due_date'], 'overdue_count')
+
+    return result
+
+
+def apply_delta(delta):
+    """将贡献差值写入汇总表"""
+    grouped = {}
+    for (user_id, date, project_ref, priority, field), value in delta.items():
+        if value:
+            grouped.setdefault((user_id, date, project_ref, priority), {})[field] = value
+
+    for (user_id, date, project_ref, priority), values in grouped.items():
+        lookup = {'user_id': user_id, 'date': date, 'project_ref': project_ref, 'priority': priority}
+        increments = {field: F(field) + value for field, value in values.items()}
+        if TaskDailyStat.objects.filter(**lookup).update(**increments):
+            continue
+        try:
+            with transaction.atomic(using=router.db_for_write(TaskDailyStat)):
+                TaskDailyStat.objects.create(**lookup, **values)
+        except IntegrityError:
+            # 并发创建了同一行，改为累加
+            TaskDailyStat.objects.filter(**lookup).update(**increments)
+
+
+def record_change(before, after):
+    """根据任务变更前后的状态更新汇总"""
+    delta = contributions(after)
+    delta.subtract(contributions(before))
+    apply_delta(delta)
+
+
+def fetch_states(task_ids):
+    """批量读取任务当前状态，返回 {id: state}"""
+    rows = Task.objects.filter(id__in=task_ids).values(*ROLLUP_FIELDS)
+    return {row['id']: row for row in rows}
+
+
+def record_bulk_change(before_states, after_states):
+    """批量路径（queryset.update 等）使用，合并后一次写入"""
+    delta = Counter()
+    for task_id in set(before_states) | set(after_states):
+        delta.update(contributions(after_states.get(task_id)))
+        delta.subtract(contributions(before_states.get(task_id)))
+    apply_delta(delta)
+
+
+def merge_project(project_id):
+    """项目删除后，将其汇总数据合并到无项目"""
+    fields = ['created_count', 'completed_count', 'due_count', 'overdue_count']
+    rows = TaskDailyStat.objects.filter(project_ref=project_id)
+    delta = Counter()
+    for row in rows.values('user_id', 'date', 'priority', *fields):
+        for field in fields:
+            delta[(row['user_id'], row['date'], 0, row['priority'], field)] += row[field]
+    with transaction.atomic(using=router.db_for_write(TaskDailyStat)):
+        rows.delete()
+        apply_delta(delta)
+
+
+def rebuild(user_ids=None, chunk_size=2000):
+    """根据任务表和归档表全量重建汇总数据，返回写入的行数"""
+    tasks = Task.objects.all()
+    archived = ArchivedTask.objects.all()
+    stats = TaskDailyStat.objects.all()
+    if user_ids is not None:
+        tasks = tasks.filter(user_id__in=user_ids)
+        archived = archived.filter(user_id__in=user_ids)
+        stats = stats.filter(user_id__in=user_ids)
+
+    totals = Counter()
+    for state in tasks.values(*ROLLUP_FIELDS).iterator(chunk_size=chunk_size):
+        totals.update(contributions(state))
+    # 归档的任务都不在回收站中
+    archived_fields = [field for field in ROLLUP_FIELDS if field != 'is_deleted']
+    for state in archived.values(*archived_fields).iterator(chunk_size=chunk_size):
+        totals.update(contributions({**state, 'is_deleted': False}))
+
+    grouped = {}
+    for (user_id, date, project_ref, priority, field), value in totals.items():
+        key = (user_id, date, project_ref, priority)
+        grouped.setdefault(key, {})[field] = value
+
+    objs = [
+        TaskDailyStat(user_id=user_id, date=date, project_ref=project_ref, priority=priority, **values)
+        for (user_id, date, project_ref, priority), values in grouped.items()
+    ]
+    with transaction.atomic(using=router.db_for_write(TaskDailyStat)):
+        stats.delete()
+        TaskDailyStat.objects.bulk_create(objs, batch_size=chunk_size)
+    return len(objs)
@@ -1,9 +1,17 @@
 from rest_framework import serializers
-from .models import Task
-from apps.tags.models import TaskTag
+from .models import ArchivedTask, Task, TaskActivity
+from . import activity
+from .recurrence import parse_rule
+from apps.common.serializers import DynamicFieldsModelSerializer
+from apps.tags.usage import add_tags
 
 
-class TaskSerializer(serializers.ModelSerializer):
+def _prefetched(obj, name):
+    """判断关联对象是否已通过 prefetch_related 加载"""
+    return name in getattr(obj, '_prefetched_objects_cache', {})
+
+
+class TaskSerializer(DynamicFieldsModelSerializer):
     subtasks_count = serializers.SerializerMethodField()
     tags = serializers.SerializerMethodField()
     project = serializers.SerializerMethodField()
@@ -13,20 +21,77 @@ class TaskSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'title', 'description', 'user', 'project', 'parent',
             'priority', 'status', 'start_date', 'due_date', 'completed_at', 'order',
-            'is_starred', 'is_deleted', 'tags', 'created_at', 'updated_at', 'subtasks_count'
+            'is_starred', 'is_deleted', 'tags', 'created_at', 'updated_at', 'subtasks_count',
+            'recurrence', 'recurrence_start', 'reminder_offsets', 'next_reminder_at'
+        ]
+        read_only_fields = [
+            'id', 'user', 'created_at', 'updated_at', 'completed_at',
+            'recurrence_start', 'next_reminder_at'
         ]
-        read_only_fields = ['id', 'user', 'created_at', 'updated_at', 'completed_at']
+
+    def validate_reminder_offsets(self, value):
+        # 截止前 0 分钟到 30 天
+        if not isinstance(value, list) or not all(
+            isinstance(offset, int) and not isinstance(offset, bool) and 0 <= offset <= 43200
+            for offset in value
+        ):
+            raise serializers.ValidationError('提醒时间必须是 0~43200 之间的分钟数列表')
+        if len(value) > 10:
+            raise serializers.ValidationError('最多设置 10 个提醒')
+        return sorted(set(value))
+
+    def validate_recurrence(self, value):
+        if value:
+            try:
+                parse_rule(value)
+            except ValueError as exc:
+                raise serializers.ValidationError(str(exc))
+            return value.upper().removeprefix('RRULE:')
+        return ''
+
+    def validate(self, attrs):
+        recurrence = attrs.get('recurrence', getattr(self.instance, 'recurrence', ''))
+        due_date = attrs.get('due_date', getattr(self.instance, 'due_date', None))
+        start_date = attrs.get('start_date', getattr(self.instance, 'start_date', None))
+        if start_date and due_date and start_date > due_date:
+            raise serializers.ValidationError({'due_date': '截止时间不能早于开始时间'})
+        if recurrence:
+            if due_date is None:
+                raise serializers.ValidationError({'recurrence': '重复任务需要设置截止时间'})
+            # 新设置规则或调整截止时间时，以新的截止时间作为系列起点
+            if (
+                self.instance is None
+                or recurrence != self.instance.recurrence
+                or due_date != self.instance.due_date
+            ):
+                attrs['recurrence_start'] = due_date
+        return attrs
 
     def get_subtasks_count(self, obj):
-        return obj.subtasks.count()
+        # 优先使用视图中 annotate 的计数
+        if hasattr(obj, 'subtasks_total'):
+            return obj.subtasks_total
+        return obj.subtasks.count() + ArchivedTask.objects.filter(parent_id=obj.pk).count()
     
     def get_tags(self, obj):
+        if _prefetched(obj, 'task_tags'):
+            task_tags = obj.task_tags.all()
+        else:
+            task_tags = obj.task_tags.select_related('tag')
+
+        # 未展开时只返回标签ID
+        if not self.is_expanded('tags'):
+            return [task_tag.tag_id for task_tag in task_tags]
+
         # 返回任务关联的所有标签对象
         from apps.tags.serializers import TagSerializer
-        tags = [task_tag.tag for task_tag in obj.task_tags.select_related('tag').all()]
+        tags = [task_tag.tag for task_tag in task_tags]
         return TagSerializer(tags, many=True).data
     
     def get_project(self, obj):
+        if not self.is_expanded('project'):
+            return obj.project_id
+
         # 返回项目完整对象
         if obj.project:
             from apps.projects.serializers import ProjectSimpleSerializer
@@ -41,24 +106,31 @@ class TaskSerializer(serializers.ModelSerializer):
         
         # 创建任务-标签关联
         if tags_data:
-            for tag_id in tags_data:
-                TaskTag.objects.create(task=task, tag_id=tag_id)
-        
+            add_tags(task, dict.fromkeys(tags_data))
+
+        activity.log(activity.build(task.pk, {}, action='created'))
         return task
     
     def update(self, instance, validated_data):
         # 处理tags字段
         tags_data = self.initial_data.get('tags', None)
+        before = activity.snapshot(instance)
         task = super().update(instance, validated_data)
+        changes = activity.diff(before, activity.snapshot(task))
         
         # 更新任务-标签关联
         if tags_data is not None:
-            # 删除旧的关联
-            task.task_tags.all().delete()
-            # 创建新的关联
-            for tag_id in tags_data:
-                TaskTag.objects.create(task=task, tag_id=tag_id)
-        
+            old_tags = sorted(task.task_tags.values_list('tag_id', flat=True))
+            # 只删除移除的关联、创建新增的关联
+            removed = set(old_tags) - set(tags_data)
+            if removed:
+                task.task_tags.filter(tag_id__in=removed).delete()
+            add_tags(task, [tag_id for tag_id in dict.fromkeys(tags_data) if tag_id not in old_tags])
+            new_tags = sorted(set(tags_data))
+            if new_tags != old_tags:
+                changes['tags'] = [old_tags, new_tags]
+
+        activity.log(activity.build(task.pk, changes))
         return task
 
 
@@ -71,3 +143,54 @@ class TaskDetailSerializer(TaskSerializer):
     def get_subtasks(self, obj):
         subtasks = obj.subtasks.all()
         return TaskSerializer(subtasks, many=True).data
+
+
+class ArchivedTaskSerializer(DynamicFieldsModelSerializer):
+    """
+    已归档任务，输出与 TaskSerializer 相同的字段，另加 archived_at
+
+    展开标签时需要在 context['tags'] 中提供 {标签ID: 标签}，已删除的标签不再返回。
+    """
+    parent = serializers.IntegerField(source='parent_id', read_only=True)
+    project = serializers.SerializerMethodField()
+    tags = serializers.SerializerMethodField()
+    subtasks_count = serializers.SerializerMethodField()
+    is_deleted = serializers.SerializerMethodField()
+    next_reminder_at = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ArchivedTask
+        fields = TaskSerializer.Meta.fields + ['archived_at']
+        read_only_fields = fields
+
+    def get_project(self, obj):
+        if not self.is_expanded('project'):
+            return obj.project_id
+        if obj.project:
+            from apps.projects.serializers import ProjectSimpleSerializer
+            return ProjectSimpleSerializer(obj.project).data
+        return None
+
+    def get_tags(self, obj):
+        tags = self.context.get('tags', {})
+        if not self.is_expanded('tags'):
+            return [tag_id for tag_id in obj.tag_ids if tag_id in tags]
+        from apps.tags.serializers import TagSerializer
+        return TagSerializer([tags[tag_id] for tag_id in obj.tag_ids if tag_id in tags], many=True).data
+
+    def get_subtasks_count(self, obj):
+        if hasattr(obj, 'subtasks_total'):
+            return obj.subtasks_total
+        return ArchivedTask.objects.filter(parent_id=obj.pk).count()
+
+    def get_is_deleted(self, obj):
+        return False
+
+    def get_next_reminder_at(self, obj):
+        return None
+
+
+class TaskActivitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskActivity
+        fields = ['id', 'action', 'changes', 'created_at']
@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.db.models import Q
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from apps.projects.models import Project
+from . import reminders, rollup
+from .models import ArchivedTask, Task, TaskActivity
+
+
+def is_user_deletion(origin):
+    """删除用户时汇总数据会级联删除，无需维护"""
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return model is get_user_model()
+
+
+@receiver(pre_save, sender=Task)
+def capture_rollup_state(sender, instance, raw=False, **kwargs):
+    """保存前记录任务原状态，用于计算汇总差值"""
+    if raw:
+        return
+    before = None
+    if instance.pk is not None:
+        before = rollup.fetch_states([instance.pk]).get(instance.pk)
+    instance._rollup_before = before
+
+
+@receiver(post_save, sender=Task)
+def update_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if instance.get_deferred_fields():
+        after = rollup.fetch_states([instance.pk]).get(instance.pk)
+    else:
+        after = rollup.task_state(instance)
+    rollup.record_change(getattr(instance, '_rollup_before', None), after)
+
+
+@receiver(post_save, sender=Task)
+def update_next_reminder(sender, instance, raw=False, **kwargs):
+    """截止时间、提醒设置或状态变化后重新计算下一次提醒时间"""
+    if raw:
+        return
+    if instance.get_deferred_fields():
+        reminders.sync_next_reminders([instance.pk])
+        return
+    expected = reminders.expected_next_reminder(instance)
+    if instance.next_reminder_at != expected:
+        # 直接 UPDATE，不再触发 post_save，也不修改 updated_at
+        Task.objects.filter(pk=instance.pk).update(next_reminder_at=expected)
+        instance.next_reminder_at = expected
+
+
+@receiver(post_delete, sender=Task)
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    if is_user_deletion(origin):
+        return
+    rollup.record_change(rollup.task_state(instance), None)
+
+
+@receiver(post_delete, sender=Task)
+def delete_activities(sender, instance, origin=None, using='default', **kwargs):
+    """变更记录没有外键约束（归档后保留），任务永久删除时手动清理"""
+    if is_user_deletion(origin):
+        return
+    TaskActivity.objects.using(using).filter(task_id=instance.pk).delete()
+
+
+@receiver(pre_delete, sender=get_user_model())
+def delete_user_activities(sender, instance, using='default', **kwargs):
+    """删除用户前清理其任务（包括已归档任务）的变更记录"""
+    TaskActivity.objects.using(using).filter(
+        Q(task_id__in=Task.objects.filter(user=instance).values('pk'))
+        | Q(task_id__in=ArchivedTask.objects.filter(user=instance).values('pk'))
+    ).delete()
+
+
+@receiver(post_delete, sender=Project)
+def merge_rollup_on_project_delete(sender, instance, origin=None, **kwargs):
+    if is_user_deletion(origin):
+        return
+    rollup.merge_project(instance.pk)
@@ -0,0 +1,85 @@
+"""
+任务时间跨度（日历视图）
+
+任务的跨度为 [开始时间, 截止时间]，只有其中一个时间时跨度为该时刻，
+两者都没有的任务不在日历中显示。开始时间晚于截止时间的旧数据（或绕过序列化器写入的数据）
+按两者中较早/较晚的时间作为跨度的起止，避免 tstzrange 因下界大于上界报错。查询与窗口 [start, end) 重叠的任务：
+
+- PostgreSQL：使用 tstzrange 表达式上的 GiST 索引（迁移 0010 创建），&& 判断重叠
+- 其他数据库：拆分为三个条件，分别走 (user, due_date) 和 (user, start_date) 索引
+"""
+
+from datetime import time, timedelta
+
+from django.db import connections
+from django.db.models import Func, Q
+from django.db.models.functions import Coalesce, Greatest, Least
+from django.utils import timezone
+
+
+SPAN_INDEX_NAME = 'tasks_span_gist_idx'
+
+# 有日期的任务，同时也是 GiST 部分索引的条件
+HAS_DATE = Q(start_date__isnull=False) | Q(due_date__isnull=False)
+
+
+class TaskSpan(Func):
+    """tstzrange(开始, 结束, '[]')，边界参数写入 SQL，保证与索引表达式一致"""
+    function = 'tstzrange'
+    template = "%(function)s(%(expressions)s, '[]')"
+    arity = 2
+
+
+def span_expression():
+    from django.contrib.postgres.fields import DateTimeRangeField
+
+    # LEAST/GREATEST 忽略 NULL，只有一个时间时两者都为该时间
+    return TaskSpan(
+        Least(Coalesce('start_date', 'due_date'), Coalesce('due_date', 'start_date')),
+        Greatest(Coalesce('start_date', 'due_date'), Coalesce('due_date', 'start_date')),
+        output_field=DateTimeRangeField(),
+    )
+
+
+def span_index():
+    """GiST 索引定义，需要 btree_gist 扩展以便与 user_id 组合"""
+    from django.contrib.postgres.indexes import GistIndex
+    from django.db.models import F
+
+    return GistIndex(F('user'), span_expression(), name=SPAN_INDEX_NAME, condition=HAS_DATE)
+
+
+def overlapping(queryset, window_start, window_end):
+    """筛选跨度与 [window_start, window_end) 重叠的任务"""
+    queryset = queryset.filter(HAS_DATE)
+    if connections[queryset.db].vendor == 'postgresql':
+        from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+
+        return queryset.annotate(span=span_expression()).filter(
+            span__overlap=DateTimeTZRange(window_start, window_end, '[)')
+        )
+
+    # 截止时间在窗口内 / 开始时间在窗口内 / 跨越整个窗口（含开始晚于截止的情况），
+    # 各条件走 (user, due_date) 或 (user, start_date) 索引，UNION 后按ID筛选
+    candidates = queryset.order_by().values('id')
+    ids = candidates.filter(due_date__gte=window_start, due_date__lt=window_end).union(
+        candidates.filter(start_date__gte=window_start, start_date__lt=window_end),
+        candidates.filter(start_date__lt=window_start, due_date__gte=window_end),
+        candidates.filter(due_date__lt=window_start, start_date__gte=window_end),
+    )
+    return queryset.model.objects.filter(id__in=ids)
+
+
+def is_all_day(start, end):
+    """开始和截止时间都在本地零点（或为空）的任务视为全天任务"""
+    return all(value is None or timezone.localtime(value).time() == time.min for value in (start, end))
+
+
+def covered_days(start, end, first_day, last_day):
+    """返回跨度覆盖的本地日期（限制在 [first_day, last_day] 内）"""
+    begin, finish = sorted(timezone.localdate(value or start or end) for value in (start, end))
+    day = max(begin, first_day)
+    finish = min(finish, last_day)
+    while day <= finish:
+        yield day
+        day += timedelta(days=1)
@@ -0,0 +1,125 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.tags.models import Tag, TaskTag
+from apps.tasks import archive
+from apps.tasks.models import ArchivedTask, Task, TaskDailyStat
+
+LONG_AGO = timezone.now() - timedelta(days=400)
+
+
+@pytest.fixture
+def tags(user):
+    return [Tag.objects.create(user=user, name=name) for name in ('a', 'b')]
+
+
+@pytest.fixture
+def create_task(api_client):
+    def create(**fields):
+        response = api_client.post('/api/tasks/', fields, format='json')
+        assert response.status_code == 201, response.data
+        return Task.objects.get(pk=response.data['id'])
+
+    return create
+
+
+def complete_long_ago(*tasks):
+    Task.objects.filter(pk__in=[task.pk for task in tasks]).update(status='completed', completed_at=LONG_AGO)
+
+
+def usage_counts(tags):
+    return [Tag.objects.get(pk=tag.pk).usage_count for tag in tags]
+
+
+def snapshot(pk, model=Task):
+    return model.objects.filter(pk=pk).values(*archive.ARCHIVED_FIELDS).get()
+
+
+def rollup():
+    return sorted(TaskDailyStat.objects.values_list(
+        'date', 'project_ref', 'priority', 'created_count', 'completed_count', 'due_count', 'overdue_count'
+    ))
+
+
+@pytest.mark.django_db
+def test_archive_and_restore_round_trip(user, tags, create_task):
+    task = create_task(title='周报', description='d', priority='high', tags=[tag.pk for tag in tags],
+                       due_date=(LONG_AGO - timedelta(days=1)).isoformat())
+    complete_long_ago(task)
+    before, stats = snapshot(task.pk), rollup()
+    assert usage_counts(tags) == [1, 1]
+
+    assert archive.archive_batch(timezone.now() - timedelta(days=180)) == 1
+    assert not Task.objects.filter(pk=task.pk).exists()
+    assert not TaskTag.objects.filter(task_id=task.pk).exists()
+    archived = ArchivedTask.objects.get(pk=task.pk)
+    assert sorted(archived.tag_ids) == sorted(tag.pk for tag in tags)
+    assert usage_counts(tags) == [0, 0]
+    assert rollup() == stats
+
+    assert archive.restore(user.pk, [task.pk]) == [task.pk]
+    assert not ArchivedTask.objects.filter(pk=task.pk).exists()
+    # 包括 auto_now 字段在内的所有列保持原值
+    assert snapshot(task.pk) == before
+    assert sorted(TaskTag.objects.filter(task_id=task.pk).values_list('tag_id', flat=True)) == [tag.pk for tag in tags]
+    assert usage_counts(tags) == [1, 1]
+    assert rollup() == stats
+
+
+@pytest.mark.django_db
+def test_tasks_with_live_subtasks_are_kept(create_task):
+    parent = create_task(title='parent')
+    child = create_task(title='child', parent=parent.pk)
+    complete_long_ago(parent)
+    cutoff = timezone.now() - timedelta(days=180)
+    assert archive.archive_batch(cutoff) == 0
+
+    complete_long_ago(child)
+    assert archive.archive_batch(cutoff, batch_size=1) == 1
+    assert ArchivedTask.objects.filter(pk=child.pk).exists()
+    assert archive.archive_batch(cutoff) == 1
+    assert ArchivedTask.objects.filter(pk=parent.pk).exists()
+
+
+@pytest.mark.django_db
+def test_restore_brings_back_archived_parents_and_drops_missing_references(user, make_user, tags, create_task):
+    grandparent = create_task(title='gp')
+    parent = create_task(title='p', parent=grandparent.pk)
+    child = create_task(title='c', parent=parent.pk, tags=[tag.pk for tag in tags])
+    complete_long_ago(parent, child)
+    # 父任务在子任务移走后的下一批归档
+    cutoff = timezone.now() - timedelta(days=180)
+    assert [archive.archive_batch(cutoff) for _ in range(3)] == [1, 1, 0]
+    # 归档期间祖先任务和一个标签被删除
+    Task.objects.filter(pk=grandparent.pk).delete()
+    tags[1].delete()
+
+    # 其他用户不能恢复
+    assert archive.restore(make_user().pk, [child.pk]) == []
+    assert sorted(archive.restore(user.pk, [child.pk])) == sorted([parent.pk, child.pk])
+    assert Task.objects.get(pk=parent.pk).parent_id is None
+    assert Task.objects.get(pk=child.pk).parent_id == parent.pk
+    assert list(TaskTag.objects.filter(task_id=child.pk).values_list('tag_id', flat=True)) == [tags[0].pk]
+    assert archive.restore(user.pk, ['x']) == []
+
+
+@pytest.mark.django_db
+def test_api_reads_archived_tasks_and_restores_on_write(api_client, create_task):
+    task = create_task(title='old')
+    complete_long_ago(task)
+    archive.archive_batch(timezone.now() - timedelta(days=180))
+
+    response = api_client.get(f'/api/tasks/{task.pk}/')
+    assert response.status_code == 200
+    assert response.data['title'] == 'old'
+    ids = [item['id'] for item in api_client.get('/api/tasks/?include_archived=true').data['results']]
+    assert task.pk in ids
+    assert task.pk not in [item['id'] for item in api_client.get('/api/tasks/').data['results']]
+
+    response = api_client.patch(f'/api/tasks/{task.pk}/', {'title': 'reopened'}, format='json')
+    assert response.status_code == 200
+    assert Task.objects.get(pk=task.pk).title == 'reopened'
+    assert not ArchivedTask.objects.filter(pk=task.pk).exists()
+    assert api_client.patch('/api/tasks/999999/', {'title': 'x'}, format='json').status_code == 404
@@ -0,0 +1,74 @@
+import pytest
+from django.core.exceptions import ValidationError
+from django.db import connection
+
+from apps.tasks.models import Task
+
+PRIORITIES = ['none', 'low', 'medium', 'high']
+
+
+@pytest.fixture
+def tasks(user):
+    # 按字母顺序创建，与选项顺序不同
+    return {
+        priority: Task.objects.create(user=user, title=priority, priority=priority, status=status)
+        for priority, status in [('high', 'todo'), ('low', 'completed'), ('medium', 'in_progress'), ('none', 'todo')]
+    }
+
+
+def test_prep_value_uses_choice_index():
+    field = Task._meta.get_field('priority')
+    assert [field.get_prep_value(value) for value in PRIORITIES] == [0, 1, 2, 3]
+    assert field.get_prep_value(2) == 2
+    for value in ('urgent', 4, -1, True):
+        with pytest.raises(ValidationError):
+            field.get_prep_value(value)
+
+
+@pytest.mark.django_db
+def test_stored_as_integer_and_read_back_as_string(tasks):
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT priority, status FROM tasks WHERE id = %s', [tasks['medium'].pk])
+        assert cursor.fetchone() == (2, 1)
+    task = Task.objects.get(pk=tasks['medium'].pk)
+    assert (task.priority, task.status) == ('medium', 'in_progress')
+    assert task.get_priority_display() == '中'
+
+
+@pytest.mark.django_db
+def test_ordering_follows_choice_order(tasks):
+    assert list(Task.objects.order_by('priority').values_list('priority', flat=True)) == PRIORITIES
+    assert list(Task.objects.order_by('-priority').values_list('title', flat=True)) == PRIORITIES[::-1]
+
+
+@pytest.mark.django_db
+def test_range_lookups_compare_choice_order(tasks):
+    def titles(**lookup):
+        return sorted(Task.objects.filter(**lookup).values_list('title', flat=True))
+
+    assert titles(priority__gte='medium') == ['high', 'medium']
+    assert titles(priority__lt='medium') == ['low', 'none']
+    assert titles(priority__in=['none', 'high']) == ['high', 'none']
+    assert titles(status__in=['todo', 'in_progress']) == ['high', 'medium', 'none']
+
+
+@pytest.mark.django_db
+def test_api_filters_and_ordering(api_client, tasks):
+    def titles(query):
+        response = api_client.get(f'/api/tasks/?{query}')
+        assert response.status_code == 200, response.data
+        return [task['title'] for task in response.data['results']]
+
+    assert sorted(titles('priority__gte=medium')) == ['high', 'medium']
+    assert sorted(titles('priority__lte=low')) == ['low', 'none']
+    assert sorted(titles('status__in=todo,in_progress')) == ['high', 'medium', 'none']
+    assert titles('ordering=priority') == PRIORITIES
+    assert titles('ordering=-priority') == PRIORITIES[::-1]
+
+
+@pytest.mark.django_db
+def test_api_rejects_unknown_choice(api_client, tasks):
+    assert api_client.get('/api/tasks/?priority__gte=urgent').status_code == 400
+    response = api_client.post('/api/tasks/', {'title': 'x', 'priority': 'urgent'}, format='json')
+    assert response.status_code == 400
+    assert 'priority' in response.data
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.tasks.models import Task
+from apps.tasks.recurrence import materialize_next, next_occurrence, occurrences, parse_rule
+
+
+def at(*args):
+    return timezone.make_aware(datetime(*args))
+
+
+def local_dates(values):
+    return [timezone.localtime(value).date().isoformat() for value in values]
+
+
+@pytest.mark.parametrize('value', [
+    'FREQ=HOURLY',
+    'FREQ=DAILY;INTERVAL=0',
+    'FREQ=DAILY;BYDAY=MO',
+    'FREQ=WEEKLY;BYDAY=XX',
+    'FREQ=DAILY;COUNT=0',
+    'FREQ=DAILY;UNTIL=2024',
+    'FREQ=DAILY;BYMONTH=1',
+])
+def test_parse_rule_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_rule(value)
+
+
+def test_parse_rule_accepts_rrule_prefix():
+    rule = parse_rule('RRULE:freq=weekly;byday=we,mo;count=4')
+    assert rule.freq == 'WEEKLY'
+    assert rule.byday == (0, 2)
+    assert rule.count == 4
+
+
+def test_daily_count_limits_series():
+    start = at(2024, 1, 1, 9)
+    values = occurrences('FREQ=DAILY;COUNT=3', start, start, at(2024, 2, 1))
+    assert local_dates(values) == ['2024-01-01', '2024-01-02', '2024-01-03']
+
+
+def test_count_is_counted_from_series_start_not_window():
+    # 窗口从第 3 次开始，COUNT=4 只剩 2 次
+    start = at(2024, 1, 1, 9)
+    values = occurrences('FREQ=DAILY;INTERVAL=2;COUNT=4', start, at(2024, 1, 5), at(2024, 3, 1))
+    assert local_dates(values) == ['2024-01-05', '2024-01-07']
+
+
+def test_until_is_inclusive():
+    start = at(2024, 1, 1, 9)
+    values = occurrences('FREQ=DAILY;UNTIL=20240103', start, start, at(2024, 2, 1))
+    assert local_dates(values) == ['2024-01-01', '2024-01-02', '2024-01-03']
+
+
+def test_weekly_byday_skips_days_before_start():
+    # 2024-01-03 是周三，同一周的周一不计入 COUNT
+    start = at(2024, 1, 3, 9)
+    values = occurrences('FREQ=WEEKLY;BYDAY=MO,WE;COUNT=3', start, at(2024, 1, 1), at(2024, 3, 1))
+    assert local_dates(values) == ['2024-01-03', '2024-01-08', '2024-01-10']
+
+
+def test_weekly_interval_window_in_later_weeks():
+    start = at(2024, 1, 1, 9)
+    values = occurrences('FREQ=WEEKLY;INTERVAL=2;BYDAY=MO,FR', start, at(2024, 2, 1), at(2024, 2, 20))
+    assert local_dates(values) == ['2024-02-02', '2024-02-12', '2024-02-16']
+
+
+def test_monthly_on_31st_skips_short_months_and_counts_only_real_dates():
+    start = at(2024, 1, 31, 9)
+    values = occurrences('FREQ=MONTHLY;COUNT=4', start, start, at(2025, 1, 1))
+    assert local_dates(values) == ['2024-01-31', '2024-03-31', '2024-05-31', '2024-07-31']
+    # 窗口从年中开始时序号同样只按实际发生的月份计算
+    later = occurrences('FREQ=MONTHLY;COUNT=4', start, at(2024, 6, 1), at(2025, 1, 1))
+    assert local_dates(later) == ['2024-07-31']
+
+
+def test_yearly_leap_day():
+    start = at(2024, 2, 29, 9)
+    values = occurrences('FREQ=YEARLY', start, start, at(2033, 1, 1))
+    assert local_dates(values) == ['2024-02-29', '2028-02-29', '2032-02-29']
+
+
+def test_window_end_is_exclusive_and_keeps_time_of_day():
+    start = at(2024, 1, 1, 9, 30)
+    values = occurrences('FREQ=DAILY', start, start, at(2024, 1, 3, 9, 30))
+    assert values == (at(2024, 1, 1, 9, 30), at(2024, 1, 2, 9, 30))
+
+
+def test_next_occurrence_stops_after_count_and_until():
+    start = at(2024, 1, 1, 9)
+    assert next_occurrence('FREQ=DAILY;COUNT=2', start, start) == at(2024, 1, 2, 9)
+    assert next_occurrence('FREQ=DAILY;COUNT=2', start, at(2024, 1, 2, 9)) is None
+    assert next_occurrence('FREQ=WEEKLY;UNTIL=20240114', start, at(2024, 1, 8, 9)) is None
+
+
+@pytest.mark.django_db
+def test_materialize_next_moves_rule_to_new_instance(user):
+    start = at(2024, 1, 1, 9)
+    task = Task.objects.create(
+        user=user, title='周报', recurrence='FREQ=WEEKLY;COUNT=2', recurrence_start=start,
+        start_date=start - timedelta(hours=2), due_date=start,
+    )
+
+    second = materialize_next(task)
+    task.refresh_from_db()
+    assert task.recurrence == ''
+    assert second.due_date == at(2024, 1, 8, 9)
+    assert second.start_date == second.due_date - timedelta(hours=2)
+    assert second.recurrence == 'FREQ=WEEKLY;COUNT=2'
+
+    # 第 2 次是最后一次，系列结束
+    assert materialize_next(second) is None
+    assert Task.objects.filter(user=user).count() == 2
+    assert not Task.objects.filter(user=user).exclude(recurrence='').exists()
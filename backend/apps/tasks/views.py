@@ -1,73 +1,554 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import SAFE_METHODS
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from .models import Task
-from .serializers import TaskSerializer, TaskDetailSerializer
+from .models import ArchivedTask, Task, TaskActivity, TaskDailyStat
+from . import activity, archive, board as kanban, recurrence, reminders, rollup, spans
+from .filters import ArchivedTaskFilter, TaskFilter
+from .serializers import ArchivedTaskSerializer, TaskActivitySerializer, TaskSerializer, TaskDetailSerializer
+from apps.common.db import update_returning
+from apps.common.mixins import ReplicaReadMixin, SparseFieldsetMixin
+from apps.filters.dsl import FilterError, compile_query
+from apps.filters.models import SavedFilter
+from apps.projects.models import Project
+from apps.realtime.events import notify_change
+from apps.tags.models import Tag, TaskTag
 from django.utils import timezone
-from django.db.models import Count, Q, F
-from datetime import timedelta
+from django.utils.dateparse import parse_date
+from django.db import router, transaction
+from django.db.models import Count, Q, F, Prefetch, Sum, prefetch_related_objects
+from django.db.models.functions import TruncDate
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.http import Http404, StreamingHttpResponse
+from django.utils.functional import cached_property
+from collections import Counter
+from contextlib import nullcontext
+from datetime import datetime, time, timedelta
+import csv
 
 
-class TaskViewSet(viewsets.ModelViewSet):
+# 日历精简模式返回的字段
+COMPACT_CALENDAR_FIELDS = ['id', 'title', 'status', 'priority', 'project', 'start_date', 'due_date', 'is_starred']
+
+# 导出的列，任务表与归档表通用
+EXPORT_FIELDS = [
+    'id', 'title', 'description', 'project_id', 'parent_id', 'status', 'priority',
+    'start_date', 'due_date', 'completed_at', 'is_starred', 'created_at',
+]
+EXPORT_CHUNK_SIZE = 2000
+
+
+def shift_month(day, months):
+    """返回 day 所在月份偏移 months 个月后的第一天"""
+    index = day.year * 12 + day.month - 1 + months
+    return day.replace(year=index // 12, month=index % 12 + 1, day=1)
+
+
+def merge_counts(rows, extra, keys):
+    """合并两组 values(*keys).annotate(count=...) 的分组计数"""
+    merged = {tuple(row[key] for key in keys): dict(row) for row in rows}
+    for row in extra:
+        key = tuple(row[key] for key in keys)
+        if key in merged:
+            merged[key]['count'] += row['count']
+        else:
+            merged[key] = dict(row)
+    return list(merged.values())
+
+
+class ChainedResults:
+    """依次拼接多个查询集，供分页器计数和切片，只查询落在当前页的部分"""
+    ordered = True
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+
+    @cached_property
+    def counts(self):
+        return [queryset.count() for queryset in self.querysets]
+
+    def count(self):
+        return sum(self.counts)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = self.count() if key.stop is None else key.stop
+        items = []
+        for queryset, count in zip(self.querysets, self.counts):
+            if start < count and stop > 0:
+                items += list(queryset[max(start, 0):min(stop, count)])
+            start -= count
+            stop -= count
+        return items
+
+
+class Echo:
+    """csv.writer 的伪文件对象，writerow 直接返回写入的内容"""
+
+    def write(self, value):
+        return value
+
+
+class TaskActivityPagination(CursorPagination):
+    """按 (task, created_at) 索引游标分页，翻页不需要 OFFSET"""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+
+
+class TaskViewSet(ReplicaReadMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = TaskSerializer
+    replica_actions = {'list', 'board', 'calendar', 'today', 'occurrences', 'statistics', 'trends', 'heatmap', 'system', 'activity'}
+    # 聚合统计和批量操作消耗更多限流令牌，见 apps.common.throttling
+    throttle_costs = {
+        'statistics': 10,
+        'trends': 5,
+        'heatmap': 5,
+        'system': 5,
+        'occurrences': 3,
+        'calendar': 3,
+        'batch_update': 10,
+        'export': 10,
+    }
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ['status', 'priority', 'project', 'is_starred']
+    filterset_class = TaskFilter
     search_fields = ['title', 'description']
     ordering_fields = ['created_at', 'due_date', 'order', 'priority']
 
-    def get_queryset(self):
+    def handle_exception(self, exc):
+        # 对已归档任务的写操作：任务表中找不到时将其移回任务表后重试一次，
+        # 任务表中的任务不受影响，仍是单条 UPDATE
+        if (
+            isinstance(exc, Http404)
+            and self.detail
+            and self.request.method not in SAFE_METHODS
+            and 'pk' in self.kwargs
+            and not getattr(self, 'restored_archived', False)
+        ):
+            self.restored_archived = True
+            if archive.restore(self.request.user.pk, [self.kwargs['pk']]):
+                try:
+                    handler = getattr(self, self.request.method.lower())
+                    return handler(self.request, *self.args, **self.kwargs)
+                except Exception as retry_exc:
+                    exc = retry_exc
+        return super().handle_exception(exc)
+
+    def get_base_queryset(self):
         queryset = Task.objects.filter(user=self.request.user)
         
         # 默认不显示已删除的任务
         include_deleted = self.request.query_params.get('include_deleted', 'false')
         if include_deleted.lower() != 'true':
             queryset = queryset.filter(is_deleted=False)
+
+        # 智能清单：?saved_filter=<清单ID>
+        saved_filter = self.request.query_params.get('saved_filter')
+        if saved_filter:
+            queryset = queryset.filter(self.get_saved_filter_condition(saved_filter))
         
         return queryset
 
+    def get_saved_filter_condition(self, pk):
+        try:
+            query = SavedFilter.objects.filter(pk=pk, user=self.request.user).values_list('query', flat=True).first()
+        except (TypeError, ValueError):
+            query = None
+        if query is None:
+            raise Http404
+        try:
+            return compile_query(query)
+        except FilterError as exc:
+            raise ValidationError({'saved_filter': str(exc)})
+
+    def get_queryset(self):
+        return self.optimize_queryset(self.get_base_queryset())
+
+    def optimize_queryset(self, queryset):
+        """根据本次请求输出的字段，只加载需要的列和关联数据"""
+        queryset = self.defer_unrequested_fields(queryset)
+
+        if self.is_expanded('project'):
+            queryset = queryset.select_related('project')
+
+        if self.wants_field('tags'):
+            # 带上分区键，分区表上只扫描当前用户的分区
+            task_tags = TaskTag.objects.filter(user=self.request.user)
+            if self.is_expanded('tags'):
+                task_tags = task_tags.select_related('tag')
+            queryset = queryset.prefetch_related(Prefetch('task_tags', queryset=task_tags))
+
+        if self.wants_field('subtasks_count'):
+            # 聚合查询不会应用 Meta.ordering，需要显式排序
+            # 子任务可能已归档（如恢复了上级任务），一并计入
+            queryset = queryset.annotate(
+                subtasks_total=Count('subtasks') + archive.subtasks_count()
+            ).order_by(*Task._meta.ordering)
+
+        if self.wants_field('subtasks'):
+            subtasks = Task.objects.filter(user=self.request.user).select_related('project').prefetch_related(
+                Prefetch('task_tags', queryset=TaskTag.objects.filter(user=self.request.user).select_related('tag'))
+            ).annotate(
+                subtasks_total=Count('subtasks') + archive.subtasks_count()
+            ).order_by(*Task._meta.ordering)
+            queryset = queryset.prefetch_related(Prefetch('subtasks', queryset=subtasks))
+
+        return queryset
+
+    def includes_archived(self, default=False):
+        """
+        是否同时读取已归档任务
+
+        搜索时默认包含，?include_archived= 可显式指定；智能清单只作用于任务表。
+        """
+        params = self.request.query_params
+        if params.get('saved_filter'):
+            return False
+        if params.get('search'):
+            default = True
+        return params.get('include_archived', str(default)).lower() == 'true'
+
+    def get_archived_queryset(self):
+        """当前用户的已归档任务，与 optimize_queryset 一样按请求的字段加载"""
+        queryset = self.defer_unrequested_fields(ArchivedTask.objects.filter(user=self.request.user))
+        if self.is_expanded('project'):
+            queryset = queryset.select_related('project')
+        if self.wants_field('subtasks_count'):
+            queryset = queryset.annotate(subtasks_total=archive.subtasks_count())
+        return queryset
+
+    def filter_archived_queryset(self, queryset):
+        """对已归档任务应用与列表相同的筛选和搜索参数"""
+        queryset = ArchivedTaskFilter(self.request.query_params, queryset=queryset, request=self.request).qs
+        return SearchFilter().filter_queryset(self.request, queryset, self)
+
+    def serialize_archived(self, tasks):
+        """序列化已归档任务，标签一次查询加载"""
+        tag_ids = {tag_id for task in tasks for tag_id in task.tag_ids}
+        tags = Tag.objects.filter(user=self.request.user, pk__in=tag_ids).in_bulk() if tag_ids else {}
+        fields, omit, expand = self.get_sparse_fieldset()
+        return ArchivedTaskSerializer(
+            tasks, many=True, fields=fields, omit=omit, expand=expand,
+            context={**self.get_serializer_context(), 'tags': tags}
+        ).data
+
+    def serialize_mixed(self, tasks):
+        """序列化任务表与归档表的混合结果（归档任务排在后面）"""
+        hot = [task for task in tasks if isinstance(task, Task)]
+        archived = [task for task in tasks if isinstance(task, ArchivedTask)]
+        return self.get_serializer(hot, many=True).data + self.serialize_archived(archived)
+
+    def list(self, request, *args, **kwargs):
+        if not self.includes_archived():
+            return super().list(request, *args, **kwargs)
+        results = ChainedResults(
+            self.filter_queryset(self.get_queryset()),
+            self.filter_archived_queryset(self.get_archived_queryset()),
+        )
+        page = self.paginate_queryset(results)
+        if page is None:
+            return Response(self.serialize_mixed(results[:]))
+        return self.get_paginated_response(self.serialize_mixed(page))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            try:
+                task = self.get_archived_queryset().get(pk=kwargs['pk'])
+            except (ArchivedTask.DoesNotExist, TypeError, ValueError):
+                raise Http404
+        data = self.serialize_archived([task])[0]
+        if self.wants_field('subtasks'):
+            data['subtasks'] = self.serialize_archived(list(self.get_archived_queryset().filter(parent_id=task.pk)))
+        return Response(data)
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return TaskDetailSerializer
         return TaskSerializer
 
+    def update_task(self, queryset, rollup_before=None, track=(), **values):
+        """
+        用单条条件 UPDATE 修改当前任务，返回更新后的实例；条件不满足时返回 None
+
+        queryset.update 不触发信号，rollup_before 给出变更前与变更后不同的字段，
+        用于维护每日汇总和变更记录。变更前的值不确定的字段放在 track 中，
+        在同一事务中先锁定该行读取。
+        """
+        rollup_before = dict(rollup_before or {})
+        try:
+            queryset = queryset.filter(pk=self.kwargs['pk'])
+            # 只有需要先读取变更前的值时才开启事务，否则就是单条 UPDATE
+            with transaction.atomic(using=router.db_for_write(Task)) if track else nullcontext():
+                if track:
+                    prior = queryset.select_for_update().values(*track).first()
+                    if prior is None:
+                        return None
+                    rollup_before.update(prior)
+                tasks = update_returning(queryset, updated_at=timezone.now(), **values)
+        except (TypeError, ValueError):
+            raise Http404
+        if not tasks:
+            return None
+
+        task = tasks[0]
+        if rollup_before:
+            after = rollup.task_state(task)
+            before = {**after, **rollup_before}
+            rollup.record_change(before, after)
+            activity.log(activity.build(task.pk, activity.diff(before, after)))
+        notify_change(task.user_id, 'task', 'updated', [task.pk])
+        return task
+
+    def serialize_task(self, task):
+        """序列化单个任务，关联数据批量预取"""
+        prefetch_related_objects(
+            [task],
+            Prefetch('task_tags', queryset=TaskTag.objects.filter(user_id=task.user_id).select_related('tag')),
+            'project',
+        )
+        return self.get_serializer(task).data
+
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
         """完成任务"""
-        task = self.get_object()
-        task.status = 'completed'
-        task.completed_at = timezone.now()
-        task.save()
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        task = self.update_task(
+            self.get_base_queryset().exclude(status='completed'),
+            track=('status', 'completed_at'),
+            status='completed',
+            completed_at=timezone.now(),
+            next_reminder_at=None,
+        )
+        if task is None:
+            # 已完成的任务保持原完成时间，不存在时返回404
+            task = self.get_object()
+        else:
+            # 重复任务完成后生成下一次实例
+            recurrence.materialize_next(task)
+        return Response(self.serialize_task(task))
 
     @action(detail=True, methods=['post'])
     def toggle_star(self, request, pk=None):
         """切换标星状态"""
-        task = self.get_object()
-        task.is_starred = not task.is_starred
-        task.save()
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        task = self.update_task(self.get_base_queryset(), is_starred=~F('is_starred'))
+        if task is None:
+            raise Http404
+        return Response(self.serialize_task(task))
+
+    @action(detail=False, methods=['get'])
+    def board(self, request):
+        """
+        看板：按 group_by 分列，返回每列的总数和前 limit 张卡片
+
+        指定 ?column=&cursor= 时只返回该列游标之后的卡片，用于继续加载。
+        """
+        group_by = request.query_params.get('group_by', 'status')
+        if group_by not in kanban.BOARD_GROUPS:
+            return Response(
+                {'error': 'group_by must be one of status, priority, project, tag'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 100)
+        except ValueError:
+            return Response({'error': 'Invalid limit'}, status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = kanban.with_column(self.filter_queryset(self.get_queryset()), group_by)
+
+        column = request.query_params.get('column')
+        if column is not None:
+            try:
+                value = kanban.parse_column(group_by, column)
+                queryset = kanban.filter_column(queryset, value)
+                cursor = request.query_params.get('cursor')
+                if cursor:
+                    queryset = kanban.after_cursor(queryset, cursor)
+            except ValueError:
+                return Response({'error': 'Invalid column or cursor'}, status=status.HTTP_400_BAD_REQUEST)
+            tasks = list(queryset.order_by(*kanban.CARD_ORDERING)[:limit + 1])
+            has_more = len(tasks) > limit
+            tasks = tasks[:limit]
+            return Response({
+                'group_by': group_by,
+                'key': value,
+                'tasks': self.get_serializer(tasks, many=True).data,
+                'next_cursor': kanban.encode_cursor(tasks[-1]) if has_more else None,
+            })
+
+        columns = {key: [] for key in kanban.fixed_columns(group_by)}
+        counts = {}
+        for task in kanban.rank(queryset, limit):
+            columns.setdefault(task.board_column, []).append(task)
+            counts[task.board_column] = task.board_count
+
+        keys = list(columns)
+        if group_by in ('project', 'tag'):
+            # 无项目/无标签的列排在最后
+            keys.sort(key=lambda key: (key is None, key or 0))
+        result = []
+        for key in keys:
+            tasks = sorted(columns[key], key=lambda task: task.board_position)
+            count = counts.get(key, 0)
+            result.append({
+                'key': key,
+                'count': count,
+                'tasks': self.get_serializer(tasks, many=True).data,
+                'next_cursor': kanban.encode_cursor(tasks[-1]) if count > len(tasks) else None,
+            })
+        return Response({'group_by': group_by, 'columns': result})
+
+    @action(detail=False, methods=['get'])
+    def calendar(self, request):
+        """
+        日历：返回时间跨度与 [start, end] 重叠的任务，按天分组
+
+        ?prefetch=N 将窗口向前、向后各扩展 N 个整月，便于客户端预取相邻月份；
+        ?compact=true 只返回日历渲染需要的字段；?include_undated=true 附带无日期任务。
+        """
+        params = request.query_params
+        start = parse_date(params.get('start', ''))
+        end = parse_date(params.get('end', ''))
+        if start is None or end is None or end < start:
+            return Response(
+                {'error': 'start and end (YYYY-MM-DD) are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            prefetch = min(max(int(params.get('prefetch', 0)), 0), 2)
+        except ValueError:
+            return Response({'error': 'Invalid prefetch'}, status=status.HTTP_400_BAD_REQUEST)
+        if prefetch:
+            start = shift_month(start, -prefetch)
+            end = shift_month(end, prefetch + 1) - timedelta(days=1)
+        if (end - start).days > 186:
+            return Response(
+                {'error': 'Window must not exceed 186 days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        window_start = timezone.make_aware(datetime.combine(start, time.min))
+        window_end = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+        queryset = self.filter_queryset(self.get_base_queryset())
+        compact = params.get('compact', 'false').lower() == 'true'
+
+        matched = spans.overlapping(queryset, window_start, window_end)
+        if compact:
+            tasks = list(matched.values(*COMPACT_CALENDAR_FIELDS))
+            for task in tasks:
+                task['all_day'] = spans.is_all_day(task['start_date'], task['due_date'])
+            ranges = [(task['id'], task['start_date'], task['due_date']) for task in tasks]
+        else:
+            # 注解的时间不受字段裁剪（defer）影响，分组时不会额外查询
+            instances = list(self.optimize_queryset(matched).annotate(
+                calendar_start=F('start_date'), calendar_due=F('due_date')
+            ))
+            tasks = self.get_serializer(instances, many=True).data
+            ranges = [(task.pk, task.calendar_start, task.calendar_due) for task in instances]
+
+        days = {}
+        for task_id, task_start, task_due in ranges:
+            for day in spans.covered_days(task_start, task_due, start, end):
+                days.setdefault(day.isoformat(), []).append(task_id)
+
+        data = {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'days': dict(sorted(days.items())),
+            'tasks': tasks,
+        }
+        if params.get('include_undated', 'false').lower() == 'true':
+            undated = queryset.filter(start_date__isnull=True, due_date__isnull=True)[:100]
+            if compact:
+                data['undated'] = list(undated.values(*COMPACT_CALENDAR_FIELDS))
+            else:
+                data['undated'] = self.get_serializer(self.optimize_queryset(undated), many=True).data
+        return Response(data)
 
     @action(detail=False, methods=['get'])
     def today(self, request):
         """获取今日任务"""
         today = timezone.now().date()
-        tasks = self.get_queryset().filter(
+        tasks = list(self.get_queryset().filter(
             due_date__date=today,
             status__in=['todo', 'in_progress']
+        ))
+
+        # 当前实例早于今天、但系列今天有发生的重复任务
+        day_start = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+        day_end = day_start + timedelta(days=1)
+        series = self.get_queryset().exclude(recurrence='').filter(
+            due_date__lt=day_start,
+            status__in=['todo', 'in_progress']
         )
+        tasks += [
+            task for task in series
+            if recurrence.occurrences(task.recurrence, task.recurrence_start, day_start, day_end)
+        ]
+
         serializer = self.get_serializer(tasks, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def occurrences(self, request):
+        """获取时间窗口内的任务发生时间，重复任务的后续日期按规则即时计算"""
+        start = parse_date(request.query_params.get('start', ''))
+        end = parse_date(request.query_params.get('end', ''))
+        if start is None or end is None or end < start:
+            return Response(
+                {'error': 'start and end (YYYY-MM-DD) are required'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end - start).days > 366:
+            return Response(
+                {'error': 'Window must not exceed 366 days'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        window_start = timezone.make_aware(datetime.combine(start, time.min))
+        window_end = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+        queryset = self.get_base_queryset()
+
+        entries = [
+            {'task': row['id'], 'date': timezone.localtime(row['due_date']), 'virtual': False}
+            for row in queryset.filter(
+                due_date__gte=window_start,
+                due_date__lt=window_end
+            ).values('id', 'due_date')
+        ]
+
+        # 未完成的重复系列，展开当前实例之后落在窗口内的日期
+        series = queryset.exclude(recurrence='').exclude(status='completed').filter(
+            due_date__lt=window_end
+        ).values('id', 'recurrence', 'recurrence_start', 'due_date')
+        for row in series:
+            for when in recurrence.occurrences(row['recurrence'], row['recurrence_start'], window_start, window_end):
+                if when > row['due_date']:
+                    entries.append({'task': row['id'], 'date': when, 'virtual': True})
+
+        entries.sort(key=lambda entry: entry['date'])
+        task_ids = {entry['task'] for entry in entries}
+        tasks = self.optimize_queryset(queryset.filter(id__in=task_ids))
+        return Response({
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'occurrences': entries,
+            'tasks': self.get_serializer(tasks, many=True).data
+        })
+
     @action(detail=False, methods=['get'])
     def statistics(self, request):
         """获取任务统计数据"""
-        queryset = self.get_queryset()
+        queryset = self.get_base_queryset()
         now = timezone.now()
-        today = now.date()
         
         # 基础统计
         total_count = queryset.count()
@@ -88,44 +569,79 @@ class TaskViewSet(viewsets.ModelViewSet):
             count=Count('id')
         ))
         
-        # 过去7天每日完成数
-        weekly_data = []
-        for i in range(6, -1, -1):
-            day = today - timedelta(days=i)
-            day_start = timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.min.time()))
-            day_end = timezone.make_aware(timezone.datetime.combine(day, timezone.datetime.max.time()))
-            
-            completed = queryset.filter(
-                completed_at__gte=day_start,
-                completed_at__lte=day_end
-            ).count()
-            
-            total = queryset.filter(
-                created_at__lte=day_end
-            ).count()
-            
-            weekly_data.append({
-                'date': day.isoformat(),
-                'completed': completed,
-                'total': total
-            })
-        
         # 项目任务分布
         project_distribution = list(queryset.values(
             'project__id', 'project__name'
         ).annotate(
             count=Count('id')
         ).filter(project__isnull=False))
+
+        # 已归档的任务都已完成，计入总数、完成数和各项分布
+        include_archived = self.includes_archived(default=True)
+        archived = ArchivedTask.objects.filter(user=request.user)
+        if include_archived:
+            archived_count = archived.count()
+            total_count += archived_count
+            completed_count += archived_count
+            if archived_count:
+                status_distribution = merge_counts(
+                    status_distribution, archived.values('status').annotate(count=Count('id')), ['status']
+                )
+                priority_distribution = merge_counts(
+                    priority_distribution, archived.values('priority').annotate(count=Count('id')), ['priority']
+                )
+                project_distribution = merge_counts(
+                    project_distribution,
+                    archived.values('project__id', 'project__name').annotate(
+                        count=Count('id')
+                    ).filter(project__isnull=False),
+                    ['project__id'],
+                )
         
-        # 标签使用统计
-        from apps.tags.models import TaskTag
-        tag_stats = list(TaskTag.objects.filter(
-            task__user=request.user
-        ).values(
-            'tag__id', 'tag__name'
-        ).annotate(
-            count=Count('id')
-        ).order_by('-count')[:10])
+        # 过去7天每日完成数（来自每日汇总表）
+        local_today = timezone.localdate()
+        week_start = local_today - timedelta(days=6)
+        daily = {
+            row['date']: row
+            for row in TaskDailyStat.objects.filter(
+                user=request.user,
+                date__range=(week_start, local_today)
+            ).values('date').annotate(
+                created=Sum('created_count'),
+                completed=Sum('completed_count')
+            )
+        }
+        # 截至某日的任务总数 = 当前总数 - 该日之后创建的任务数
+        # 汇总表包含已归档、不含已删除的任务，总数口径不同（排除归档、智能清单、包含已删除）时按创建日期统计
+        params = request.query_params
+        if include_archived and not params.get('saved_filter') and params.get('include_deleted', 'false').lower() != 'true':
+            created = {day: row.get('created') or 0 for day, row in daily.items()}
+        else:
+            since = timezone.make_aware(datetime.combine(week_start, time.min))
+            created = Counter()
+            for source in [queryset, archived] if include_archived else [queryset]:
+                created.update(dict(source.filter(created_at__gte=since).annotate(
+                    day=TruncDate('created_at')
+                ).values('day').annotate(count=Count('id')).values_list('day', 'count')))
+        weekly_data = []
+        created_after = 0
+        for i in range(7):
+            day = local_today - timedelta(days=i)
+            weekly_data.append({
+                'date': day.isoformat(),
+                'completed': daily.get(day, {}).get('completed') or 0,
+                'total': total_count - created_after
+            })
+            created_after += created.get(day, 0)
+        weekly_data.reverse()
+        
+        # 标签使用统计：按 (user, -usage_count) 索引读取前 10 个
+        tag_stats = [
+            {'tag__id': tag_id, 'tag__name': name, 'count': count}
+            for tag_id, name, count in Tag.objects.filter(
+                user=request.user, usage_count__gt=0
+            ).order_by('-usage_count', 'id').values_list('id', 'name', 'usage_count')[:10]
+        ]
         
         return Response({
             'summary': {
@@ -142,6 +658,79 @@ class TaskViewSet(viewsets.ModelViewSet):
             'tag_stats': tag_stats
         })
     
+    @action(detail=False, methods=['get'])
+    def trends(self, request):
+        """获取最近 7/30/365 天的任务趋势"""
+        days = request.query_params.get('days', '7')
+        if days not in ('7', '30', '365'):
+            return Response(
+                {'error': 'days must be one of 7, 30, 365'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        group_by = request.query_params.get('group_by')
+        group_fields = {None: [], 'project': ['project_ref'], 'priority': ['priority']}
+        if group_by not in group_fields:
+            return Response(
+                {'error': 'group_by must be project or priority'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        today = timezone.localdate()
+        start = today - timedelta(days=int(days) - 1)
+        rows = TaskDailyStat.objects.filter(
+            user=request.user,
+            date__range=(start, today)
+        ).values('date', *group_fields[group_by]).annotate(
+            created=Sum('created_count'),
+            completed=Sum('completed_count'),
+            overdue=Sum('overdue_count')
+        ).order_by('date')
+
+        data = []
+        for row in rows:
+            # 当天尚未结束，逾期数只统计已过去的日期
+            if row['date'] >= today:
+                row['overdue'] = 0
+            if 'project_ref' in row:
+                row['project'] = row.pop('project_ref') or None
+            row['date'] = row['date'].isoformat()
+            data.append(row)
+
+        if group_by is None:
+            # 补齐没有数据的日期
+            by_date = {row['date']: row for row in data}
+            data = []
+            for i in range(int(days)):
+                day = (start + timedelta(days=i)).isoformat()
+                data.append(by_date.get(day, {
+                    'date': day, 'created': 0, 'completed': 0, 'overdue': 0
+                }))
+
+        return Response({'days': int(days), 'group_by': group_by, 'data': data})
+
+    @action(detail=False, methods=['get'])
+    def heatmap(self, request):
+        """获取全年每日完成数热力图"""
+        try:
+            year = int(request.query_params.get('year', timezone.localdate().year))
+        except ValueError:
+            return Response(
+                {'error': 'Invalid year'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = TaskDailyStat.objects.filter(
+            user=request.user,
+            date__year=year
+        ).values('date').annotate(
+            count=Sum('completed_count')
+        ).filter(count__gt=0).order_by('date')
+
+        return Response({
+            'year': year,
+            'data': [{'date': row['date'].isoformat(), 'count': row['count']} for row in rows]
+        })
+
     @action(detail=False, methods=['get'])
     def system(self, request):
         """获取系统清单任务"""
@@ -168,10 +757,16 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        serializer = self.get_serializer(queryset, many=True)
+        count = queryset.count()
+        results = self.get_serializer(self.optimize_queryset(queryset), many=True).data
+        if system_type == 'completed' and self.includes_archived(default=True):
+            # 已归档的任务排在后面，按完成时间倒序
+            archived = list(self.get_archived_queryset())
+            count += len(archived)
+            results += self.serialize_archived(archived)
         return Response({
-            'results': serializer.data,
-            'count': queryset.count()
+            'results': results,
+            'count': count
         })
     
     @action(detail=False, methods=['post'])
@@ -186,6 +781,9 @@ class TaskViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # 已归档的任务先移回任务表
+        archive.restore(request.user.pk, task_ids)
+
         # 获取当前用户的任务
         tasks = Task.objects.filter(
             id__in=task_ids,
@@ -193,17 +791,38 @@ class TaskViewSet(viewsets.ModelViewSet):
         )
         
         # 批量更新
-        updated_count = tasks.update(**updates)
+        updated_ids = list(tasks.values_list('id', flat=True))
+        before_states = rollup.fetch_states(updated_ids)
+        try:
+            updated_count = tasks.update(**{'updated_at': timezone.now(), **updates})
+        except (TypeError, ValueError, FieldDoesNotExist) as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        except DjangoValidationError as exc:
+            return Response({'error': exc.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
         
         # 如果是完成操作，更新完成时间
         if updates.get('status') == 'completed':
             tasks.update(completed_at=timezone.now())
+
+        # queryset.update 不会触发信号，需要手动更新每日汇总
+        after_states = rollup.fetch_states(updated_ids)
+        rollup.record_bulk_change(before_states, after_states)
+        activity.log_changes(before_states, after_states)
+        reminders.sync_next_reminders(updated_ids)
+
+        # 完成的重复任务生成下一次实例
+        if updates.get('status') == 'completed':
+            for task in tasks.exclude(recurrence=''):
+                recurrence.materialize_next(task)
+
+        # queryset.update 不会触发信号，需要手动推送变更
+        notify_change(request.user.pk, 'task', 'updated', updated_ids)
         
         # 返回更新后的任务
-        updated_tasks = Task.objects.filter(
+        updated_tasks = self.optimize_queryset(Task.objects.filter(
             id__in=task_ids,
             user=request.user
-        )
+        ))
         serializer = self.get_serializer(updated_tasks, many=True)
         
         return Response({
@@ -213,19 +832,31 @@ class TaskViewSet(viewsets.ModelViewSet):
     
     def destroy(self, request, *args, **kwargs):
         """软删除任务（移入垃圾筒）"""
-        task = self.get_object()
-        task.is_deleted = True
-        task.save()
+        task = self.update_task(
+            self.get_base_queryset().filter(is_deleted=False),
+            rollup_before={'is_deleted': False},
+            is_deleted=True,
+            next_reminder_at=None,
+        )
+        # 已在垃圾筒中的任务视为删除成功，不存在时返回404
+        if task is None and not Task.objects.filter(user=request.user, pk=kwargs['pk'], is_deleted=True).exists():
+            raise Http404
         return Response(status=status.HTTP_204_NO_CONTENT)
     
     @action(detail=True, methods=['post'])
     def restore(self, request, pk=None):
         """恢复已删除的任务"""
-        task = self.get_object()
-        task.is_deleted = False
-        task.save()
-        serializer = self.get_serializer(task)
-        return Response(serializer.data)
+        task = self.update_task(
+            Task.objects.filter(user=request.user, is_deleted=True),
+            rollup_before={'is_deleted': True},
+            is_deleted=False,
+        )
+        if task is None:
+            task = self.get_object()
+        else:
+            reminders.sync_next_reminders([task.pk])
+            task.refresh_from_db(fields=['next_reminder_at'])
+        return Response(self.serialize_task(task))
     
     @action(detail=True, methods=['delete'])
     def permanent_delete(self, request, pk=None):
@@ -233,3 +864,79 @@ class TaskViewSet(viewsets.ModelViewSet):
         task = self.get_object()
         task.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=True, methods=['get'])
+    def activity(self, request, pk=None):
+        """任务变更记录（游标分页）"""
+        try:
+            exists = (
+                Task.objects.filter(pk=pk, user=request.user).exists()
+                or ArchivedTask.objects.filter(pk=pk, user=request.user).exists()
+            )
+        except (TypeError, ValueError):
+            exists = False
+        if not exists:
+            raise Http404
+
+        paginator = TaskActivityPagination()
+        page = paginator.paginate_queryset(TaskActivity.objects.filter(task_id=pk), request, view=self)
+        return paginator.get_paginated_response(TaskActivitySerializer(page, many=True).data)
+
+    @action(detail=True, methods=['post'])
+    def unarchive(self, request, pk=None):
+        """将已归档任务移回任务表（写操作前已在 initial 中完成）"""
+        return Response(self.serialize_task(self.get_object()))
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        导出任务为 CSV（流式输出），包括已归档任务
+
+        ?include_deleted=true 时包含回收站中的任务，?include_archived=false 时不读取归档表。
+        """
+        response = StreamingHttpResponse(self.export_rows(), content_type='text/csv; charset=utf-8')
+        response['Content-Disposition'] = 'attachment; filename="tasks.csv"'
+        return response
+
+    def export_rows(self):
+        user = self.request.user
+        projects = dict(Project.objects.filter(user=user).values_list('pk', 'name'))
+        tags = dict(Tag.objects.filter(user=user).values_list('pk', 'name'))
+        writer = csv.writer(Echo())
+
+        def row(task, tag_ids, archived):
+            values = [task[field] for field in EXPORT_FIELDS]
+            values[EXPORT_FIELDS.index('project_id')] = projects.get(task['project_id'], '')
+            values = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+            names = [tags[tag_id] for tag_id in tag_ids if tag_id in tags]
+            return writer.writerow(values + [','.join(names), archived])
+
+        # 带 BOM，Excel 可以正确识别中文
+        yield '\ufeff' + writer.writerow(
+            [field.removesuffix('_id') for field in EXPORT_FIELDS] + ['tags', 'archived']
+        )
+        hot = self.get_base_queryset().order_by('pk').values(*EXPORT_FIELDS)
+        for chunk in iter_chunks(hot):
+            links = {}
+            task_tags = TaskTag.objects.filter(user=user, task_id__in=[task['id'] for task in chunk])
+            for task_id, tag_id in task_tags.values_list('task_id', 'tag_id'):
+                links.setdefault(task_id, []).append(tag_id)
+            for task in chunk:
+                yield row(task, links.get(task['id'], []), False)
+
+        if self.includes_archived(default=True):
+            archived = ArchivedTask.objects.filter(user=user).order_by('pk').values(*EXPORT_FIELDS, 'tag_ids')
+            for chunk in iter_chunks(archived):
+                for task in chunk:
+                    yield row(task, task['tag_ids'], True)
+
+
+def iter_chunks(queryset, size=EXPORT_CHUNK_SIZE):
+    """按主键分批读取（queryset 需按 pk 排序且返回 id 列）"""
+    last = None
+    while True:
+        chunk = list((queryset if last is None else queryset.filter(pk__gt=last))[:size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]['id']
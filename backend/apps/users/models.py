@@ -11,6 +11,8 @@ class User(AbstractUser):
     bio = models.TextField(blank=True, null=True, verbose_name='个人简介')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+    # 任务、项目、标签、清单等数据变更后递增，默认缓存不共享时用于缓存失效（见 apps.common.cache）
+    data_version = models.PositiveBigIntegerField(default=0, editable=False, verbose_name='数据版本')
 
     class Meta:
         db_table = 'users'
@@ -0,0 +1,128 @@
+"""
+任务归档前后活跃清单延迟对比
+
+创建一个拥有 N 个任务的压测用户，其中大部分为很久以前完成的任务，
+分别在归档前后请求活跃任务列表和收集箱计数，统计延迟分位数。
+
+用法（在 backend 目录下，DATABASE_URL 指向独立的压测数据库）：
+    python benchmarks/bench_archive.py --tasks 100000 --completed 0.9
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+USERNAME = 'bench_archive'
+
+
+def setup(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
+    # 同一用户连续请求，关闭限流
+    os.environ['THROTTLE_ENABLED'] = 'false'
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+    from django.utils import timezone
+    from apps.tasks.models import ArchivedTask, Task
+    from apps.users.models import User
+
+    settings.ALLOWED_HOSTS = ['*']
+    user, _ = User.objects.get_or_create(username=USERNAME, defaults={'email': f'{USERNAME}@example.com'})
+    # 每次重新生成，跳过信号直接删除
+    for model in (ArchivedTask, Task):
+        queryset = model.objects.filter(user=user)
+        queryset._raw_delete(queryset.db)
+
+    rng = random.Random(args.seed)
+    now = timezone.now()
+    print(f'生成 {args.tasks} 个任务...')
+    for start in range(0, args.tasks, 5000):
+        tasks = []
+        for _ in range(min(5000, args.tasks - start)):
+            completed = rng.random() < args.completed
+            tasks.append(Task(
+                user=user,
+                title=f'task {rng.randrange(10 ** 6)}',
+                status='completed' if completed else 'todo',
+                completed_at=now - timedelta(days=rng.randint(200, 1000)) if completed else None,
+                order=rng.randrange(1000),
+            ))
+        Task.objects.bulk_create(tasks)
+    if connection.vendor == 'sqlite':
+        connection.cursor().execute('ANALYZE')
+    return user
+
+
+def measure(client, urls, rounds):
+    """返回 {url: [毫秒, ...]}"""
+    latencies = {url: [] for url in urls}
+    for url in urls:
+        client.get(url)  # 预热
+        for _ in range(rounds):
+            start = time.perf_counter()
+            response = client.get(url)
+            latencies[url].append((time.perf_counter() - start) * 1000)
+            assert response.status_code == 200, response.status_code
+    return latencies
+
+
+def report(title, latencies):
+    print(title)
+    print(f'{"p50(ms)":>10} {"p95(ms)":>10} {"max(ms)":>10}  接口')
+    for url, values in latencies.items():
+        values.sort()
+        print(
+            f'{statistics.median(values):>10.2f} {values[int(len(values) * 0.95) - 1]:>10.2f} '
+            f'{values[-1]:>10.2f}  {url}'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--completed', type=float, default=0.9, help='很久以前完成的任务比例')
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    user = setup(args)
+    from django.conf import settings
+    from django.db import connection
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from apps.tasks import archive
+    from apps.tasks.models import ArchivedTask
+
+    client = APIClient()
+    client.force_authenticate(user)
+    urls = [
+        '/api/tasks/?status__in=todo,in_progress',
+        '/api/tasks/?status__in=todo,in_progress&ordering=-created_at&fields=id,title,status',
+        '/api/tasks/board/?limit=20',
+    ]
+
+    report(f'{connection.vendor}，归档前（{args.tasks} 个任务）', measure(client, urls, args.rounds))
+
+    start = time.perf_counter()
+    cutoff = timezone.now() - timedelta(days=settings.ARCHIVE['AFTER_DAYS'])
+    while archive.archive_batch(cutoff, user_ids=[user.pk]):
+        pass
+    archived = ArchivedTask.objects.filter(user=user).count()
+    print(f'归档 {archived} 个任务，用时 {time.perf_counter() - start:.1f}s')
+    if connection.vendor == 'sqlite':
+        connection.cursor().execute('ANALYZE')
+
+    report('归档后', measure(client, urls, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""
+数据库连接复用基准测试
+
+分别以不同的连接配置启动 gunicorn，对同一接口压测并比较 requests/sec：
+- per_request: DB_CONN_MAX_AGE=0，每个请求新建连接
+- persistent:  DB_CONN_MAX_AGE=60，worker 内复用连接
+- pool:        DB_POOL=true，psycopg3 连接池（需要 PostgreSQL 和 psycopg[pool]）
+
+用法（在 backend 目录下，DATABASE_URL 指向待测数据库）：
+    python benchmarks/bench_db_pool.py --requests 2000 --concurrency 8 --redis-url redis://localhost:6379/0
+
+多个 worker 时事件代理需要 RedisBackend（见 gunicorn.conf.py），--redis-url 默认取 REALTIME_URL；
+不使用 Redis 时以 --workers 1 运行。gunicorn 的输出写入 --log，启动失败时打印末尾几行。
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+MODES = {
+    'per_request': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'false'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'false'},
+    'pool': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'true'},
+}
+
+
+def create_token():
+    """创建压测用户并返回访问令牌"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
+    import django
+    django.setup()
+    from apps.users.models import User
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user, _ = User.objects.get_or_create(
+        username='bench_db_pool', defaults={'email': 'bench_db_pool@example.com'}
+    )
+    return str(AccessToken.for_user(user))
+
+
+def wait_for_port(port, server, log, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            tail = Path(log).read_text(errors='replace').splitlines()[-20:]
+            raise RuntimeError('gunicorn 启动失败：\n' + '\n'.join(tail))
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'gunicorn 未能在 {timeout} 秒内启动')
+
+
+def run_load(port, path, token, total, concurrency):
+    """并发发起请求，返回 (requests/sec, 延迟列表)"""
+    latencies = []
+    lock = threading.Lock()
+    per_worker = total // concurrency
+
+    def worker():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        local = []
+        for _ in range(per_worker):
+            start = time.perf_counter()
+            conn.request('GET', path, headers={'Authorization': f'Bearer {token}'})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                raise RuntimeError(f'请求失败: {response.status}')
+            local.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return len(latencies) / elapsed, latencies
+
+
+def bench_mode(mode, args, token):
+    # 压测只用一个用户，关闭限流
+    env = dict(os.environ, THROTTLE_ENABLED='false', **MODES[mode])
+    if args.redis_url:
+        env.update(REALTIME_BACKEND='apps.realtime.broker.RedisBackend', REALTIME_URL=args.redis_url)
+    with open(args.log, 'ab') as log:
+        server = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn',
+                '--bind', f'127.0.0.1:{args.port}',
+                '--workers', str(args.workers),
+                'todo_project.wsgi:application',
+            ],
+            cwd=BACKEND_DIR,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        wait_for_port(args.port, server, args.log)
+        # 预热
+        run_load(args.port, args.path, token, args.concurrency * 5, args.concurrency)
+        rps, latencies = run_load(args.port, args.path, token, args.requests, args.concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    return {
+        'mode': mode,
+        'rps': rps,
+        'p50': statistics.median(latencies) * 1000,
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default='/api/tasks/?fields=id,title')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--modes', nargs='+', default=['per_request', 'persistent'], choices=list(MODES))
+    parser.add_argument('--redis-url', default=os.environ.get('REALTIME_URL', ''))
+    parser.add_argument('--log', default='bench_db_pool.log', help='gunicorn 输出文件')
+    args = parser.parse_args()
+    if args.workers > 1 and not args.redis_url:
+        parser.error('多个 worker 需要 --redis-url（事件代理使用 RedisBackend），或使用 --workers 1')
+
+    token = create_token()
+    results = [bench_mode(mode, args, token) for mode in args.modes]
+
+    baseline = results[0]['rps']
+    print(f'{"mode":<12} {"req/s":>10} {"p50(ms)":>10} {"p99(ms)":>10} {"speedup":>8}')
+    for result in results:
+        print(
+            f'{result["mode"]:<12} {result["rps"]:>10.1f} {result["p50"]:>10.2f} '
+            f'{result["p99"]:>10.2f} {result["rps"] / baseline:>7.2f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+任务表哈希分区的分区裁剪验证（仅 PostgreSQL）
+
+创建若干压测用户和任务，通过 APIClient 请求 TaskViewSet 的常用接口，记录接口发出的 SQL，
+对其中读取 tasks / task_tags 的查询执行 EXPLAIN (ANALYZE, FORMAT JSON)，
+统计每条查询实际扫描的分区数和执行时间。
+
+指定 --partitions 时先测量普通表，再转换为分区表后重新测量（会修改数据库，请使用独立的压测库）：
+    python benchmarks/bench_partitions.py --users 200 --tasks-per-user 500 --partitions 16
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+USERNAME_PREFIX = 'bench_partition_'
+ENDPOINTS = [
+    '/api/tasks/',
+    '/api/tasks/?status__in=todo,in_progress&expand=tags',
+    '/api/tasks/today/',
+    '/api/tasks/board/?group_by=status&limit=20',
+    '/api/tasks/system/?type=inbox&fields=id,title',
+    '/api/tasks/statistics/',
+    '/api/tasks/calendar/?start=2026-10-01&end=2026-10-31&compact=true',
+]
+# 普通表计为 1 个，分区表按实际扫描的分区计数
+PARTITION = re.compile(r'^(tasks|task_tags)(_p\d+)?$')
+
+
+def setup(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
+    # 同一用户连续请求，关闭限流
+    os.environ['THROTTLE_ENABLED'] = 'false'
+    import django
+    django.setup()
+    from django.conf import settings
+    from django.db import connection
+    from apps.tags.models import Tag, TaskTag
+    from apps.tasks.models import Task
+    from apps.users.models import User
+
+    if connection.vendor != 'postgresql':
+        sys.exit('分区裁剪需要 PostgreSQL，当前数据库为 ' + connection.vendor)
+    settings.ALLOWED_HOSTS = ['*']
+
+    rng = random.Random(args.seed)
+    users = []
+    for i in range(args.users):
+        user, created = User.objects.get_or_create(
+            username=f'{USERNAME_PREFIX}{i}', defaults={'email': f'{USERNAME_PREFIX}{i}@example.com'}
+        )
+        users.append(user)
+        if not created:
+            continue
+        tags = Tag.objects.bulk_create([Tag(user=user, name=f'tag{j}') for j in range(10)])
+        tasks = Task.objects.bulk_create([
+            Task(
+                user=user,
+                title=f'task {j}',
+                status=rng.choice(['todo', 'in_progress', 'completed']),
+                priority=rng.choice(['none', 'low', 'medium', 'high']),
+            )
+            for j in range(args.tasks_per_user)
+        ])
+        TaskTag.objects.bulk_create([
+            TaskTag(task=task, user=user, tag=rng.choice(tags)) for task in tasks if rng.random() < 0.5
+        ])
+    connection.cursor().execute('ANALYZE')
+    return users
+
+
+def scanned_partitions(plan):
+    """返回计划中实际扫描的表和分区名集合（运行时裁剪掉的子计划 Actual Loops 为 0）"""
+    found = set()
+    if PARTITION.match(plan.get('Relation Name', '')) and plan.get('Actual Loops', 1):
+        found.add(plan['Relation Name'])
+    for child in plan.get('Plans', []):
+        found |= scanned_partitions(child)
+    return found
+
+
+def measure(users, rounds):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework.test import APIClient
+
+    results = {}
+    for url in ENDPOINTS:
+        partitions, elapsed, queries = set(), 0.0, 0
+        for user in users[:rounds]:
+            client = APIClient()
+            client.force_authenticate(user)
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url)
+            assert response.status_code == 200, (url, response.status_code)
+            for query in context.captured_queries:
+                sql = query['sql']
+                if not sql.startswith('SELECT') or not re.search(r'"(tasks|task_tags)"', sql):
+                    continue
+                with connection.cursor() as cursor:
+                    cursor.execute(f'EXPLAIN (ANALYZE, FORMAT JSON) {sql}')
+                    plan = cursor.fetchone()[0]
+                plan = (json.loads(plan) if isinstance(plan, str) else plan)[0]
+                partitions = max(partitions, scanned_partitions(plan['Plan']), key=len)
+                elapsed += plan['Execution Time']
+                queries += 1
+        results[url] = (queries, len(partitions), elapsed / max(queries, 1))
+    return results
+
+
+def report(title, results):
+    print(title)
+    print(f'{"查询数":>6} {"最多扫描表/分区":>12} {"平均执行(ms)":>12}  接口')
+    for url, (queries, partitions, elapsed) in results.items():
+        print(f'{queries:>6} {partitions:>12} {elapsed:>12.3f}  {url}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--tasks-per-user', type=int, default=500)
+    parser.add_argument('--rounds', type=int, default=20, help='每个接口测量的用户数')
+    parser.add_argument('--partitions', type=int, help='测量后转换为分区表并再次测量')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    users = setup(args)
+    from apps.tasks import partitions
+
+    partitioned = partitions.is_partitioned('tasks')
+    report('分区表' if partitioned else '普通表', measure(users, args.rounds))
+    if args.partitions and not partitioned:
+        partitions.partition(args.partitions)
+        print(f'\n已转换为 {args.partitions} 个分区')
+        report('分区表', measure(users, args.rounds))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+快速查找延迟基准测试
+
+创建一个拥有 N 个任务（以及项目、标签）的压测用户，模拟逐字输入的查询，
+在进程内调用 apps.quickfind.search.search() 并统计延迟分位数。
+目标：每个用户 10 万任务时 p99 < 20ms。
+
+用法（在 backend 目录下，DATABASE_URL 指向独立的压测数据库）：
+    python benchmarks/bench_quickfind.py --tasks 100000 --queries 1000
+    python benchmarks/bench_quickfind.py --reset    # 删除并重新生成压测数据
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+USERNAME = 'bench_quickfind'
+SYLLABLES = ['ba', 'ro', 'ke', 'mi', 'tor', 'lan', 'sev', 'qu', 'dre', 'pol', 'na', 'fi', 'gen', 'sta', 'wor', 'ki']
+CHINESE_WORDS = ['周报', '会议', '复盘', '需求', '评审', '上线', '测试', '文档', '预算', '招聘', '体检', '旅行', '装修', '采购']
+
+
+def make_vocabulary(rng, size):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def make_title(rng, vocabulary):
+    if rng.random() < 0.2:
+        return ''.join(rng.sample(CHINESE_WORDS, rng.randint(1, 3)))
+    return ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(2, 6))).capitalize()
+
+
+def setup(args):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo_project.settings')
+    import django
+    django.setup()
+    from django.db import connection
+    from apps.projects.models import Project
+    from apps.quickfind import index
+    from apps.quickfind.models import SearchGram
+    from apps.tags.models import Tag
+    from apps.tasks.models import Task
+    from apps.users.models import User
+
+    user, _ = User.objects.get_or_create(username=USERNAME, defaults={'email': f'{USERNAME}@example.com'})
+    if args.reset:
+        # 跳过信号直接删除，避免逐行处理 10 万个任务
+        for model in (SearchGram, Task, Project, Tag):
+            queryset = model.objects.filter(user=user)
+            queryset._raw_delete(queryset.db)
+
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng, args.vocabulary)
+    if Task.objects.filter(user=user).count() != args.tasks:
+        print(f'生成 {args.tasks} 个任务...')
+        projects = Project.objects.bulk_create(
+            [Project(user=user, name=make_title(rng, vocabulary), is_pinned=i < 3) for i in range(50)]
+        )
+        Tag.objects.bulk_create(
+            [Tag(user=user, name=name) for name in rng.sample(vocabulary, 200)], ignore_conflicts=True
+        )
+        for start in range(0, args.tasks, 5000):
+            Task.objects.bulk_create([
+                Task(
+                    user=user,
+                    title=make_title(rng, vocabulary),
+                    project=rng.choice(projects),
+                    is_starred=rng.random() < 0.05,
+                    status='completed' if rng.random() < 0.5 else 'todo',
+                )
+                for _ in range(min(5000, args.tasks - start))
+            ])
+        if index.uses_side_table():
+            print('重建三元组表...')
+            index.rebuild([user.pk])
+        if connection.vendor == 'sqlite':
+            connection.cursor().execute('ANALYZE')
+    return user, rng, vocabulary
+
+
+def make_queries(rng, vocabulary, count):
+    """模拟逐字输入：取单词的 1~完整长度前缀，部分查询带第二个单词或拼写错误"""
+    queries = []
+    while len(queries) < count:
+        if rng.random() < 0.15:
+            word = rng.choice(CHINESE_WORDS)
+            queries.append(word[:rng.randint(1, len(word))])
+            continue
+        word = rng.choice(vocabulary)
+        query = word[:rng.randint(1, len(word))]
+        if rng.random() < 0.2:
+            query = f'{rng.choice(vocabulary)} {query}'
+        if rng.random() < 0.1 and len(query) > 3:
+            i = rng.randrange(len(query) - 1)
+            query = query[:i] + query[i + 1] + query[i] + query[i + 2:]
+        queries.append(query)
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=1000)
+    parser.add_argument('--vocabulary', type=int, default=3000)
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--reset', action='store_true')
+    args = parser.parse_args()
+
+    user, rng, vocabulary = setup(args)
+    from django.db import connection
+    from apps.quickfind.search import search
+
+    queries = make_queries(rng, vocabulary, args.queries)
+    # 预热
+    for query in queries[:50]:
+        search(user.pk, query, args.limit)
+
+    latencies, empty = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        results = search(user.pk, query, args.limit)
+        latencies.append((time.perf_counter() - start) * 1000)
+        empty += not results
+
+    latencies.sort()
+    print(f'{connection.vendor}，{args.tasks} 个任务，{len(queries)} 次查询（{empty} 次无结果）')
+    print(f'{"p50(ms)":>10} {"p95(ms)":>10} {"p99(ms)":>10} {"max(ms)":>10}')
+    print(
+        f'{statistics.median(latencies):>10.2f} {latencies[int(len(latencies) * 0.95) - 1]:>10.2f} '
+        f'{latencies[int(len(latencies) * 0.99) - 1]:>10.2f} {latencies[-1]:>10.2f}'
+    )
+
+
+if __name__ == '__main__':
+    main()
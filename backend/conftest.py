@@ -0,0 +1,29 @@
+import itertools
+
+import pytest
+from rest_framework.test import APIClient
+
+_numbers = itertools.count(1)
+
+
+@pytest.fixture
+def make_user(django_user_model):
+    def make(**fields):
+        number = next(_numbers)
+        fields.setdefault('username', f'user{number}')
+        fields.setdefault('email', f'user{number}@example.com')
+        return django_user_model.objects.create_user(password='password123', **fields)
+
+    return make
+
+
+@pytest.fixture
+def user(make_user):
+    return make_user()
+
+
+@pytest.fixture
+def api_client(user):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
@@ -0,0 +1,99 @@
+"""
+gunicorn 配置（gunicorn 启动时自动读取当前目录下的 gunicorn.conf.py）
+
+- preload_app：主进程导入 Django 和全部应用并预热（todo_project.warmup）后再 fork，
+  worker 直接共享这些内存页（写时复制），不再各自导入
+- fork 前 gc.freeze()：已有对象移出垃圾回收的跟踪范围，worker 中的垃圾回收不会遍历它们，
+  也就不会因为改写对象头而复制这些页
+- max_requests 加随机抖动，worker 不会同时重启
+- gthread worker：每个 worker 多个线程，事件流（/api/events/）等长连接只占用一个线程，
+  不会占满 worker；多个 worker 时事件代理必须是 RedisBackend，使用进程内代理时只启动 1 个 worker
+- 多个 worker 时未设置 METRICS_DIR 则使用 /dev/shm/metrics，/metrics 汇总所有 worker 的计数；
+  主进程启动时清空其中上次运行留下的指标文件
+
+preload 模式下 HUP 只重启 worker，不重新导入代码，更新代码后需要重启主进程。
+每个 worker 启动时记录其 RSS 和私有内存，用于观察共享效果。
+"""
+
+import gc
+import os
+import time
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('WEB_CONCURRENCY', 4))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+preload_app = True
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', max_requests // 10))
+if workers > 1:
+    # 各 worker 内存中的计数互不可见，抓取结果会随处理请求的 worker 跳变
+    os.environ.setdefault('METRICS_DIR', '/dev/shm/metrics' if os.path.isdir('/dev/shm') else '/tmp/todo-metrics')
+# 心跳文件放在内存文件系统，避免容器的 overlay 磁盘卡住心跳
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+_started = time.perf_counter()
+
+
+def memory_kb():
+    """当前进程的 {Rss, Private_Clean, Private_Dirty, ...}（KB），读取 /proc，不可用时返回 {}"""
+    values = {}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                parts = rest.split()
+                if len(parts) == 2 and parts[1] == 'kB':
+                    values[key] = int(parts[0])
+    except OSError:
+        pass
+    return values
+
+
+def check_realtime(server):
+    """进程内事件代理只能把事件推给同一 worker 中的连接，未配置 RedisBackend 时只启动 1 个 worker"""
+    from django.conf import settings
+    from django.utils.module_loading import import_string
+
+    from apps.realtime.broker import InProcessBackend
+
+    if server.num_workers > 1 and issubclass(import_string(settings.REALTIME['BACKEND']), InProcessBackend):
+        server.log.warning(
+            '事件代理为进程内代理，只启动 1 个 worker（配置的是 %d 个）；多 worker 部署请设置 '
+            'REALTIME_BACKEND=apps.realtime.broker.RedisBackend 和 REALTIME_URL',
+            server.num_workers,
+        )
+        server.num_workers = 1
+
+
+def when_ready(server):
+    """应用已预加载，fork worker 之前"""
+    loaded = time.perf_counter() - _started
+
+    from apps.metrics import store
+    from todo_project import warmup
+
+    check_realtime(server)
+
+    removed = store.clear()
+    steps = warmup.run()
+    gc.collect()
+    gc.freeze()
+
+    server.log.info(
+        '应用加载 %.2fs，预热 %s，冻结 %d 个对象，清除 %d 个指标文件',
+        loaded,
+        '，'.join(f'{name} {count} 项 {seconds * 1000:.0f}ms' for name, count, seconds in steps),
+        gc.get_freeze_count(),
+        removed,
+    )
+
+
+def post_worker_init(worker):
+    memory = memory_kb()
+    if memory:
+        private = memory.get('Private_Clean', 0) + memory.get('Private_Dirty', 0)
+        worker.log.info(
+            'worker %s 启动：RSS %.1f MB，私有内存 %.1f MB', worker.pid, memory['Rss'] / 1024, private / 1024
+        )
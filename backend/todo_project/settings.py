@@ -6,6 +6,9 @@ from pathlib import Path
 import environ
 import os
 
+import django
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -46,17 +49,31 @@ INSTALLED_APPS = [
     'apps.tasks',
     'apps.projects',
     'apps.tags',
+    'apps.realtime',
+    'apps.filters',
+    'apps.bootstrap',
+    'apps.batch',
+    'apps.quickfind',
+    'apps.sharding',
+    'apps.metrics',
+    'apps.profiling',
+    'apps.openapi',
 ]
 
 MIDDLEWARE = [
+    'apps.metrics.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.sharding.middleware.ShardMiddleware',
+    'apps.profiling.middleware.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'apps.common.middleware.ReplicaStickinessMiddleware',
+    'apps.tasks.middleware.ActivityLogMiddleware',
 ]
 
 ROOT_URLCONF = 'todo_project.urls'
@@ -84,6 +101,82 @@ DATABASES = {
     'default': env.db('DATABASE_URL', default='sqlite:///db.sqlite3')
 }
 
+# 连接复用：请求结束后保留连接 DB_CONN_MAX_AGE 秒，复用前先做健康检查
+DATABASES['default']['CONN_MAX_AGE'] = env.int('DB_CONN_MAX_AGE', default=60)
+DATABASES['default']['CONN_HEALTH_CHECKS'] = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    # 注册 trigram_word_similar 等查询（快速查找使用）
+    INSTALLED_APPS.append('django.contrib.postgres')
+
+    # psycopg3 内置连接池（需要 Django 5.1+ 和 psycopg[pool]，即可选依赖 pool），与 CONN_MAX_AGE 互斥
+    if env.bool('DB_POOL', default=False):
+        try:
+            import psycopg  # noqa: F401
+            import psycopg_pool  # noqa: F401
+        except ImportError as exc:
+            raise ImproperlyConfigured('DB_POOL 需要 psycopg 3 和 psycopg_pool（uv sync --extra pool）') from exc
+        if django.VERSION < (5, 1):
+            raise ImproperlyConfigured('DB_POOL 需要 Django 5.1 及以上版本')
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+            'min_size': env.int('DB_POOL_MIN_SIZE', default=2),
+            'max_size': env.int('DB_POOL_MAX_SIZE', default=10),
+            'timeout': env.int('DB_POOL_TIMEOUT', default=10),
+        }
+
+    # 通过 pgbouncer（transaction 模式）连接时，同一事务外不能依赖会话状态：
+    # 关闭服务端游标，psycopg3 同时关闭服务端预编译语句
+    if env.bool('DB_PGBOUNCER', default=False):
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+        try:
+            import psycopg  # noqa: F401
+        except ImportError:
+            pass
+        else:
+            DATABASES['default'].setdefault('OPTIONS', {})['prepare_threshold'] = None
+
+# 只读副本：DATABASE_REPLICA_URLS 以逗号分隔，依次注册为 replica_0、replica_1 ...
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[])):
+    alias = f'replica_{index}'
+    DATABASES[alias] = environ.Env.db_url_config(url)
+    for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'DISABLE_SERVER_SIDE_CURSORS'):
+        if key in DATABASES['default']:
+            DATABASES[alias][key] = DATABASES['default'][key]
+    # 测试时副本与主库共用同一个测试库
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+
+# 按用户分库：DATABASE_SHARD_URLS 以逗号分隔，依次注册为 shard_1、shard_2 ...，default 为 0 号分片
+# 每个分片需要单独执行迁移（python manage.py migrate_shards）
+DATABASE_SHARDS = ['default']
+for index, url in enumerate(env.list('DATABASE_SHARD_URLS', default=[]), start=1):
+    alias = f'shard_{index}'
+    DATABASES[alias] = environ.Env.db_url_config(url)
+    for key in ('CONN_MAX_AGE', 'CONN_HEALTH_CHECKS', 'DISABLE_SERVER_SIDE_CURSORS'):
+        if key in DATABASES['default']:
+            DATABASES[alias][key] = DATABASES['default'][key]
+    DATABASE_SHARDS.append(alias)
+
+# MAP_TTL：进程内缓存用户所在分片的时间（秒），迁移用户时据此等待各进程刷新
+# NEW_USER_SHARDS：新用户分配到的分片，默认所有分片；ID_BLOCK：每个分片自增ID的区间大小
+SHARDING = {
+    'MAP_TTL': env.int('SHARD_MAP_TTL', default=5),
+    'NEW_USER_SHARDS': env.list('SHARD_NEW_USER_SHARDS', default=[]),
+    'ID_BLOCK': 10 ** 12,
+}
+
+DATABASE_ROUTERS = ['apps.sharding.routers.ShardRouter', 'apps.common.routers.ReplicaRouter']
+
+# 写入后该用户的读请求固定走主库的时长（秒）
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=5)
+
+# Cache（多 worker 部署时使用共享缓存，如 redis://）
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -132,11 +225,24 @@ REST_FRAMEWORK = {
         'rest_framework.filters.SearchFilter',
         'rest_framework.filters.OrderingFilter',
     ],
+    'DEFAULT_THROTTLE_CLASSES': [
+        'apps.common.throttling.TokenBucketThrottle',
+    ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# 令牌桶限流：RATE 为令牌补充速率，BURST 为桶容量（允许的突发请求量）
+# 多 worker 部署时需要共享缓存（CACHE_URL=redis://...）才能全局生效
+THROTTLE = {
+    'ENABLED': env.bool('THROTTLE_ENABLED', default=True),
+    'USER_RATE': env('THROTTLE_USER_RATE', default='600/min'),
+    'USER_BURST': env.int('THROTTLE_USER_BURST', default=120),
+    'IP_RATE': env('THROTTLE_IP_RATE', default='1200/min'),
+    'IP_BURST': env.int('THROTTLE_IP_BURST', default=240),
+}
+
 # JWT Settings
 from datetime import timedelta
 
@@ -154,6 +260,86 @@ CORS_ALLOWED_ORIGINS = env.list(
 )
 CORS_ALLOW_CREDENTIALS = True
 
+# Realtime settings
+# 多 worker 部署时必须使用 apps.realtime.broker.RedisBackend 并配置 REALTIME_URL（否则 gunicorn.conf.py 只启动 1 个 worker）
+# WSGI 下每个事件流连接占用一个 worker 线程，MAX_DURATION 秒后断开由客户端重连
+REALTIME = {
+    'BACKEND': env('REALTIME_BACKEND', default='apps.realtime.broker.InProcessBackend'),
+    'URL': env('REALTIME_URL', default=''),
+    'BUFFER_SIZE': env.int('REALTIME_BUFFER_SIZE', default=1000),
+    'BATCH_SIZE': 100,
+    'HEARTBEAT_INTERVAL': env.int('REALTIME_HEARTBEAT_INTERVAL', default=15),
+    'MAX_DURATION': env.int('REALTIME_MAX_DURATION', default=25),
+}
+
+# 截止时间提醒（python manage.py run_scheduler）
+# SINK 可选 apps.tasks.reminders.LogSink / WebhookSink / MemorySink
+REMINDERS = {
+    'SINK': env('REMINDER_SINK', default='apps.tasks.reminders.LogSink'),
+    'OPTIONS': {
+        'webhook_url': env('REMINDER_WEBHOOK_URL', default=''),
+        'timeout': env.int('REMINDER_WEBHOOK_TIMEOUT', default=10),
+    },
+    'HORIZON': env.int('REMINDER_HORIZON', default=3600),
+    'REFILL_INTERVAL': env.int('REMINDER_REFILL_INTERVAL', default=60),
+    'BATCH_SIZE': env.int('REMINDER_BATCH_SIZE', default=500),
+}
+
+# 任务变更记录写入方式：commit 为事务提交后收集、请求结束时批量写入，thread 为后台线程按批写入
+ACTIVITY_LOG = {
+    'WRITER': env('ACTIVITY_LOG_WRITER', default='commit'),
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': env.float('ACTIVITY_LOG_FLUSH_INTERVAL', default=1.0),
+}
+
+# 智能清单侧边栏计数的缓存时间（秒），任务变更时会提前失效
+SAVED_FILTER_COUNTS_TIMEOUT = env.int('SAVED_FILTER_COUNTS_TIMEOUT', default=3600)
+
+# 启动接口：收集箱默认条数，以及按用户缓存的数据版本号的保留时间（秒）
+BOOTSTRAP = {
+    'INBOX_PAGE_SIZE': env.int('BOOTSTRAP_INBOX_PAGE_SIZE', default=50),
+    'VERSION_TIMEOUT': env.int('BOOTSTRAP_VERSION_TIMEOUT', default=7 * 86400),
+}
+
+# 标签输入联想：进程内索引缓存的用户数，共享缓存中标签行的保留时间（秒）
+TAG_TYPEAHEAD = {
+    'LOCAL_SIZE': env.int('TAG_TYPEAHEAD_LOCAL_SIZE', default=1000),
+    'TIMEOUT': env.int('TAG_TYPEAHEAD_TIMEOUT', default=3600),
+}
+
+# 任务归档：完成超过多少天的任务移入归档表，每批移动的任务数
+ARCHIVE = {
+    'AFTER_DAYS': env.int('ARCHIVE_AFTER_DAYS', default=180),
+    'BATCH_SIZE': env.int('ARCHIVE_BATCH_SIZE', default=1000),
+}
+
+# 批量请求每批最多的子请求数
+BATCH_MAX_REQUESTS = env.int('BATCH_MAX_REQUESTS', default=100)
+
+# /metrics 指标：DIR 为多进程共享的指标文件目录（gunicorn 多 worker 时配置，启动前清空），
+# 不配置时只统计当前进程；TOKEN 为抓取端的 Bearer 令牌，不配置时仅管理员可访问
+METRICS = {
+    'ENABLED': env.bool('METRICS_ENABLED', default=True),
+    'DIR': env('METRICS_DIR', default=''),
+    'TOKEN': env('METRICS_TOKEN', default=''),
+}
+
+# 按需剖析：管理员请求带 X-Profile 请求头或 _profile 参数时采样剖析该请求；
+# INTERVAL 为采样间隔（秒），KEEP 为保留的记录数，MAX_QUERIES 为每条记录保存的查询数上限
+PROFILING = {
+    'ENABLED': env.bool('PROFILING_ENABLED', default=True),
+    'INTERVAL': env.float('PROFILING_INTERVAL', default=0.001),
+    'KEEP': env.int('PROFILING_KEEP', default=200),
+    'MAX_QUERIES': env.int('PROFILING_MAX_QUERIES', default=500),
+}
+
+# 预生成的 OpenAPI schema：DIR 为检入的 schema 文件目录（manage.py openapi_schema 生成），
+# USE_FILE 为 False 时忽略文件，在进程内首次请求时从代码生成（默认开发环境）
+OPENAPI_SCHEMA = {
+    'DIR': BASE_DIR / 'apps' / 'openapi' / 'artifacts',
+    'USE_FILE': env.bool('OPENAPI_SCHEMA_USE_FILE', default=not DEBUG),
+}
+
 # Spectacular settings
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Todo App API',
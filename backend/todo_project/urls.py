@@ -4,14 +4,18 @@ URL configuration for todo_project.
 
 from django.contrib import admin
 from django.urls import path, include
-from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
+from drf_spectacular.views import SpectacularSwaggerView
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from apps.metrics.views import MetricsView
+from apps.openapi.views import CachedSchemaView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', MetricsView.as_view(), name='metrics'),
     
     # API Documentation
-    path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
+    path('api/schema/', CachedSchemaView.as_view(), name='schema'),
     path('api/docs/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     
     # JWT Authentication
@@ -23,4 +27,11 @@ urlpatterns = [
     path('api/tasks/', include('apps.tasks.urls')),
     path('api/projects/', include('apps.projects.urls')),
     path('api/tags/', include('apps.tags.urls')),
+    path('api/filters/', include('apps.filters.urls')),
+    path('api/bootstrap/', include('apps.bootstrap.urls')),
+    path('api/batch/', include('apps.batch.urls')),
+    path('api/quickfind/', include('apps.quickfind.urls')),
+    path('api/events/', include('apps.realtime.urls')),
+    path('api/ops/shards/', include('apps.sharding.urls')),
+    path('api/ops/', include('apps.common.urls')),
 ]
@@ -0,0 +1,69 @@
+"""
+启动预热
+
+gunicorn 预加载应用后、fork worker 之前在主进程中调用（见 gunicorn.conf.py），提前完成各 worker
+处理首批请求时才会做的初始化，fork 后由所有 worker 共享：
+- URL 解析器：导入全部 URLConf，编译路由正则，构建反向解析表
+- 模型元数据：各模型 _meta 的字段和关联缓存
+- 翻译目录和 OpenAPI schema（见 apps.openapi.artifact）
+
+序列化器的字段按实例构建（DRF 不在类上缓存），不在这里预热。
+
+不访问数据库和缓存，结束时关闭所有数据库连接，避免 worker 继承主进程的连接。
+"""
+
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.urls import get_resolver
+from django.utils import translation
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    return len(resolver.url_patterns)
+
+
+def warm_models():
+    models = apps.get_models()
+    for model in models:
+        model._meta.get_fields()
+        model._meta.fields_map
+        model._meta.related_objects
+    return len(models)
+
+
+def warm_translations():
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('')
+    return 1
+
+
+def warm_schema():
+    from apps.openapi.artifact import get_artifact
+
+    return len(get_artifact().variants)
+
+
+STEPS = [
+    ('urls', warm_urls),
+    ('models', warm_models),
+    ('translations', warm_translations),
+    ('schema', warm_schema),
+]
+
+
+def run():
+    """依次执行预热，返回 [(步骤, 数量, 耗时秒)]"""
+    results = []
+    try:
+        for name, step in STEPS:
+            start = time.perf_counter()
+            count = step()
+            results.append((name, count, time.perf_counter() - start))
+    finally:
+        connections.close_all()
+    return results